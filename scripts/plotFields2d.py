@@ -96,42 +96,113 @@ def parse_command_line():
                       type=int, 
                       default=100,
                       help='dots per inch (resolution of the figure)')
+  # arguments about performance
+  parser.add_argument('--prefetch', dest='prefetch',
+                      type=int, 
+                      default=2,
+                      help='number of time-steps read (and derived) in advance '
+                           'by a background thread while the current one is '
+                           'rendered; 0 to read and render sequentially')
+  parser.add_argument('--jobs', '-j', dest='jobs',
+                      type=int, 
+                      default=1,
+                      help='number of processes used to read and render '
+                           'the time-steps in parallel')
   # parse given options file
   parser.add_argument('--options', 
                       type=open, action=miscellaneous.ReadOptionsFromFile,
                       help='path of the file with options to parse')
+  parser.add_argument('--mode', dest='mode',
+                      type=str, 
+                      choices=['contour', 'raster'],
+                      default='contour',
+                      help='rendering mode: contours (contourf) or raster '
+                           '(imshow/pcolormesh, faster for preview movies)')
   parser.set_defaults(filled_contour=True)
   print('done')
   # parse command-line
   return parser.parse_args()
 
 
-def main(args):
-  """Plots the the velocity, pressure, or vorticity fields at saved time-steps
-  for a two-dimensional simulation.
+def read_fields(args, time_steps):
+  """Reads (and derives) the field to plot at each time-step.
+
+  A dedicated Simulation object is used to read the fields,
+  so that the generator can run in a background thread.
+
+  Parameters
+  ----------
+  args: namespace
+    Arguments parsed from the command-line.
+  time_steps: list of integers
+    The time-steps to read.
+
+  Yields
+  ------
+  time_step: integer
+    The time-step.
+  field: Field object
+    The field to plot at the time-step.
   """
   simulation = Simulation(directory=args.directory, software=args.software)
-  time_steps = simulation.get_time_steps(time_steps_range=args.time_steps_range)
   simulation.read_grid()
-  bodies = [Body(path) for path in args.body_paths]
-
   if args.subtract_simulation:
     info = dict(zip(['software', 'directory'], 
                     args.subtract_simulation))
     other = Simulation(**info)
     other.read_grid()
-
+  field_name = (args.field_name if not args.subtract_simulation
+                                else args.field_name+'-subtracted')
   for time_step in time_steps:
     simulation.read_fields([args.field_name], time_step, 
                            periodic_directions=args.periodic_directions)
-    
-    field_name = (args.field_name if not args.subtract_simulation
-                                  else args.field_name+'-subtracted')
     if args.subtract_simulation:
       other.read_fields([args.field_name], time_step, 
                         periodic_directions=args.periodic_directions)
       simulation.subtract(other, args.field_name, field_name)
+    yield time_step, simulation.fields[field_name]
+
+
+def main(args):
+  """Plots the the velocity, pressure, or vorticity fields at saved time-steps
+  for a two-dimensional simulation.
+
+  The fields of the next time-steps are read in a background thread
+  while the current time-step is rendered;
+  with more than one job, the time-steps are spread over worker processes.
+  """
+  simulation = Simulation(directory=args.directory, software=args.software)
+  time_steps = simulation.get_time_steps(time_steps_range=args.time_steps_range)
+  simulation.read_grid()
+  bodies = [Body(path) for path in args.body_paths]
+
+  if args.jobs > 1:
+    other = None
+    if args.subtract_simulation:
+      info = dict(zip(['software', 'directory'], 
+                      args.subtract_simulation))
+      other = Simulation(**info)
+      other.read_grid()
+    simulation.plot_contours(args.field_name, time_steps,
+                             jobs=args.jobs,
+                             periodic_directions=args.periodic_directions,
+                             other=other,
+                             field_range=args.range,
+                             filled_contour=args.filled_contour,
+                             view=args.bottom_left+args.top_right,
+                             bodies=bodies,
+                             save_name=args.save_name,
+                             width=args.width, 
+                             dpi=args.dpi,
+                             reuse_figure=True,
+                             mode=args.mode)
+    return
 
+  field_name = (args.field_name if not args.subtract_simulation
+                                else args.field_name+'-subtracted')
+  for time_step, field in miscellaneous.prefetch(read_fields(args, time_steps),
+                                                 depth=args.prefetch):
+    simulation.fields[field_name] = field
     simulation.plot_contour(field_name,
                             field_range=args.range,
                             filled_contour=args.filled_contour,
@@ -139,7 +210,9 @@ def main(args):
                             bodies=bodies,
                             save_name=args.save_name,
                             width=args.width, 
-                            dpi=args.dpi)
+                            dpi=args.dpi,
+                            reuse_figure=True,
+                            mode=args.mode)
 
 
 if __name__ == '__main__':
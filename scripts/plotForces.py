@@ -5,8 +5,11 @@
 
 import os
 import sys
+import time
 import argparse
 
+from matplotlib import pyplot
+
 from snake import miscellaneous
 from snake.simulation import Simulation
 
@@ -65,6 +68,13 @@ def parse_command_line():
                           default=5,
                           help='number of side-points used for comparison '
                                'to get extrema')
+  stats_info.add_argument('--strouhal-method', dest='strouhal_method',
+                          type=str,
+                          choices=['extrema', 'fft', 'welch'],
+                          default='extrema',
+                          help='computes the frequency from the spacing '
+                               'between minima or from the peak of the '
+                               'power spectral density')
 
   plot_info = parser.add_argument_group('plot info')
   plot_info.add_argument('--force-indices', dest='force_indices',
@@ -99,6 +109,12 @@ def parse_command_line():
   plot_info.add_argument('--fill-between', dest='fill_between',
                          action='store_true',
                          help='fills between lines defined by extrema')
+  plot_info.add_argument('--follow', dest='follow_interval',
+                         type=float,
+                         default=None,
+                         help='re-reads the lines appended to the forces files '
+                              'every given number of seconds (running '
+                              'simulations) and saves the updated figure')
 
   # default options
   parser.set_defaults(display_drag=True, display_lift=True, show=True, save=True)
@@ -122,18 +138,35 @@ def main(args):
   for other in args.others:
     info = dict(zip(['software', 'directory', 'description'], other[:-1]))
     simulations.append(Simulation(**info))
+  while True:
+    plot_forces(simulations, args)
+    if not args.follow_interval:
+      break
+    pyplot.close('all')
+    time.sleep(args.follow_interval)
+
+
+def plot_forces(simulations, args):
+  """Reads the forces (only the new lines when following running simulations),
+  plots them and displays their statistics."""
+  follow = bool(args.follow_interval)
   # read and compute some statistics
   for index, simulation in enumerate(simulations):
     try:
-      simulations[index].read_forces(display_coefficients=args.display_coefficients)
+      simulations[index].read_forces(display_coefficients=args.display_coefficients,
+                                     follow=follow)
     except:
-      simulations[index].read_forces()
-    simulation.get_mean_forces(limits=args.average_limits, 
-                               last_period=args.last_period, 
-                               order=args.order)
+      simulations[index].read_forces(follow=follow)
+    # the running mean over the whole signal is updated by the follower
+    if not (follow and not args.last_period
+            and list(args.average_limits) == [0.0, float('inf')]):
+      simulation.get_mean_forces(limits=args.average_limits, 
+                                 last_period=args.last_period, 
+                                 order=args.order)
     if args.strouhal_limits:
       simulation.get_strouhal(limits=args.strouhal_limits,
-                              order=args.order)
+                              order=args.order,
+                              method=args.strouhal_method)
   # plot instantaneous forces (or force coefficients)
   simulations[0].plot_forces(indices=args.force_indices,
                              labels=args.force_labels,
@@ -147,7 +180,7 @@ def main(args):
                              other_coefficients=[float(other[-1]) for other in args.others],
                              limits=args.plot_limits,
                              save_name=args.save_name, 
-                             show=args.show)
+                             show=(args.show and not follow))
   # display time-averaged values in table
   print(simulations[0].create_dataframe_forces(indices=args.force_indices,
                                                display_strouhal=(True if args.strouhal_limits 
@@ -123,18 +123,22 @@ def main(args):
     simulations[size].read_fields(args.field_names, args.time_step,
                                   periodic_directions=args.periodic_directions)
 
+  # each field is restricted onto the grid of the mask only once
+  study = convergence.ConvergenceStudy(simulations[args.mask])
   for sizes in args.observed_order:
     alpha = convergence.get_observed_orders([simulations[size] for size in sizes], 
                                             args.field_names, 
                                             simulations[args.mask],
                                             save_directory=os.path.join(args.directory,
-                                                                        'data'))
+                                                                        'data'),
+                                            study=study)
     if args.plot_asymptotic_ranges:
       convergence.plot_asymptotic_ranges([simulations[size] for size in sizes],
                                          alpha,
                                          simulations[args.mask],
                                          save_directory=os.path.join(args.directory,
-                                                                     'images'))
+                                                                     'images'),
+                                         study=study)
 
   exact = convergence.get_exact_solution(simulations, args.mask, *args.analytical_solution)
   if args.plot_analytical_solution:
@@ -149,7 +153,8 @@ def main(args):
                                     save_directory=os.path.join(args.directory,
                                                                 'images'),
                                     save_name=args.save_name,
-                                    show=args.show)
+                                    show=args.show,
+                                    study=study)
 
 
 if __name__ == '__main__':
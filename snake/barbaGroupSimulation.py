@@ -5,17 +5,28 @@
 
 import os
 import sys
+import errno
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 
 import numpy
 
 from .simulation import Simulation
-from .field import Field
+from .field import Field, ContourRenderer, get_interpolation_stencil
+from .timeSeriesField import TimeSeriesField
+from .fieldCache import FieldCache
+from .gridMetrics import GridMetrics
+from .fieldStatistics import FieldStatistics
 
 
 class BarbaGroupSimulation(Simulation):
   """Contains info about a BarbaGroup simulation.
   Inherits from the class Simulation.
   """
+  # solution files (in each time-step folder) containing fluxes and pressure
+  flux_file_names = []
+  pressure_file_names = []
+
   def __init__(self, 
                software,
                description=None, 
@@ -86,6 +97,142 @@ class BarbaGroupSimulation(Simulation):
       return sorted(int(folder) for folder in os.listdir(directory)
                                 if folder[0] == '0')
 
+  def get_time_series(self, field_name,
+                      time_steps=None,
+                      periodic_directions=[],
+                      directory=None,
+                      chunk_size=10):
+    """Returns a lazy stack of a field over saved time-steps.
+
+    Parameters
+    ----------
+    field_name: string
+      Name of the field;
+      choices: 'pressure', 'vorticity',
+               'x-velocity', 'y-velocity',
+               'x-flux', 'y-flux'.
+    time_steps: list of integers, optional
+      Time-steps to consider;
+      default: None (all saved time-steps).
+    periodic_directions: list of strings, optional
+      Directions that uses periodic boundary conditions;
+      choices: 'x', 'y', 'z',
+      default: [].
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
+    chunk_size: integer, optional
+      Number of time-steps loaded in memory at once;
+      default: 10.
+
+    Returns
+    -------
+    series: TimeSeriesField object
+      The field over the time-steps.
+    """
+    return TimeSeriesField(self, field_name,
+                           time_steps=time_steps,
+                           periodic_directions=periodic_directions,
+                           directory=directory,
+                           chunk_size=chunk_size)
+
+  def extract_probes(self, points, field_names,
+                     time_steps=None,
+                     periodic_directions=[],
+                     directory=None,
+                     jobs=4):
+    """Extracts the history of fields at probe points.
+
+    The interpolation stencils (bilinear in 2D, trilinear in 3D) are computed
+    once; at each time-step, only the values of the stencils are gathered
+    from the memory-mapped solution files (the whole fields are not loaded).
+    The time-steps are processed by a pool of threads.
+
+    Parameters
+    ----------
+    points: list of tuples of floats
+      Coordinates of each probe.
+    field_names: list of strings or single string
+      Name of the fields to probe;
+      choices: 'pressure',
+               'x-velocity', 'y-velocity', 'z-velocity',
+               'x-flux', 'y-flux', 'z-flux'.
+    time_steps: list of integers, optional
+      Time-steps to consider;
+      default: None (all saved time-steps).
+    periodic_directions: list of strings, optional
+      Directions that uses periodic boundary conditions;
+      choices: 'x', 'y', 'z',
+      default: [].
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
+    jobs: integer, optional
+      Number of threads reading the time-steps;
+      default: 4.
+
+    Returns
+    -------
+    probes: dictionary of (string, 2D array of floats) items
+      History of each field at the probes; shape (time, probe)
+      (NaN for probes outside the domain).
+    """
+    if isinstance(field_names, basestring):
+      field_names = [field_names]
+    if time_steps is None:
+      time_steps = self.get_time_steps(directory=directory)
+    metrics = self.get_grid_metrics()
+    stencils = {}
+    for name in field_names:
+      if name == 'pressure':
+        source = 'pressure'
+      elif name.endswith('-velocity') or name.endswith('-flux'):
+        source = name[0]+'-flux'
+      else:
+        raise ValueError('cannot probe field {}'.format(name))
+      nodes = metrics.nodes[source]
+      indices, weights, outside = get_interpolation_stencil(nodes, points)
+      if name.endswith('-velocity'):
+        # the velocity is the flux divided by the face area
+        inverse_area = metrics.inverse_face_areas['xyz'.index(name[0])]
+        inverse_area = numpy.broadcast_to(inverse_area,
+                                          [n.size for n in nodes[::-1]])
+        weights = weights*inverse_area[indices]
+      stencils[name] = (source, indices, weights, outside)
+    need_pressure = any(name == 'pressure' for name in field_names)
+    need_fluxes = any(name != 'pressure' for name in field_names)
+
+    def extract(time_step):
+      sources = {}
+      if need_pressure:
+        sources['pressure'] = self.read_pressure(time_step, directory=directory)
+      if need_fluxes:
+        for flux in self.read_fluxes(time_step,
+                                     periodic_directions=periodic_directions,
+                                     directory=directory):
+          sources[flux.label] = flux
+      return [(sources[source].values[indices]*weights).sum(axis=0)
+              for source, indices, weights, _ in
+              (stencils[name] for name in field_names)]
+
+    print('[info] extracting {} probe(s) over {} time-step(s) ...'
+          ''.format(len(points), len(time_steps)))
+    if jobs > 1:
+      pool = ThreadPool(processes=jobs)
+      try:
+        histories = pool.map(extract, time_steps, chunksize=1)
+      finally:
+        pool.close()
+        pool.join()
+    else:
+      histories = [extract(time_step) for time_step in time_steps]
+    probes = {}
+    for n, name in enumerate(field_names):
+      probes[name] = numpy.array([history[n] for history in histories]
+                                ).reshape(len(histories), len(points))
+      probes[name][:, stencils[name][3]] = numpy.nan
+    return probes
+
   def get_grid_spacing(self):
     """Returns the grid-spacing of a uniform grid."""
     return (self.grid[0][-1]-self.grid[0][0])/(self.grid[0].size-1)
@@ -95,13 +242,17 @@ class BarbaGroupSimulation(Simulation):
                   directory=None):
     """Gets the field at a given time-step. 
 
+    The dependencies between the requested fields are resolved first so that
+    each solution file is read only once: the velocity is derived from the
+    fluxes in memory and the vorticity from the velocity.
+
     Parameters
     ----------
     field_names: list of strings or single string
       Name of the fields to get; 
       choices: 'pressure', 'vorticity', 
-               'x-velocity', 'y-velocity', 
-               'x-flux', 'y-flux'.
+               'x-velocity', 'y-velocity', 'z-velocity',
+               'x-flux', 'y-flux', 'z-flux'.
     time_step: integer
       Time-step at which the solution is read.
     periodic_directions: list of strings, optional
@@ -120,51 +271,241 @@ class BarbaGroupSimulation(Simulation):
       field_names = [field_names]
     if not directory:
       directory = self.directory
+    options = (time_step, periodic_directions, directory)
+    directions = 'xyz'[:len(self.grid)]
+    # plan the reads: the vorticity needs the velocity,
+    # the velocity needs the fluxes
+    need_velocity = any(name.endswith('-velocity') or name == 'vorticity'
+                        for name in field_names)
+    keep_fluxes = any(name.endswith('-flux') for name in field_names)
     if 'pressure' in field_names:
-      self.fields['pressure'] = self.read_pressure(time_step, 
-                                                   directory=directory)
-    if any(name in ['x-flux', 'y-flux'] for name in field_names):
-      self.fields['x-flux'], self.fields['y-flux'] = self.read_fluxes(time_step, 
-                                         periodic_directions=periodic_directions,
-                                         directory=directory)
-    if any(name in ['x-velocity', 'y-velocity'] for name in field_names):
-      self.fields['x-velocity'], self.fields['y-velocity'] = self.get_velocity(time_step, 
-                                                 periodic_directions=periodic_directions,
-                                                 directory=directory)
+      pressure = self.lookup_fields(['pressure'], *options)
+      if not pressure:
+        pressure = [self.read_pressure(time_step, directory=directory)]
+        self.cache_fields(pressure, *options)
+      self.fields['pressure'] = pressure[0]
+    velocities = None
+    if need_velocity:
+      velocities = self.lookup_fields([direction+'-velocity'
+                                       for direction in directions], *options)
+    if keep_fluxes or (need_velocity and not velocities):
+      fluxes = self.lookup_fields([direction+'-flux'
+                                   for direction in directions], *options)
+      shared_fluxes = keep_fluxes or bool(fluxes)
+      if not fluxes:
+        if need_velocity and not velocities:
+          print('[time-step {}] get velocity fields ...'.format(time_step))
+        fluxes = self.read_fluxes(time_step, 
+                                  periodic_directions=periodic_directions,
+                                  directory=directory)
+        if keep_fluxes:
+          self.cache_fields(fluxes, *options)
+      if keep_fluxes:
+        for flux in fluxes:
+          self.fields[flux.label] = flux
+      if need_velocity and not velocities:
+        # convert the fluxes in place, unless they are requested or cached
+        velocities = self.convert_fluxes(fluxes, in_place=not shared_fluxes)
+        self.cache_fields(velocities, *options)
+    if need_velocity:
+      for velocity in velocities:
+        self.fields[velocity.label] = velocity
     if 'vorticity' in field_names:
-      self.fields['x-velocity'], self.fields['y-velocity'] = self.get_velocity(time_step, 
-                                                 periodic_directions=periodic_directions,
-                                                 directory=directory)
-      self.fields['vorticity'] = self.compute_vorticity()
+      self.fields['vorticity'] = self.compute_vorticity(
+                                     periodic_directions=periodic_directions,
+                                     directory=directory)
+
+  def get_field_cache(self):
+    """Returns the cache of fields read or derived by the simulation
+    (created with the default memory budget on first use,
+    emptied when the grid changes).
+
+    Returns
+    -------
+    cache: FieldCache object
+      The cache.
+    """
+    if not hasattr(self, 'field_cache'):
+      self.set_field_cache()
+    grid = getattr(self, 'grid', None)
+    if self.field_cache_grid is not grid:
+      self.field_cache.clear()
+      self.field_cache_grid = grid
+    return self.field_cache
+
+  def set_field_cache(self, max_bytes=256*1024**2, max_entries=128):
+    """Replaces the cache of fields.
+
+    Parameters
+    ----------
+    max_bytes: integer, optional
+      Maximum number of bytes held by the cached fields
+      (0 disables the cache);
+      default: 256 MiB.
+    max_entries: integer, optional
+      Maximum number of cached fields;
+      default: 128.
+    """
+    self.field_cache = FieldCache(max_bytes=max_bytes, max_entries=max_entries)
+    self.field_cache_grid = getattr(self, 'grid', None)
+
+  def get_field_files(self, field_name, time_step, directory=None):
+    """Returns the path of the solution files a field is read or derived from.
+
+    Parameters
+    ----------
+    field_name: string
+      Name of the field.
+    time_step: integer
+      Time-step of the field.
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
+
+    Returns
+    -------
+    file_paths: list of strings
+      Path of the solution files.
+    """
+    if not directory:
+      directory = self.directory
+    folder = os.path.join(directory, '{:0>7}'.format(time_step))
+    file_names = (self.pressure_file_names if field_name == 'pressure'
+                  else self.flux_file_names)
+    return [os.path.join(folder, file_name) for file_name in file_names]
+
+  def lookup_fields(self, field_names, time_step,
+                    periodic_directions=[],
+                    directory=None):
+    """Looks up fields in the cache.
+
+    Parameters
+    ----------
+    field_names: list of strings
+      Name of the fields.
+    time_step: integer
+      Time-step of the fields.
+    periodic_directions: list of strings, optional
+      Directions that uses periodic boundary conditions;
+      default: [].
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
+
+    Returns
+    -------
+    fields: list of Field objects or None
+      The cached fields; None if one of them is not cached (or outdated).
+    """
+    cache = self.get_field_cache()
+    fields = []
+    for name in field_names:
+      field = cache.get(self._get_field_key(name, time_step,
+                                            periodic_directions, directory),
+                        self.get_field_files(name, time_step, directory))
+      if field is None:
+        return None
+      fields.append(field)
+    return fields
+
+  def cache_fields(self, fields, time_step,
+                   periodic_directions=[],
+                   directory=None):
+    """Stores fields in the cache (under their label).
 
-  def compute_vorticity(self):
+    Parameters
+    ----------
+    fields: list of Field objects
+      The fields to cache.
+    time_step: integer
+      Time-step of the fields.
+    periodic_directions: list of strings, optional
+      Directions that uses periodic boundary conditions;
+      default: [].
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
+    """
+    cache = self.get_field_cache()
+    for field in fields:
+      cache.put(self._get_field_key(field.label, time_step,
+                                    periodic_directions, directory),
+                field,
+                self.get_field_files(field.label, time_step, directory))
+
+  def _get_field_key(self, field_name, time_step, periodic_directions,
+                     directory):
+    """Returns the key identifying a field in the cache."""
+    if not directory:
+      directory = self.directory
+    return (field_name, int(time_step),
+            tuple(sorted(periodic_directions)), os.path.abspath(directory))
+
+  def compute_vorticity(self, periodic_directions=[], directory=None):
     """Computes the vorticity field for a two-dimensional simulation.
 
+    When the velocity fields come from the field cache, the vorticity
+    is looked up in (and stored into) the cache as well.
+
+    Parameters
+    ----------
+    periodic_directions: list of strings, optional
+      Directions that uses periodic boundary conditions
+      (with which the velocity has been read); 
+      default: [].
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
+
     Returns
     -------
     vorticity: Field object
       The vorticity field. 
     """
     time_step = self.fields['x-velocity'].time_step
-    print('[time-step {}] computing the vorticity field ...'.format(time_step))
     u, v = self.fields['x-velocity'], self.fields['y-velocity']
-    mask_x = numpy.where(numpy.logical_and(u.x > v.x[0], u.x < v.x[-1]))[0]
-    mask_y = numpy.where(numpy.logical_and(v.y > u.y[0], v.y < u.y[-1]))[0]
+    options = (time_step, periodic_directions, directory)
+    cache = self.get_field_cache()
+    cached_velocity = all(cache.peek(self._get_field_key(field.label, *options))
+                          is field for field in (u, v))
+    if cached_velocity:
+      vorticity = self.lookup_fields(['vorticity'], *options)
+      if vorticity:
+        return vorticity[0]
+    print('[time-step {}] computing the vorticity field ...'.format(time_step))
     # vorticity nodes at cell vertices intersection
-    xw, yw = 0.5*(v.x[:-1]+v.x[1:]), 0.5*(u.y[:-1]+u.y[1:])
+    operators = self.get_grid_metrics().get_vorticity_operators([u.x, u.y],
+                                                                [v.x, v.y])
+    mask_x, mask_y = operators['x-slice'], operators['y-slice']
     # compute vorticity
-    w = ( (v.values[mask_y, 1:] - v.values[mask_y, :-1])
-          / numpy.outer(numpy.ones(yw.size), v.x[1:]-v.x[:-1])
-        - (u.values[1:, mask_x] - u.values[:-1, mask_x])
-          / numpy.outer(u.y[1:]-u.y[:-1], numpy.ones(xw.size)) )
-    return Field(label='vorticity',
-                 time_step=time_step,
-                 x=xw, y=yw, 
-                 values=w)
+    w = ( (v.values[mask_y, 1:] - v.values[mask_y, :-1]) / operators['dx']
+        - (u.values[1:, mask_x] - u.values[:-1, mask_x]) / operators['dy'] )
+    vorticity = Field(label='vorticity',
+                      time_step=time_step,
+                      x=operators['x'], y=operators['y'], 
+                      values=w)
+    if cached_velocity:
+      self.cache_fields([vorticity], *options)
+    return vorticity
+
+  def get_grid_metrics(self):
+    """Returns the metrics of the grid
+    (computed again only when the grid changes).
+
+    Returns
+    -------
+    metrics: GridMetrics object
+      The metrics of the grid.
+    """
+    metrics = getattr(self, 'grid_metrics', None)
+    if metrics is None or not metrics.describes(self.grid):
+      self.grid_metrics = GridMetrics(self.grid)
+    return self.grid_metrics
 
   def get_velocity(self, time_step, 
                    periodic_directions=[], 
-                   directory=None):
+                   directory=None,
+                   in_place=False):
     """Gets the velocity fields at a given time-step.
 
     We first read the fluxes from file, then convert into velocity-components.
@@ -177,74 +518,62 @@ class BarbaGroupSimulation(Simulation):
       Directions that uses periodic boundary conditions; 
       choices: 'x', 'y', 'z',
       default: [].
-    solution_directory: string, optional
+    directory: string, optional
       Directory containing the saved time-step folders;
       default: None.
+    in_place: boolean, optional
+      Set 'True' to convert the fluxes in their own buffers
+      (no additional full-size array is allocated);
+      default: False.
 
     Returns
     -------
     ux, uy, uz: Field objects
       Velocity in the x-, y-, and z-directions.
     """
+    options = (time_step, periodic_directions, directory)
+    velocities = self.lookup_fields(['{}-velocity'.format(direction)
+                                     for direction in 'xyz'[:len(self.grid)]],
+                                    *options)
+    if velocities:
+      return tuple(velocities)
     print('[time-step {}] get velocity fields ...'.format(time_step))
     fluxes = self.read_fluxes(time_step, 
                               periodic_directions=periodic_directions,
                               directory=directory)
-    dim3 = (len(self.grid) == 3)
-    # get stations, cell-widths, and number of cells in x- and y-directions
-    x, y = self.grid[:2]
-    dx, dy = x[1:]-x[:-1], y[1:]-y[:-1]
-    nx, ny = dx.size, dy.size
-    if dim3:
-      # get stations, cell-widths, and number of cells in z-direction
-      z = self.grid[2]
-      dz = z[1:]-z[:-1]
-      nz = dz.size
-    if dim3:
-      ux = numpy.empty_like(fluxes[0].values, dtype=numpy.float64)
-      for k in xrange(fluxes[0].shape[0]):
-        for j in xrange(fluxes[0].shape[1]):
-          for i in xrange(fluxes[0].shape[2]):
-            ux[k, j, i] = fluxes[0].values[k, j, i]/dy[j]/dz[k]
-      ux = Field(label='x-velocity',
-                 time_step=time_step,
-                 x=fluxes[0].x, y=fluxes[0].y, z=fluxes[0].z,
-                 values=ux)
-      uy = numpy.empty_like(fluxes[1].values, dtype=numpy.float64)
-      for k in xrange(fluxes[1].shape[0]):
-        for j in xrange(fluxes[1].shape[1]):
-          for i in xrange(fluxes[1].shape[2]):
-            uy[k, j, i] = fluxes[1].values[k, j, i]/dx[i]/dz[k]
-      uy = Field(label='y-velocity',
-                 time_step=time_step, 
-                 x=fluxes[1].x, y=fluxes[1].y, z=fluxes[1].z,
-                 values=uy)
-      uz = numpy.empty_like(fluxes[2].values, dtype=numpy.float64)
-      for k in xrange(fluxes[2].shape[0]):
-        for j in xrange(fluxes[2].shape[1]):
-          for i in xrange(fluxes[2].shape[2]):
-            uz[k, j, i] = fluxes[2].values[k, j, i]/dx[i]/dy[j]
-      uz = Field(label='z-velocity',
-                 time_step=time_step,
-                 x=fluxes[2].x, y=fluxes[2].y, z=fluxes[2].z,
-                 values=uz)
-      return ux, uy, uz
-    else:
-      ux = numpy.empty_like(fluxes[0].values, dtype=numpy.float64)
-      for i in xrange(fluxes[0].values.shape[1]):
-        ux[:, i] = fluxes[0].values[:, i]/dy[:]
-      ux = Field(label='x-velocity',
-                 time_step=time_step,
-                 x=fluxes[0].x, y=fluxes[0].y,
-                 values=ux)
-      uy = numpy.empty_like(fluxes[1].values, dtype=numpy.float64)
-      for j in xrange(fluxes[1].values.shape[0]):
-        uy[j, :] = fluxes[1].values[j, :]/dx[:]
-      uy = Field(label='y-velocity',
-                 time_step=time_step,
-                 x=fluxes[1].x, y=fluxes[1].y,
-                 values=uy)
-      return ux, uy
+    velocities = self.convert_fluxes(fluxes, in_place=in_place)
+    self.cache_fields(velocities, *options)
+    return velocities
+
+  def convert_fluxes(self, fluxes, in_place=False):
+    """Converts fluxes into velocity-components.
+
+    Parameters
+    ----------
+    fluxes: list of Field objects
+      Fluxes in the x-, y- (and z-) directions.
+    in_place: boolean, optional
+      Set 'True' to convert the fluxes in their own buffers
+      (no additional full-size array is allocated);
+      default: False.
+
+    Returns
+    -------
+    ux, uy, uz: Field objects
+      Velocity in the x-, y-, and z-directions.
+    """
+    inverse_areas = self.get_grid_metrics().inverse_face_areas
+    velocities = []
+    for flux, inverse_area, direction in zip(fluxes, inverse_areas, 'xyz'):
+      if in_place:
+        values = numpy.multiply(flux.values, inverse_area, out=flux.values)
+      else:
+        values = numpy.multiply(flux.values, inverse_area, dtype=numpy.float64)
+      velocities.append(Field(label='{}-velocity'.format(direction),
+                              time_step=flux.time_step,
+                              x=flux.x, y=flux.y, z=flux.z,
+                              values=values))
+    return tuple(velocities)
 
   def subtract(self, other, field_name, label=None):
     """Subtract one field to another in place.
@@ -333,7 +662,9 @@ class BarbaGroupSimulation(Simulation):
                    colorbar=True,
                    style=None,
                    width=8.0, 
-                   dpi=100): 
+                   dpi=100,
+                   reuse_figure=False,
+                   mode='contour'): 
     """Plots and saves the field.
 
     Parameters
@@ -379,6 +710,14 @@ class BarbaGroupSimulation(Simulation):
     dpi: integer, optional
       Dots per inch (resolution); 
       default: 100
+    reuse_figure: boolean, optional
+      Set 'True' to keep the figure between two calls with the same settings
+      and only replace the contour (and the time annotation);
+      default: False.
+    mode: string, optional
+      Rendering mode: 'contour' (contours traced with contourf/contour) 
+      or 'raster' (cells colored with imshow/pcolormesh, faster on large grids);
+      default: 'contour'.
     """
     # set view
     view[0] = (self.grid[0].min() if view[0] == float('-inf') else view[0])
@@ -391,7 +730,12 @@ class BarbaGroupSimulation(Simulation):
     folder = '{}_{:.2f}_{:.2f}_{:.2f}_{:.2f}'.format(field_name, *view)
     save_directory = os.path.join(save_directory, folder)
     if not os.path.isdir(save_directory):
-      os.makedirs(save_directory)
+      try:
+        os.makedirs(save_directory)
+      except OSError as error:
+        # the directory may have been created by another process
+        if error.errno != errno.EEXIST:
+          raise
     # load matplotlib style if provided and not already loaded
     if style and not hasattr(self, 'style_loaded'):
       from matplotlib import pyplot
@@ -407,17 +751,307 @@ class BarbaGroupSimulation(Simulation):
           pass
       self.style_loaded = True
     # plot contour
-    self.fields[field_name].plot_contour(field_range=field_range,
-                                         filled_contour=filled_contour,
-                                         view=view,
-                                         bodies=bodies,
-                                         time_increment=time_increment,
-                                         save_directory=save_directory,
-                                         save_name=save_name,
-                                         fmt=fmt,
-                                         colorbar=colorbar,
-                                         width=width,
-                                         dpi=dpi)
+    field = self.fields[field_name]
+    if reuse_figure:
+      settings = [field_name, field_range, filled_contour, list(view), bodies,
+                  time_increment, colorbar, width, dpi, mode]
+      cached = getattr(self, 'contour_renderer', None)
+      if (not cached or cached[0] != settings 
+          or cached[1].shape != field.values.shape):
+        if cached:
+          cached[1].close()
+        renderer = ContourRenderer(field.x, field.y, field.label,
+                                   field_range=field_range,
+                                   filled_contour=filled_contour,
+                                   view=view,
+                                   bodies=bodies,
+                                   time_increment=time_increment,
+                                   colorbar=colorbar,
+                                   width=width,
+                                   dpi=dpi,
+                                   mode=mode,
+                                   grid=self.grid)
+        self.contour_renderer = (settings, renderer)
+      self.contour_renderer[1].render(field,
+                                      save_name=save_name,
+                                      save_directory=save_directory,
+                                      fmt=fmt)
+      return
+    field.plot_contour(field_range=field_range,
+                       filled_contour=filled_contour,
+                       view=view,
+                       bodies=bodies,
+                       time_increment=time_increment,
+                       save_directory=save_directory,
+                       save_name=save_name,
+                       fmt=fmt,
+                       colorbar=colorbar,
+                       width=width,
+                       dpi=dpi,
+                       mode=mode,
+                       grid=self.grid)
+
+  def plot_contours(self, field_name, time_steps,
+                    jobs=1,
+                    periodic_directions=[],
+                    directory=None,
+                    other=None,
+                    **kwargs):
+    """Reads and plots the contour of a field at several time-steps.
+
+    With more than one job, the time-steps are spread over a pool of worker
+    processes; each worker reads and renders its time-steps with the 
+    non-interactive Agg backend and saves the same files as the serial path.
+
+    Parameters
+    ----------
+    field_name: string
+      Name of the field to plot.
+    time_steps: list of integers
+      Time-steps to plot.
+    jobs: integer, optional
+      Number of worker processes;
+      default: 1 (serial).
+    periodic_directions: list of strings, optional
+      Directions that uses periodic boundary conditions; 
+      choices: 'x', 'y', 'z',
+      default: [].
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
+    other: Simulation object, optional
+      Simulation whose field is subtracted before plotting
+      (the plotted field is then named '<field_name>-subtracted');
+      default: None.
+    **kwargs: dictionary
+      Arguments passed to the method `plot_contour`.
+    """
+    tasks = [(field_name, time_step, periodic_directions, directory, kwargs)
+             for time_step in time_steps]
+    if jobs <= 1:
+      _initialize_contour_worker(self, other, switch_backend=False)
+      try:
+        for task in tasks:
+          _plot_contour_worker(task)
+      finally:
+        # do not keep the simulations (and their fields) alive
+        _contour_worker.clear()
+      return
+    print('[info] plotting {} time-steps with {} processes ...'
+          ''.format(len(tasks), jobs))
+    pool = multiprocessing.Pool(processes=jobs,
+                                initializer=_initialize_contour_worker,
+                                initargs=(self, other))
+    try:
+      for _ in pool.imap_unordered(_plot_contour_worker, tasks, chunksize=1):
+        pass
+      pool.close()
+    except:
+      pool.terminate()
+      raise
+    finally:
+      pool.join()
+
+  def get_statistics(self, field_names, time_steps,
+                     covariances=[],
+                     cell_centers=False,
+                     jobs=1,
+                     periodic_directions=[],
+                     directory=None):
+    """Computes the time-averaged, RMS and covariance fields over time-steps,
+    reading each time-step once and keeping only running statistics.
+
+    With more than one job, the time-steps are split into contiguous ranges
+    processed by a pool of worker processes whose statistics are merged.
+
+    Parameters
+    ----------
+    field_names: list of strings or single string
+      Name of the fields;
+      choices: 'pressure', 'vorticity',
+               'x-velocity', 'y-velocity', 'z-velocity',
+               'x-flux', 'y-flux', 'z-flux'.
+    time_steps: list of integers
+      Time-steps to consider (e.g. those of the periodic regime).
+    covariances: list of 2-tuples of strings, optional
+      Pairs of fields whose covariance is computed
+      (e.g. [('x-velocity', 'y-velocity')] with cell_centers=True);
+      default: [].
+    cell_centers: boolean, optional
+      Set 'True' to interpolate the velocity components at the cell-centers
+      (same grid for all components);
+      default: False.
+    jobs: integer, optional
+      Number of worker processes;
+      default: 1 (serial).
+    periodic_directions: list of strings, optional
+      Directions that uses periodic boundary conditions; 
+      choices: 'x', 'y', 'z',
+      default: [].
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
+
+    Returns
+    -------
+    statistics: FieldStatistics object
+      The statistics (get_mean, get_rms, get_covariance return Field objects).
+    """
+    if isinstance(field_names, basestring):
+      field_names = [field_names]
+    settings = (field_names, covariances, cell_centers,
+                periodic_directions, directory)
+    return self._compute_statistics(settings, [list(time_steps)], jobs=jobs)[0]
+
+  def get_phase_averages(self, field_names, time_steps, time_increment,
+                         n_bins=8,
+                         force_index=1,
+                         method='extrema',
+                         limits=(0.0, float('inf')),
+                         order=5,
+                         cell_centers=False,
+                         jobs=1,
+                         periodic_directions=[],
+                         directory=None):
+    """Computes phase-averaged fields: the time-steps are binned according to
+    their phase within the period of a force signal (e.g. the lift)
+    and the statistics of each bin are accumulated reading each time-step once.
+
+    Parameters
+    ----------
+    field_names: list of strings or single string
+      Name of the fields;
+      choices: 'pressure', 'vorticity',
+               'x-velocity', 'y-velocity', 'z-velocity',
+               'x-flux', 'y-flux', 'z-flux'.
+    time_steps: list of integers
+      Time-steps to consider.
+    time_increment: float
+      Time-increment of the simulation (to get the time of a time-step).
+    n_bins: integer, optional
+      Number of phase bins per period;
+      default: 8.
+    force_index: integer, optional
+      Index of the force (in the list of forces read) giving the phase;
+      default: 1 (lift).
+    method: string, optional
+      How the phase is computed from the force signal;
+      choices: 'extrema' (linear between consecutive minima),
+               'hilbert' (angle of the analytic signal);
+      default: 'extrema'.
+    limits: 2-tuple of floats, optional
+      Time-limits of the force signal to consider;
+      default: (0.0, inf).
+    order: integer, optional
+      Number of neighbors used on each side to define an extremum;
+      default: 5.
+    cell_centers: boolean, optional
+      Set 'True' to interpolate the velocity components at the cell-centers;
+      default: False.
+    jobs: integer, optional
+      Number of worker processes;
+      default: 1 (serial).
+    periodic_directions: list of strings, optional
+      Directions that uses periodic boundary conditions; 
+      choices: 'x', 'y', 'z',
+      default: [].
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
+
+    Returns
+    -------
+    statistics: list of FieldStatistics objects
+      The statistics of each phase bin (bin k gathers the phases within
+      [k/n_bins, (k+1)/n_bins) of a period, starting at a minimum of the
+      force with the method 'extrema'); time-steps outside the periods
+      covered by the force signal are skipped.
+
+    Raises
+    ------
+    ValueError
+      If a phase bin gathers no time-step (its statistics would be
+      undefined); no field is read.
+    """
+    if isinstance(field_names, basestring):
+      field_names = [field_names]
+    if not self.forces:
+      raise ValueError('read the forces before computing phase-averages')
+    time_steps = list(time_steps)
+    phases = self.forces[force_index].get_phase(
+                 numpy.array(time_steps)*time_increment,
+                 method=method, limits=limits, order=order)
+    groups = [[] for _ in range(n_bins)]
+    for time_step, phase in zip(time_steps, phases):
+      if not numpy.isnan(phase):
+        groups[int(phase*n_bins) % n_bins].append(time_step)
+    print('[info] phase-averaging {} time-steps over {} bins '
+          '({} outside the force signal) ...'
+          ''.format(len(time_steps), n_bins, len(time_steps)-sum(map(len, groups))))
+    empty_bins = [index for index, group in enumerate(groups) if not group]
+    if empty_bins:
+      raise ValueError('no time-step in phase bin(s) {} (out of {} bins); '
+                       'reduce the number of bins or add time-steps'
+                       ''.format(', '.join(map(str, empty_bins)), n_bins))
+    settings = (field_names, [], cell_centers, periodic_directions, directory)
+    return self._compute_statistics(settings, groups, jobs=jobs)
+
+  def _compute_statistics(self, settings, groups, jobs=1):
+    """Computes the statistics of fields over groups of time-steps.
+
+    With more than one job, the time-steps of each group are split into
+    contiguous ranges processed by a pool of worker processes.
+
+    Parameters
+    ----------
+    settings: tuple
+      Names of the fields, covariances, cell-centers flag,
+      periodic directions and directory.
+    groups: list of lists of integers
+      Time-steps of each group.
+    jobs: integer, optional
+      Number of worker processes;
+      default: 1 (serial).
+
+    Returns
+    -------
+    statistics: list of FieldStatistics objects
+      The statistics of each group.
+    """
+    field_names, covariances = settings[:2]
+    if jobs <= 1:
+      _initialize_statistics_worker(self)
+      try:
+        return [_accumulate_statistics((settings, time_steps))
+                for time_steps in groups]
+      finally:
+        # do not keep the simulation (and its fields) alive
+        _statistics_worker.clear()
+    n_time_steps = sum(len(time_steps) for time_steps in groups)
+    print('[info] computing statistics over {} time-steps '
+          'with {} processes ...'.format(n_time_steps, jobs))
+    size = int(numpy.ceil(n_time_steps/float(jobs))) or 1
+    tasks, indices = [], []
+    for index, time_steps in enumerate(groups):
+      for start in range(0, len(time_steps), size):
+        tasks.append((settings, time_steps[start:start+size]))
+        indices.append(index)
+    statistics = [FieldStatistics(field_names, covariances=covariances)
+                  for _ in groups]
+    pool = multiprocessing.Pool(processes=jobs,
+                                initializer=_initialize_statistics_worker,
+                                initargs=(self,))
+    try:
+      for index, partial in zip(indices,
+                                pool.imap(_accumulate_statistics, tasks)):
+        statistics[index].merge(partial)
+      pool.close()
+    except:
+      pool.terminate()
+      raise
+    finally:
+      pool.join()
+    return statistics
 
   def plot_gridline_values(self, field_name, 
                            x=[], y=[], 
@@ -499,11 +1133,11 @@ class BarbaGroupSimulation(Simulation):
       Velocity at cell-centers in the x-, y-, and z-directions.
     """
     dim3 = 'z-velocity' in self.fields.keys()
-    x_centers = self.fields['y-velocity'].x[1:-1] 
-    y_centers = self.fields['x-velocity'].y[1:-1]
+    metrics = self.get_grid_metrics()
+    x_centers, y_centers = metrics.centers[0][1:-1], metrics.centers[1][1:-1]
     u, v = self.fields['x-velocity'].values, self.fields['y-velocity'].values
     if dim3:
-      z_centers = self.fields['x-velocity'].z[1:-1]
+      z_centers = metrics.centers[2][1:-1]
       w = self.fields['z-velocity'].values
       u = 0.5*(u[1:-1, 1:-1, :-1] + u[1:-1, 1:-1, 1:])
       v = 0.5*(v[1:-1, :-1, 1:-1] + v[1:-1:, 1:, 1:-1])
@@ -535,7 +1169,7 @@ class BarbaGroupSimulation(Simulation):
                 time_step=self.fields['x-velocity'].time_step, 
                 x=x_centers, y=y_centers, 
                 values=u)
-      u = Field(label='y-velocity', 
+      v = Field(label='y-velocity', 
                 time_step=self.fields['y-velocity'].time_step, 
                 x=x_centers, y=y_centers, 
                 values=v)
@@ -643,3 +1277,94 @@ class BarbaGroupSimulation(Simulation):
           numpy.savetxt(outfile, numpy.c_[values_x.flatten(),
                                           values_y.flatten()],
                         fmt='%6f', delimiter='\t')
+
+
+# state of a process plotting contours (see `BarbaGroupSimulation.plot_contours`)
+_contour_worker = {}
+
+
+def _initialize_contour_worker(simulation, other, switch_backend=True):
+  """Registers the simulations used by the current process to plot contours.
+
+  Parameters
+  ----------
+  simulation: BarbaGroupSimulation object
+    The simulation to plot.
+  other: Simulation object
+    The simulation to subtract (None if no subtraction).
+  switch_backend: boolean, optional
+    Set 'True' to use the non-interactive Agg backend of Matplotlib;
+    default: True.
+  """
+  if switch_backend:
+    from matplotlib import pyplot
+    pyplot.switch_backend('agg')
+  _contour_worker['simulation'] = simulation
+  _contour_worker['other'] = other
+
+
+def _plot_contour_worker(task):
+  """Reads and plots the contour of a field at a given time-step.
+
+  Parameters
+  ----------
+  task: 5-tuple
+    Name of the field, time-step, periodic directions, directory
+    and arguments of the method `plot_contour`.
+  """
+  field_name, time_step, periodic_directions, directory, kwargs = task
+  simulation, other = _contour_worker['simulation'], _contour_worker['other']
+  simulation.read_fields([field_name], time_step,
+                         periodic_directions=periodic_directions,
+                         directory=directory)
+  if other:
+    other.read_fields([field_name], time_step,
+                      periodic_directions=periodic_directions)
+    simulation.subtract(other, field_name, field_name+'-subtracted')
+    field_name = field_name+'-subtracted'
+  kwargs = dict(kwargs)
+  if 'view' in kwargs:
+    kwargs['view'] = list(kwargs['view'])
+  simulation.plot_contour(field_name, **kwargs)
+
+
+# state of a process computing statistics (see `BarbaGroupSimulation.get_statistics`)
+_statistics_worker = {}
+
+
+def _initialize_statistics_worker(simulation):
+  """Registers the simulation used by the current process
+  to compute statistics."""
+  _statistics_worker['simulation'] = simulation
+
+
+def _accumulate_statistics(task):
+  """Computes the statistics of fields over a range of time-steps.
+
+  Parameters
+  ----------
+  task: 2-tuple
+    Settings (names of the fields, covariances, cell-centers flag,
+    periodic directions and directory) and time-steps.
+
+  Returns
+  -------
+  statistics: FieldStatistics object
+    The statistics over the time-steps.
+  """
+  settings, time_steps = task
+  field_names, covariances, cell_centers, periodic_directions, directory = settings
+  simulation = _statistics_worker['simulation']
+  statistics = FieldStatistics(field_names, covariances=covariances)
+  names = statistics.field_names
+  for time_step in time_steps:
+    simulation.read_fields(names, time_step,
+                           periodic_directions=periodic_directions,
+                           directory=directory)
+    fields = dict((name, simulation.fields[name]) for name in names)
+    if cell_centers and any(name.endswith('-velocity') for name in names):
+      for velocity in simulation.get_velocity_cell_centers():
+        if velocity.label in fields:
+          fields[velocity.label] = velocity
+    statistics.update(fields, time_step=time_step)
+  return statistics
@@ -11,6 +11,163 @@ from matplotlib import pyplot
 from field import Field
 
 
+class ConvergenceStudy(object):
+  """Grid-convergence study in which each field is restricted onto the grid
+  of the mask only once.
+
+  The restricted fields (and the index maps of each grid) are cached; the
+  differences, observed orders, grid convergence indices and asymptotic
+  ranges are all computed from the cache.
+  """
+  def __init__(self, mask):
+    """Registers the simulation whose grids are used to restrict the fields.
+
+    Parameters
+    ----------
+    mask: Simulation object
+      Simulation whose grids are used to restrict the solutions.
+    """
+    self.mask = mask
+    self.restricted = {}
+    self.index_maps = {}
+
+  def get_grid(self, name):
+    """Returns the stations of the mask grid for a given field."""
+    return self.mask.fields[name].get_stations()
+
+  def restrict(self, field, name):
+    """Returns a field restricted onto the mask grid
+    (computed on first request only).
+
+    Parameters
+    ----------
+    field: Field object
+      The field to restrict.
+    name: string
+      Name of the field (defines the mask grid to use).
+
+    Returns
+    -------
+    restricted: Field object
+      The restricted field.
+    """
+    key = (id(field), name)
+    if key not in self.restricted:
+      stations = field.get_stations()
+      grid_key = (name,) + tuple(id(array) for array in stations)
+      if grid_key not in self.index_maps:
+        self.index_maps[grid_key] = (stations, 
+                                     field.get_restriction_indices(self.get_grid(name)))
+      indices = self.index_maps[grid_key][1]
+      # the field is kept to make sure its id is not reused
+      self.restricted[key] = (field, field.restriction(self.get_grid(name),
+                                                       indices=indices))
+    return self.restricted[key][1]
+
+  def get_difference(self, case, exact, name, norm='L2'):
+    """Returns the difference between a field and an exact solution
+    on the mask grid.
+
+    Parameters
+    ----------
+    case: Simulation object
+      The simulation.
+    exact: Solution or Simulation object
+      The exact solution.
+    name: string
+      Name of the field.
+    norm: string, optional
+      Norm used;
+      choices: 'L2', 'Linf';
+      default: 'L2'.
+
+    Returns
+    -------
+    difference: float
+      The difference in the given norm.
+    """
+    norms = {'L2': None, 'Linf': numpy.inf}
+    return numpy.linalg.norm(self.restrict(case.fields[name], name).values
+                             - self.restrict(exact.fields[name], name).values,
+                             ord=norms[norm])
+
+  def get_observed_order(self, coarse, medium, fine, name, ratio, order=None):
+    """Computes the observed order of convergence of a field
+    using the solution on three consecutive grids.
+
+    Parameters
+    ----------
+    coarse, medium, fine: Simulation objects
+      Simulations on three consecutive grids.
+    name: string
+      Name of the field.
+    ratio: float
+      Grid-refinement ratio.
+    order: non-zero integer, inf, -inf, 'fro', 'nuc', optional
+      Order of the norm;
+      default: None (L2-norm).
+
+    Returns
+    -------
+    p: float
+      The observed order of convergence.
+    """
+    return compute_observed_order(self.restrict(coarse.fields[name], name),
+                                  self.restrict(medium.fields[name], name),
+                                  self.restrict(fine.fields[name], name),
+                                  ratio, order=order)
+
+  def get_grid_convergence_index(self, coarse, fine, name, order, ratio, Fs=1.25):
+    """Computes the Grid Convergence Index of a field on the mask grid.
+
+    Parameters
+    ----------
+    coarse, fine: Simulation objects
+      Simulations on coarse and fine grids.
+    name: string
+      Name of the field.
+    order: float
+      Observed order of convergence.
+    ratio: float
+      Grid refinement ratio between the two grids.
+    Fs: float, optional
+      Safety factor;
+      default: 1.25.
+
+    Returns
+    -------
+    GCI: Field object
+      The Grid Convergence Index (in percentage) as a Field.
+    """
+    return compute_grid_convergence_index(self.restrict(coarse.fields[name], name),
+                                          self.restrict(fine.fields[name], name),
+                                          order, ratio, self.get_grid(name), Fs=Fs)
+
+  def get_asymptotic_range(self, coarse, medium, fine, name, order, ratio):
+    """Computes the asymptotic range field of a field on the mask grid.
+
+    Parameters
+    ----------
+    coarse, medium, fine: Simulation objects
+      Simulations on coarse, medium, and fine grids.
+    name: string
+      Name of the field.
+    order: float
+      Observed order of convergence.
+    ratio: float
+      Grid refinement ratio between the two consecutive grids.
+
+    Returns
+    -------
+    asymptotic_range: Field object
+      The asymptotic range as a Field.
+    """
+    gci_23 = self.get_grid_convergence_index(coarse, medium, name, order, ratio)
+    gci_12 = self.get_grid_convergence_index(medium, fine, name, order, ratio)
+    return create_asymptotic_range(gci_23, gci_12, order, ratio,
+                                   self.get_grid(name), coarse.fields[name])
+
+
 def get_exact_solution(simulations, mask, *arguments):
   """Gets the exact solution on the finest grid available.
   If no analytical solution is available, the solution on the finest grid is 
@@ -56,7 +213,8 @@ def plot_grid_convergence(simulations, exact,
                           fmt='png',
                           dpi=100,
                           style=None,
-                          show=False):
+                          show=False,
+                          study=None):
   """Plots the grid-convergence in a log-log figure.
 
   Parameters
@@ -90,8 +248,13 @@ def plot_grid_convergence(simulations, exact,
   show: boolean, optional
     Set 'True' if you want to display the figure; 
     default: False.
+  study: ConvergenceStudy object, optional
+    Study holding the restricted fields;
+    default: None (a new study is created with the mask).
   """
   print('[info] plotting the grid convergence ...')
+  if not study:
+    study = ConvergenceStudy(mask)
   try:
     pyplot.style.use(style)
   except:
@@ -108,8 +271,8 @@ def plot_grid_convergence(simulations, exact,
   norm_labels = {'L2': '$L_2$', 'Linf': '$L_\infty$'}
   for field_name in field_names:
     for norm in norms:
-      differences = [case.get_difference(exact, field_name, mask=mask, norm=norm) 
-                     for case in simulations]  
+      differences = [study.get_difference(case, exact, field_name, norm=norm) 
+                     for case in simulations]
       ax.plot(grid_spacings, differences,
               label='{} - {}-norm'.format(field_name, norm_labels[norm]), 
               marker='o', zorder=10)
@@ -139,7 +302,8 @@ def plot_grid_convergence(simulations, exact,
 
 def get_observed_orders(simulations, field_names, mask,
                         save_directory=os.getcwd(),
-                        save_name='observedOrders'):
+                        save_name='observedOrders',
+                        study=None):
   """Computes the observed orders of convergence using the solution on three grids
   with constant grid refinement ratio.
 
@@ -157,6 +321,9 @@ def get_observed_orders(simulations, field_names, mask,
   save_name: string, optional
     Prefix of the name of the .dat files to save; 
     default: 'observedOrders'.
+  study: ConvergenceStudy object, optional
+    Study holding the restricted fields;
+    default: None (a new study is created with the mask).
 
   Returns
   -------
@@ -166,16 +333,13 @@ def get_observed_orders(simulations, field_names, mask,
   print('[info] computing observed orders of '
         'convergence using the grids {} ...'
         ''.format([case.description for case in simulations]))
+  if not study:
+    study = ConvergenceStudy(mask)
   coarse, medium, fine = simulations
   ratio = coarse.get_grid_spacing()/medium.get_grid_spacing()
   alpha = {} # will contain observed order of convergence
   for name in field_names:
-    grid = [mask.fields[name].x, mask.fields[name].y]
-    alpha[name] = get_observed_order(coarse.fields[name],
-                                     medium.fields[name],
-                                     fine.fields[name],
-                                     ratio,
-                                     grid)
+    alpha[name] = study.get_observed_order(coarse, medium, fine, name, ratio)
     print('\t{}: {}'.format(name, alpha[name]))
   if save_name:
     print('[info] writing orders into .dat file ...')
@@ -215,13 +379,32 @@ def get_observed_order(coarse, medium, fine, ratio, grid, order=None):
   p: float
     The observed order of convergence.
   """
-  # restrict coarse solution onto grid
+  # restrict the solutions onto grid
   coarse = coarse.restriction(grid)
-  # restrict medium solution onto grid
   medium = medium.restriction(grid)
-  # restrict fine solution onto grid
   fine = fine.restriction(grid)
-  # observed order of convergence
+  return compute_observed_order(coarse, medium, fine, ratio, order=order)
+
+
+def compute_observed_order(coarse, medium, fine, ratio, order=None):
+  """Computes the observed order of convergence
+  using three solutions restricted onto the same grid.
+
+  Parameters
+  ----------
+  coarse, medium, fine: Field objects
+    Solutions on three consecutive grids restricted on the coarsest grid.
+  ratio: float
+    Grid-refinement ratio.
+  order: non-zero integer, inf, -inf, 'fro', 'nuc', optional
+    Order of the norm;
+    default: None (L2-norm).
+
+  Returns
+  -------
+  p: float
+    The observed order of convergence.
+  """
   p = (  numpy.log(  numpy.linalg.norm(medium.values - coarse.values, ord=order) 
                    / numpy.linalg.norm(fine.values - medium.values, ord=order)  )
        / numpy.log(ratio)  )
@@ -230,7 +413,8 @@ def get_observed_order(coarse, medium, fine, ratio, grid, order=None):
 
 def plot_asymptotic_ranges(simulations, orders, mask, 
                            save_directory=os.path.join(os.getcwd(), 'images'),
-                           style='mesnardo'):
+                           style='mesnardo',
+                           study=None):
   """Computes and plots the asymptotic range fields 
   using the grid convergence index and given the observed orders of convergence.
 
@@ -253,7 +437,12 @@ def plot_asymptotic_ranges(simulations, orders, mask,
     Name of the Matplotlib style-sheet to use.
     The .mplstyle file should be located in 'snake/styles';
     default: 'mesnardo'.
+  study: ConvergenceStudy object, optional
+    Study holding the restricted fields;
+    default: None (a new study is created with the mask).
   """
+  if not study:
+    study = ConvergenceStudy(mask)
   field_names = orders.keys()
   coarse, medium, fine = simulations
   ratio = coarse.get_grid_spacing()/medium.get_grid_spacing()
@@ -265,13 +454,8 @@ def plot_asymptotic_ranges(simulations, orders, mask,
   if not os.path.isdir(images_directory):
     os.makedirs(images_directory)
   for name in field_names:
-    grid = [mask.fields[name].x, mask.fields[name].y]
-    field = get_asymptotic_range(coarse.fields[name],
-                                 medium.fields[name],
-                                 fine.fields[name],
-                                 orders[name],
-                                 ratio,
-                                 grid)
+    field = study.get_asymptotic_range(coarse, medium, fine, name,
+                                       orders[name], ratio)
     field.plot_contour(field_range=(0.0, 2.0, 101),
                        view=[coarse.grid[0][0], coarse.grid[1][0],
                              coarse.grid[0][-1], coarse.grid[1][-1]],
@@ -306,6 +490,31 @@ def get_asymptotic_range(coarse, medium, fine, order, ratio, grid):
   """
   gci_23 = get_grid_convergence_index(coarse, medium, order, ratio, grid, Fs=1.25)
   gci_12 = get_grid_convergence_index(medium, fine, order, ratio, grid, Fs=1.25)
+  return create_asymptotic_range(gci_23, gci_12, order, ratio, grid, coarse)
+
+
+def create_asymptotic_range(gci_23, gci_12, order, ratio, grid, coarse):
+  """Creates the asymptotic range field from the grid convergence indices
+  between the coarse and medium grids and between the medium and fine grids.
+
+  Parameters
+  ----------
+  gci_23, gci_12: Field objects
+    Grid convergence indices (coarse/medium and medium/fine).
+  order: float
+    Observed order of convergence.
+  ratio: float
+    Grid refinement ratio between the two consecutive grids.
+  grid: 2-list of 1d arrays of floats
+    Nodal stations in each direction of the restricted fields.
+  coarse: Field object
+    Solution on the coarse grid (gives the time-step and the label).
+
+  Returns
+  -------
+  asymptotic_range: Field object
+    The asymptotic range as a Field.
+  """
   return Field(x=grid[0], y=grid[1],
                values=gci_23.values/(gci_12.values*ratio**order),
                time_step=coarse.time_step,
@@ -344,13 +553,40 @@ def get_grid_convergence_index(coarse, fine, order, ratio, grid, Fs=1.25):
   """
   coarse = coarse.restriction(grid)
   fine = fine.restriction(grid)
+  return compute_grid_convergence_index(coarse, fine, order, ratio, grid, Fs=Fs)
+
+
+def compute_grid_convergence_index(coarse, fine, order, ratio, grid, Fs=1.25):
+  """Computes the Grid Convergence Index using two solutions
+  restricted onto the same grid (the solutions are not modified).
+
+  Parameters
+  ----------
+  coarse, fine: Field objects
+    Solutions on coarse and fine grids, restricted onto grid.
+  order: float
+    Observed order of convergence.
+  ratio: float
+    Grid refinement ratio between the two grids.
+  grid: 2-list of 1d arrays of floats
+    Nodal stations in each direction of the restricted fields.
+  Fs: float, optional
+    Safety factor;
+    default: 1.25.
+
+  Returns
+  -------
+  GCI: Field object
+    The Grid Convergence Index (in percentage) as a Field.
+  """
+  coarse_values, fine_values = coarse.values.copy(), fine.values.copy()
   # remove small field values to avoid large estimations in the relative difference
   tolerance = 1.0E-06
-  mask = numpy.logical_or(numpy.absolute(coarse.values) < tolerance, 
-                          numpy.absolute(fine.values) < tolerance)
-  coarse.values[mask], fine.values[mask] = None, None
+  mask = numpy.logical_or(numpy.absolute(coarse_values) < tolerance, 
+                          numpy.absolute(fine_values) < tolerance)
+  coarse_values[mask], fine_values[mask] = None, None
   # compute relative differences
-  relative_differences = numpy.absolute((coarse.values-fine.values)/fine.values)
+  relative_differences = numpy.absolute((coarse_values-fine_values)/fine_values)
   return Field(x=grid[0], y=grid[1],
                values=Fs*relative_differences/(ratio**order-1.0)*100.0,
                time_step=coarse.time_step,
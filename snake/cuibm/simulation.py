@@ -4,12 +4,12 @@
 
 
 import os
-import struct
 
 import numpy
 
 from ..barbaGroupSimulation import BarbaGroupSimulation
 from ..field import Field
+from ..gridMetrics import GridMetrics
 from ..force import Force
 
 
@@ -17,6 +17,10 @@ class CuIBMSimulation(BarbaGroupSimulation):
   """Contains info about a cuIBM simulation.
   Inherits from the class BarbaGroupSimulation.
   """
+  # solution files (in each time-step folder) containing fluxes and pressure
+  flux_file_names = ['q']
+  pressure_file_names = ['lambda']
+
   def __init__(self, description=None, directory=os.getcwd(), **kwargs):
     """Initializes by calling the parent constructor.
 
@@ -46,18 +50,14 @@ class CuIBMSimulation(BarbaGroupSimulation):
     print('[info] reading grid ...')
     if not file_path:
       file_path = os.path.join(self.directory, 'grid')
-    # test if file written in binary format
-    textchars = bytearray({7,8,9,10,12,13,27} | set(range(0x20, 0x100)) - {0x7f})
-    is_binary_string = lambda bytes: bool(bytes.translate(None, textchars))
-    binary_format = is_binary_string(open(file_path, 'rb').read(1024))
-    if binary_format:
+    if is_binary_file(file_path):
       with open(file_path, 'rb') as infile:
         # x-direction
-        nx = struct.unpack('i', infile.read(4))[0]
-        x = numpy.array(struct.unpack('d'*(nx+1), infile.read(8*(nx+1))))
+        nx = numpy.fromfile(infile, dtype=numpy.int32, count=1)[0]
+        x = numpy.fromfile(infile, dtype=numpy.float64, count=nx+1)
         # y-direction
-        ny = struct.unpack('i', infile.read(4))[0]
-        y = numpy.array(struct.unpack('d'*(ny+1), infile.read(8*(ny+1))))
+        ny = numpy.fromfile(infile, dtype=numpy.int32, count=1)[0]
+        y = numpy.fromfile(infile, dtype=numpy.float64, count=ny+1)
     else:
       with open(file_path, 'r') as infile:
         data = numpy.loadtxt(infile, dtype=numpy.float64)
@@ -68,9 +68,13 @@ class CuIBMSimulation(BarbaGroupSimulation):
         ny = int(data[0])
         y = data[1:]
     self.grid = x, y
+    self.grid_metrics = GridMetrics(self.grid)
+    # layouts of the solution files depend on the grid; reset them
+    self.file_layouts = {}
     print('\tgrid-size: {}x{}'.format(x.size-1, y.size-1))
 
-  def read_forces(self, file_path=None, labels=None, usecols=(0, 1, 2)):
+  def read_forces(self, file_path=None, labels=None, usecols=(0, 1, 2),
+                  follow=False):
     """Reads forces from files.
 
     Parameters
@@ -84,20 +88,93 @@ class CuIBMSimulation(BarbaGroupSimulation):
     usecols: tuple of integers, optional
       Index of each column to read in the forces file (including the time column);
       default: (0, 1, 2)
+    follow: boolean, optional
+      Set 'True' to only read the lines appended since the previous call
+      (for a running simulation);
+      default: False.
     """
     if not file_path:
       file_path = os.path.join(self.directory, 'forces')
+    if not labels:
+      labels = ['f_x', 'f_y'] # default labels
+    if follow:
+      self.follow_forces(file_path, usecols, labels)
+      return
     print('[info] reading forces ...')
     with open(file_path, 'r') as infile:
       data = numpy.loadtxt(infile, dtype=numpy.float64, usecols=usecols, 
                            unpack=True)
     times = data[0]
-    if not labels:
-      labels = ['f_x', 'f_y'] # default labels
     self.forces = [] # reset forces if already present
     for index, values in enumerate(data[1:]):
       self.forces.append(Force(times, values, label=labels[index]))
 
+  def get_file_layout(self, file_path):
+    """Returns the layout of a solution file (format, header length and number
+    of values stored).
+
+    The layout is worked out from the first file read and cached by file name
+    for the remaining time-steps (cuIBM writes all time-steps the same way).
+
+    Parameters
+    ----------
+    file_path: string
+      Path of the solution file (e.g. '<time-step>/q' or '<time-step>/lambda').
+
+    Returns
+    -------
+    layout: dictionary of (string, object) items
+      Contains the format ('binary': True or False), the header length
+      ('offset': bytes for binary files, lines for ASCII files) and the number
+      of values in the file ('size').
+    """
+    if not hasattr(self, 'file_layouts'):
+      self.file_layouts = {}
+    name = os.path.basename(file_path)
+    if name not in self.file_layouts:
+      if is_binary_file(file_path):
+        size = numpy.fromfile(file_path, dtype=numpy.int32, count=1)[0]
+        offset = numpy.dtype(numpy.int32).itemsize
+        # check the header is consistent with the size of the file
+        assert os.path.getsize(file_path) >= offset+8*size
+        layout = {'binary': True, 'offset': offset, 'size': int(size)}
+      else:
+        with open(file_path, 'r') as infile:
+          size = int(infile.readline())
+        layout = {'binary': False, 'offset': 1, 'size': size}
+      self.file_layouts[name] = layout
+    return self.file_layouts[name]
+
+  def read_solution_file(self, file_path, count=None):
+    """Reads the values stored in a cuIBM solution file.
+
+    Binary files are memory-mapped (copy-on-write): the returned array is a
+    view into the file and values are paged-in on access.
+
+    Parameters
+    ----------
+    file_path: string
+      Path of the solution file.
+    count: integer, optional
+      Number of values to read from the beginning of the file;
+      default: None (all values).
+
+    Returns
+    -------
+    values: 1D array of floats
+      The values read.
+    """
+    layout = self.get_file_layout(file_path)
+    if not count:
+      count = layout['size']
+    assert count <= layout['size']
+    if layout['binary']:
+      return numpy.memmap(file_path, dtype=numpy.float64, mode='c',
+                          offset=layout['offset'], shape=(count,))
+    with open(file_path, 'r') as infile:
+      return numpy.loadtxt(infile, dtype=numpy.float64, 
+                           skiprows=layout['offset'])[:count]
+
   def read_fluxes(self, time_step, directory=None, **kwargs):
     """Reads the flux fields from file at a given time-step.
 
@@ -115,36 +192,25 @@ class CuIBMSimulation(BarbaGroupSimulation):
       Fluxes in the x- and y-directions.
     """
     print('[time-step {}] reading fluxes from file ...'.format(time_step))
-    # get grid-stations and number of cells along each direction
-    x, y = self.grid
-    nx, ny = x.size-1, y.size-1
+    # get number of cells along each direction and location of the fluxes
+    metrics = self.get_grid_metrics()
+    nx, ny = metrics.n_cells
     # read fluxes from file
     if not directory:
       directory = self.directory
     file_path = os.path.join(directory, '{:0>7}'.format(time_step), 'q')
-    # test if file written in binary format
-    textchars = bytearray({7,8,9,10,12,13,27} | set(range(0x20, 0x100)) - {0x7f})
-    is_binary_string = lambda bytes: bool(bytes.translate(None, textchars))
-    binary_format = is_binary_string(open(file_path, 'rb').read(1024))
-    if binary_format:
-      with open(file_path, 'rb') as infile:
-        nq = struct.unpack('i', infile.read(4))[0]
-        q = numpy.array(struct.unpack('d'*nq, infile.read(8*nq)))
-    else:
-      with open(file_path, 'r') as infile:
-        nq = int(infile.readline())
-        q = numpy.loadtxt(infile, dtype=numpy.float64)
-    # set flux Field objects
+    q = self.read_solution_file(file_path, count=(nx-1)*ny+nx*(ny-1))
+    # set flux Field objects (values are views of the array read)
+    offset = (nx-1)*ny
+    x, y = metrics.nodes['x-flux']
     qx = Field(label='x-flux',
                time_step=time_step,
-               x=x[1:-1], 
-               y=0.5*(y[:-1]+y[1:]), 
-               values=q[:(nx-1)*ny].reshape(ny, nx-1))
-    offset = qx.values.size
+               x=x, y=y,
+               values=q[:offset].reshape(ny, nx-1))
+    x, y = metrics.nodes['y-flux']
     qy = Field(label='y-flux',
                time_step=time_step, 
-               x=0.5*(x[:-1]+x[1:]), 
-               y=y[1:-1], 
+               x=x, y=y,
                values=q[offset:].reshape(ny-1, nx))
     return qx, qy
 
@@ -166,28 +232,37 @@ class CuIBMSimulation(BarbaGroupSimulation):
     """
     print('[time-step {}] reading pressure from file ...'.format(time_step))
     # get info about mesh-grid
-    x, y = self.grid
-    nx, ny = x.size-1, y.size-1
+    metrics = self.get_grid_metrics()
+    nx, ny = metrics.n_cells
     # read pressure from file
     if not directory:
       directory = self.directory
     file_path = os.path.join(directory, '{:0>7}'.format(time_step), 'lambda')
-    # test if file written in binary format
-    textchars = bytearray({7,8,9,10,12,13,27} | set(range(0x20, 0x100)) - {0x7f})
-    is_binary_string = lambda bytes: bool(bytes.translate(None, textchars))
-    binary_format = is_binary_string(open(file_path, 'rb').read(1024))
-    if binary_format:
-      with open(file_path, 'rb') as infile:
-        nlambda = struct.unpack('i', infile.read(4))[0]
-        p = numpy.array(struct.unpack('d'*nlambda, infile.read(8*nlambda)))[:nx*ny]
-    else:
-      with open(file_path, 'r') as infile:
-        nlambda = int(infile.readline())
-        p = numpy.loadtxt(infile, dtype=numpy.float64)[:nx*ny]
+    # the pressure is stored first, followed by the body forces
+    p = self.read_solution_file(file_path, count=nx*ny)
     # set pressure Field object
+    x, y = metrics.nodes['pressure']
     p = Field(label='pressure',
               time_step=time_step,
-              x=0.5*(x[:-1]+x[1:]), 
-              y=0.5*(y[:-1]+y[1:]), 
-              values=p.reshape(nx, ny))
+              x=x, y=y,
+              values=p.reshape(ny, nx))
     return p
+
+
+def is_binary_file(file_path):
+  """Checks if a file is written in binary format
+  by looking for non-text characters in its first bytes.
+
+  Parameters
+  ----------
+  file_path: string
+    Path of the file.
+
+  Returns
+  -------
+  binary_format: boolean
+    'True' if the file is written in binary format.
+  """
+  textchars = bytearray({7,8,9,10,12,13,27} | set(range(0x20, 0x100)) - {0x7f})
+  with open(file_path, 'rb') as infile:
+    return bool(infile.read(1024).translate(None, textchars))
@@ -4,21 +4,27 @@
 
 
 import os
+import collections
 
 import numpy
-from matplotlib import pyplot, cm
+from scipy import sparse
+from matplotlib import pyplot, cm, colors
 from mpl_toolkits.axes_grid1.inset_locator import inset_axes
 
 
 class Field(object):
   """Contains information about a field (pressure for example)."""
-  def __init__(self, x=None, y=None, values=None, time_step=None, label=None):
+  def __init__(self, x=None, y=None, z=None, 
+               values=None, time_step=None, label=None):
     """Initializes the field by its grid and its values.
 
     Parameters
     ----------
     x, y: Numpy 1d arrays of float
       Coordinates of the grid-nodes in each direction; default: None, None.
+    z: Numpy 1d array of float, optional
+      Coordinates of the grid-nodes in the z-direction (3D fields); 
+      default: None.
     values: Numpy 1d array of float
       Nodal values of the field; default: None.
     time_step: integer
@@ -28,7 +34,7 @@ class Field(object):
     """
     self.label = label
     self.time_step = time_step
-    self.x, self.y = x, y
+    self.x, self.y, self.z = x, y, z
     self.values = values
 
   def subtract(self, other, label=None, atol=1.0E-12):
@@ -56,7 +62,7 @@ class Field(object):
                  x=self.x, y=self.y, 
                  values=self.values-other.values)
 
-  def restriction(self, grid, atol=1.0E-12):
+  def restriction(self, grid, atol=1.0E-12, indices=None):
     """Restriction of the field solution onto a coarser grid.
     Note: all nodes on the coarse grid are present in the fine grid.
 
@@ -66,24 +72,95 @@ class Field(object):
       Nodal stations in each direction of the coarser grid.
     atol: float, optional
       Absolute tolerance used to define shared nodes between two grids;
-      default: 1.0E-06.
+      default: 1.0E-12.
+    indices: list of 1d arrays of integers, optional
+      Indices of the shared nodes in each direction, as returned by
+      `get_restriction_indices` (to reuse them between fields defined
+      on the same grid);
+      default: None (computed here).
 
     Returns
     -------
     restricted_field: Field object
       Field restricted onto the coarser grid.
     """
-    def intersection(a, b, atol=atol):
-      return numpy.any(numpy.abs(a-b[:, numpy.newaxis]) <= atol, axis=0)
-    mask_x = intersection(self.x, grid[0], atol=atol)
-    mask_y = intersection(self.y, grid[1], atol=atol)
-    return Field(x=self.x[mask_x], y=self.y[mask_y], 
-                 values=numpy.array([self.values[j][mask_x] 
-                                     for j in xrange(self.y.size)
-                                     if mask_y[j]]),
+    if indices is None:
+      indices = self.get_restriction_indices(grid, atol=atol)
+    stations = self.get_stations()
+    # values are ordered (z,) y, x
+    return Field(x=stations[0][indices[0]],
+                 y=stations[1][indices[1]],
+                 z=(stations[2][indices[2]] if len(stations) == 3 else None),
+                 values=self.values[numpy.ix_(*indices[::-1])],
                  time_step=self.time_step,
                  label=self.label+'-restricted')
 
+  def get_stations(self):
+    """Returns the nodal stations of the field in each direction."""
+    return [self.x, self.y] + ([] if self.z is None else [self.z])
+
+  def get_restriction_indices(self, grid, atol=1.0E-12):
+    """Returns the indices of the nodes of the field that are shared with
+    a coarser grid, in each direction.
+
+    Parameters
+    ----------
+    grid: list of 1d arrays of floats
+      Nodal stations in each direction of the coarser grid.
+    atol: float, optional
+      Absolute tolerance used to define shared nodes between two grids;
+      default: 1.0E-12.
+
+    Returns
+    -------
+    indices: list of 1d arrays of integers
+      Indices of the shared nodes in each direction.
+    """
+    return [get_shared_indices(stations, coarse, atol=atol)
+            for stations, coarse in zip(self.get_stations(), grid)]
+
+  def interpolate(self, grid, label=None, fill_value=numpy.nan, atol=1.0E-12):
+    """Interpolates the field onto another grid
+    (bilinear in 2D, trilinear in 3D).
+
+    The interpolation operator between the two grids is computed once and
+    cached; interpolating other fields (e.g. other time-steps) between the
+    same grids then costs a single sparse matrix-vector product.
+
+    Parameters
+    ----------
+    grid: list of 1d arrays of floats
+      Nodal stations in each direction of the target grid.
+    label: string, optional
+      Label of the Field object to create;
+      default: None (will be <current label>+'-interpolated').
+    fill_value: float, optional
+      Value at target nodes outside the grid of the field;
+      default: numpy.nan.
+    atol: float, optional
+      Absolute tolerance used to consider a target node on the boundary
+      of the grid of the field;
+      default: 1.0E-12.
+
+    Returns
+    -------
+    interpolated_field: Field object
+      Field interpolated onto the target grid.
+    """
+    if not label:
+      label = '{}-interpolated'.format(self.label)
+    grid = [numpy.asarray(stations, dtype=numpy.float64) for stations in grid]
+    matrix, outside = get_interpolation_operator(self.get_stations(), grid,
+                                                 atol=atol)
+    values = matrix.dot(numpy.asarray(self.values, dtype=numpy.float64).ravel())
+    values[outside] = fill_value
+    return Field(x=grid[0], y=grid[1],
+                 z=(grid[2] if len(grid) == 3 else None),
+                 values=values.reshape([stations.size
+                                        for stations in grid[::-1]]),
+                 time_step=self.time_step,
+                 label=label)
+
   def get_difference(self, exact, mask, norm='L2'):
     """Returns the difference between two fields in a given norm.
 
@@ -104,9 +181,14 @@ class Field(object):
       The difference using the indicated norm.
     """
     norms = {'L2': None, 'Linf': numpy.inf}
-    grid = [mask.x, mask.y]
-    field_restricted = self.restriction(grid)
-    exact_restricted = exact.restriction(grid)
+    grid = mask.get_stations()
+    indices = self.get_restriction_indices(grid)
+    field_restricted = self.restriction(grid, indices=indices)
+    # reuse the index maps if both fields are defined on the same grid
+    same_grid = all(a is b for a, b in zip(self.get_stations(),
+                                           exact.get_stations()))
+    exact_restricted = exact.restriction(grid,
+                                         indices=(indices if same_grid else None))
     return numpy.linalg.norm(field_restricted.values-exact_restricted.values, 
                              ord=norms[norm])
 
@@ -358,7 +440,9 @@ class Field(object):
                    fmt='png',
                    colorbar=True, 
                    width=8.0, 
-                   dpi=100): 
+                   dpi=100,
+                   mode='contour',
+                   grid=None): 
     """Plots and saves the field.
 
     Parameters
@@ -397,65 +481,509 @@ class Field(object):
     dpi: integer, optional
       Dots per inch (resolution); 
       default: 100
+    mode: string, optional
+      Rendering mode: 'contour' (contours traced with contourf/contour) 
+      or 'raster' (cells colored with imshow/pcolormesh, faster on large grids);
+      default: 'contour'.
+    grid: list of 1D arrays of floats, optional
+      Stations of the grid the field is defined on,
+      used to draw the cells in raster mode;
+      default: None (the cell boundaries are the midpoints between the nodes).
     """
-    if abs(self.values.min()-self.values.max()) <= 1.0E-06:
-      print('[warning] uniform field; plot contour skipped!')
-      return
+    renderer = ContourRenderer(self.x, self.y, self.label,
+                               field_range=field_range,
+                               filled_contour=filled_contour,
+                               view=view,
+                               bodies=bodies,
+                               time_increment=time_increment,
+                               colorbar=colorbar,
+                               width=width,
+                               dpi=dpi,
+                               mode=mode,
+                               grid=grid)
+    renderer.render(self,
+                    save_name=save_name,
+                    save_directory=save_directory,
+                    fmt=fmt)
+    renderer.close()
+
+
+class ContourRenderer(object):
+  """Persistent figure used to plot the contour of a field at many time-steps.
+
+  The figure, the axes, the mesh-grid, the body outlines and the colorbar 
+  (when the field range is fixed) are created once;
+  only the contour and the time annotation change between two renderings.
+
+  In raster mode, the cells are colored (no contour tracing) with the levels
+  as color boundaries and the colors of the contour bands:
+  `imshow` is used if the grid is uniform inside the view,
+  `pcolormesh` (with the actual cell boundaries) otherwise.
+  The cell boundaries are taken from the grid stations when provided.
+  """
+  def __init__(self, x, y, label,
+               field_range=None,
+               filled_contour=True,
+               view=[float('-inf'), float('-inf'), 
+                     float('inf'), float('inf')],
+               bodies=[],
+               time_increment=None,
+               colorbar=True,
+               width=8.0,
+               dpi=100,
+               mode='contour',
+               grid=None):
+    """Creates the figure.
+
+    Parameters
+    ----------
+    x, y: Numpy 1d arrays of float
+      Coordinates of the grid-nodes of the fields to plot.
+    label: string
+      Label of the fields to plot (used to choose the colormap).
+    field_range: 3-list of floats, optional
+      Min, max and number of contours to plot; 
+      default: None (range of each field plotted).
+    filled_contour: boolean, optional
+      Set 'True' to create a filled contour;
+      default: True.
+    view: 4-list of floats, optional
+      Bottom-left and top-right coordinates of the rectangular view to plot;
+      default: the whole domain.
+    bodies: list of Body objects or single Body object, optional
+      The immersed bodies to add to the figure; 
+      default: [] (no immersed body).
+    time_increment: float, optional
+      Time-increment used to advance the simulation;
+      default: None.
+    colorbar: boolean, optional
+      Set 'True' to display an horizontal colorbar 
+      at the bottom-left of the figure;
+      default: True.
+    width: float, optional
+      Width of the figure (in inches); 
+      default: 8.
+    dpi: integer, optional
+      Dots per inch (resolution); 
+      default: 100
+    mode: string, optional
+      Rendering mode: 'contour' or 'raster'
+      (in raster mode, `filled_contour` is ignored);
+      default: 'contour'.
+    grid: list of 1D arrays of floats, optional
+      Stations of the grid the fields are defined on,
+      used to draw the cells in raster mode;
+      default: None (the cell boundaries are the midpoints between the nodes).
+    """
+    if mode not in ('contour', 'raster'):
+      raise ValueError('mode should be either contour or raster')
     # convert bodies in list if single body provided
     try:
       assert isinstance(bodies, (list, tuple))
     except:
       bodies = [bodies]
-    print('[time-step {}] plotting the {} contour ...'.format(self.time_step,
-                                                              self.label))
-    height = width*(view[3]-view[1])/(view[2]-view[0])
-    fig, ax = pyplot.subplots(figsize=(width, height), dpi=dpi)
-    ax.tick_params(axis='x', labelbottom='off')
-    ax.tick_params(axis='y', labelleft='off')
-    # create filled contour
-    if field_range:
-      levels = numpy.linspace(*field_range)
-      print('\tmin={}, max={}'.format(self.values.min(), self.values.max()))
-      colorbar_ticks = numpy.linspace(field_range[0], field_range[1], 5)
-      colorbar_format = '%.01f'
-    else:
-      levels = numpy.linspace(self.values.min(), self.values.max(), 101)
-      print('\tmin={}, max={}, steps={}'.format(levels[0], levels[-1], levels.size))
-      colorbar_ticks = numpy.linspace(self.values.min(), self.values.max(), 3)
-      colorbar_format= '%.04f'
+    self.label = label
+    self.field_range = field_range
+    self.filled_contour = filled_contour
+    self.time_increment = time_increment
+    self.colorbar = colorbar
+    self.dpi = dpi
     color_map = {'pressure': cm.jet, 'vorticity': cm.RdBu_r,
                  'x-velocity': cm.RdBu_r, 'y-velocity': cm.RdBu_r}
-    X, Y = numpy.meshgrid(self.x, self.y)
-    contour_type = ax.contourf if filled_contour else ax.contour
-    cont = contour_type(X, Y, self.values, 
-                        levels=levels, extend='both', 
-                        cmap=(cm.RdBu_r if self.label not in color_map.keys()
-                                        else color_map[self.label]))
-    if colorbar:
-      ains = inset_axes(pyplot.gca(), width='30%', height='2%', loc=3)
-      cont_bar = fig.colorbar(cont, 
-                              cax=ains, orientation='horizontal',
-                              ticks=colorbar_ticks, format=colorbar_format)
-      cont_bar.ax.tick_params(labelsize=10) 
-      cont_bar.ax.xaxis.set_ticks_position('top')
-    # ax.text(0.05, 0.15, self.label, transform=ax.transAxes, fontsize=10)
+    self.cmap = (cm.RdBu_r if label not in color_map.keys()
+                           else color_map[label])
+    self.mode = mode
+    self.shape = (y.size, x.size)
+    if mode == 'raster':
+      self._set_raster_region(x, y, view, grid=grid)
+    else:
+      self.X, self.Y = numpy.meshgrid(x, y)
+    height = width*(view[3]-view[1])/(view[2]-view[0])
+    self.fig, self.ax = pyplot.subplots(figsize=(width, height), dpi=dpi)
+    self.ax.tick_params(axis='x', labelbottom='off')
+    self.ax.tick_params(axis='y', labelleft='off')
+    self.contour = None
+    self.image = None
+    self.colorbar_axes = None
+    self.time_text = None
     if time_increment:
-      ax.text(0.05, 0.85, '{} time-units'.format(time_increment*self.time_step), 
-              transform=ax.transAxes, fontsize=10)
+      self.time_text = self.ax.text(0.05, 0.85, '', 
+                                    transform=self.ax.transAxes, fontsize=10)
     # draw body
     for body in bodies:
-      ax.plot(body.x, body.y, 
-              color='black', linewidth=1, linestyle='-')
+      self.ax.plot(body.x, body.y, 
+                   color='black', linewidth=1, linestyle='-')
     # set limits
-    ax.set_xlim(view[::2])
-    ax.set_ylim(view[1::2])
-    ax.set_aspect('equal')
+    self.ax.set_xlim(view[::2])
+    self.ax.set_ylim(view[1::2])
+    self.ax.set_aspect('equal')
+
+  def render(self, field, 
+             save_name=None, 
+             save_directory=os.getcwd(), 
+             fmt='png'):
+    """Plots the contour of a field and saves the figure.
+
+    Parameters
+    ----------
+    field: Field object
+      The field to plot (defined on the grid of the renderer).
+    save_name: string, optional
+      Prefix used to save the files; 
+      default: None (the label of the field).
+    save_directory: string, optional
+      Directory where to save the image; 
+      default: '<current directory>'.
+    fmt: string, optional
+      Format of the file to save;
+      default: 'png'.
+    """
+    if abs(field.values.min()-field.values.max()) <= 1.0E-06:
+      print('[warning] uniform field; plot contour skipped!')
+      return
+    assert field.values.shape == self.shape
+    print('[time-step {}] plotting the {} contour ...'.format(field.time_step,
+                                                              field.label))
+    if self.field_range:
+      levels = numpy.linspace(*self.field_range)
+      print('\tmin={}, max={}'.format(field.values.min(), field.values.max()))
+      colorbar_ticks = numpy.linspace(self.field_range[0], 
+                                      self.field_range[1], 5)
+      colorbar_format = '%.01f'
+    else:
+      levels = numpy.linspace(field.values.min(), field.values.max(), 101)
+      print('\tmin={}, max={}, steps={}'.format(levels[0], levels[-1], 
+                                                 levels.size))
+      colorbar_ticks = numpy.linspace(field.values.min(), 
+                                      field.values.max(), 3)
+      colorbar_format= '%.04f'
+    if self.mode == 'raster':
+      mappable = self._draw_raster(field.values, levels)
+    else:
+      # replace the contour
+      if self.contour:
+        if hasattr(self.contour, 'remove'):
+          self.contour.remove()
+        else:
+          # Matplotlib<3.5: the contour set is not an artist
+          for collection in self.contour.collections:
+            collection.remove()
+      contour_type = (self.ax.contourf if self.filled_contour 
+                                       else self.ax.contour)
+      self.contour = contour_type(self.X, self.Y, field.values, 
+                                  levels=levels, extend='both', 
+                                  cmap=self.cmap)
+      mappable = self.contour
+    # the colorbar is created once when the field range is fixed
+    if self.colorbar and (not self.colorbar_axes or not self.field_range):
+      if self.colorbar_axes:
+        self.colorbar_axes.remove()
+      self.colorbar_axes = inset_axes(self.ax, 
+                                      width='30%', height='2%', loc=3)
+      # a contour set passes its own extensions to the colorbar
+      extensions = {}
+      if self.mode == 'raster':
+        extensions['extend'] = 'both'
+      cont_bar = self.fig.colorbar(mappable, 
+                                   cax=self.colorbar_axes, 
+                                   orientation='horizontal',
+                                   ticks=colorbar_ticks, 
+                                   format=colorbar_format,
+                                   **extensions)
+      cont_bar.ax.tick_params(labelsize=10) 
+      cont_bar.ax.xaxis.set_ticks_position('top')
+    if self.time_text:
+      self.time_text.set_text('{} time-units'.format(self.time_increment
+                                                     *field.time_step))
     # save image
-    save_name = (self.label if not save_name else save_name)
+    save_name = (field.label if not save_name else save_name)
     file_path = os.path.join(save_directory, '{}{:0>7}.{}'.format(save_name,
-                                                                  self.time_step,
+                                                                  field.time_step,
                                                                   fmt))
-    pyplot.savefig(file_path, 
-                   dpi=dpi, bbox_inches='tight', pad_inches=0,
-                   format=fmt)
-    pyplot.close()
+    self.fig.savefig(file_path, 
+                     dpi=self.dpi, bbox_inches='tight', pad_inches=0,
+                     format=fmt)
+    # keep the layout of the first rendering (an automatic layout would be
+    # re-computed at each rendering from the previous one)
+    self.fig.set_tight_layout(False)
+
+  def _set_raster_region(self, x, y, view, grid=None):
+    """Computes the nodes to rasterize (those inside the view, plus one on
+    each side) and the boundaries of their cells.
+
+    Nodes located at the cell-centers of the grid are drawn in the grid cells;
+    nodes located at the grid stations are drawn in the cells of the dual grid
+    (bounded by the cell-centers).
+
+    Parameters
+    ----------
+    x, y: Numpy 1d arrays of float
+      Coordinates of the grid-nodes.
+    view: 4-list of floats
+      Bottom-left and top-right coordinates of the view.
+    grid: list of 1D arrays of floats, optional
+      Stations of the grid;
+      default: None (the boundaries are the midpoints between the nodes).
+    """
+    def get_slice(nodes, start, end):
+      indices = numpy.where(numpy.logical_and(nodes >= start, 
+                                              nodes <= end))[0]
+      if indices.size == 0:
+        return slice(None)
+      return slice(max(indices[0]-1, 0), indices[-1]+2)
+
+    def get_cell_boundaries(nodes, stations):
+      if stations is not None and stations.size > 1:
+        centers = 0.5*(stations[:-1]+stations[1:])
+        duals = numpy.concatenate(([stations[0]], centers, [stations[-1]]))
+        for locations, boundaries in [(centers, stations), (stations, duals)]:
+          start = numpy.abs(locations-nodes[0]).argmin()
+          end = start+nodes.size
+          if (end <= locations.size 
+              and numpy.allclose(locations[start:end], nodes)):
+            return boundaries[start:end+1]
+      if nodes.size == 1:
+        return numpy.array([nodes[0]-0.5, nodes[0]+0.5])
+      middles = 0.5*(nodes[:-1]+nodes[1:])
+      return numpy.concatenate(([2.0*nodes[0]-middles[0]], middles, 
+                                [2.0*nodes[-1]-middles[-1]]))
+
+    def is_uniform(boundaries):
+      widths = boundaries[1:]-boundaries[:-1]
+      return numpy.allclose(widths, widths[0], rtol=1.0E-06, atol=0.0)
+
+    if grid is None:
+      grid = [None, None]
+    else:
+      grid = [numpy.asarray(stations, dtype=numpy.float64) 
+              for stations in grid[:2]]
+    self.raster_region = (get_slice(y, view[1], view[3]), 
+                          get_slice(x, view[0], view[2]))
+    x, y = x[self.raster_region[1]], y[self.raster_region[0]]
+    self.raster_x_edges = get_cell_boundaries(x, grid[0])
+    self.raster_y_edges = get_cell_boundaries(y, grid[1])
+    self.raster_uniform = (is_uniform(self.raster_x_edges) 
+                           and is_uniform(self.raster_y_edges))
+
+  def _draw_raster(self, values, levels):
+    """Creates (first rendering) or updates the raster image of the field.
+
+    Parameters
+    ----------
+    values: Numpy 2d array of floats
+      Values of the field.
+    levels: 1d array of floats
+      Levels used as boundaries between colors.
+
+    Returns
+    -------
+    image: AxesImage or QuadMesh object
+      The raster image.
+    """
+    values = values[self.raster_region]
+    n_bands = levels.size-1
+    norm = colors.BoundaryNorm(levels, n_bands)
+    if self.image is None:
+      # color of each band taken at its middle (as for a filled contour),
+      # colors of the lowest and highest levels for the extensions
+      cmap = colors.ListedColormap(self.cmap((numpy.arange(n_bands)+0.5)
+                                             /n_bands))
+      cmap.set_under(self.cmap(0.0))
+      cmap.set_over(self.cmap(1.0))
+      if self.raster_uniform:
+        extent = (self.raster_x_edges[0], self.raster_x_edges[-1],
+                  self.raster_y_edges[0], self.raster_y_edges[-1])
+        self.image = self.ax.imshow(values, origin='lower', extent=extent,
+                                    interpolation='nearest', aspect='equal',
+                                    cmap=cmap, norm=norm)
+      else:
+        self.image = self.ax.pcolormesh(self.raster_x_edges, 
+                                        self.raster_y_edges, 
+                                        values,
+                                        cmap=cmap, norm=norm)
+    else:
+      if self.raster_uniform:
+        self.image.set_data(values)
+      else:
+        self.image.set_array(values.ravel())
+      if not self.field_range:
+        self.image.set_norm(norm)
+    return self.image
+
+  def close(self):
+    """Closes the figure."""
+    pyplot.close(self.fig)
+
+
+def get_shared_indices(a, b, atol=1.0E-12):
+  """Returns the indices of the elements of a 1D array that are equal
+  (within a tolerance) to an element of another 1D array.
+
+  Each element of `a` is compared to its closest neighbors in `b`,
+  found by binary search in the sorted `b`.
+
+  Parameters
+  ----------
+  a: 1D array of floats
+    The array whose elements are searched.
+  b: 1D array of floats
+    The array to match.
+  atol: float, optional
+    Absolute tolerance;
+    default: 1.0E-12.
+
+  Returns
+  -------
+  indices: 1D array of integers
+    Indices (in increasing order) of the elements of `a` found in `b`.
+  """
+  a = numpy.asarray(a, dtype=numpy.float64)
+  b = numpy.sort(numpy.asarray(b, dtype=numpy.float64))
+  if b.size == 0:
+    return numpy.empty(0, dtype=numpy.intp)
+  right = numpy.clip(numpy.searchsorted(b, a), 0, b.size-1)
+  left = numpy.clip(right-1, 0, b.size-1)
+  distance = numpy.minimum(numpy.abs(a-b[left]), numpy.abs(a-b[right]))
+  return numpy.flatnonzero(distance <= atol)
+
+
+# interpolation operators between pairs of grids (most-recently used last)
+_interpolation_operators = collections.OrderedDict()
+_max_interpolation_operators = 16
+
+
+def get_interpolation_operator(source, target, atol=1.0E-12):
+  """Returns the sparse operator interpolating (multi-)linearly values
+  defined on a source grid onto a target grid.
+
+  Operators are cached for the last pairs of grids used.
+
+  Parameters
+  ----------
+  source: list of 1d arrays of floats
+    Stations in each direction of the source grid (increasing order).
+  target: list of 1d arrays of floats
+    Stations in each direction of the target grid.
+  atol: float, optional
+    Absolute tolerance used to consider a target node on the boundary
+    of the source grid;
+    default: 1.0E-12.
+
+  Returns
+  -------
+  matrix: scipy.sparse.csr_matrix object
+    Operator of shape (number of target nodes, number of source nodes)
+    applied to the values flattened in C-order ((z,) y, x).
+  outside: 1d array of integers
+    Indices of the target nodes located outside the source grid.
+  """
+  key = (tuple(numpy.asarray(a, dtype=numpy.float64).tobytes() for a in source),
+         tuple(numpy.asarray(a, dtype=numpy.float64).tobytes() for a in target),
+         atol)
+  if key in _interpolation_operators:
+    _interpolation_operators[key] = _interpolation_operators.pop(key)
+    return _interpolation_operators[key]
+  # (z,) y, x order to match the layout of the values
+  source, target = source[::-1], target[::-1]
+  indices, weights, inside = zip(*[get_linear_weights(a, b, atol=atol)
+                                   for a, b in zip(source, target)])
+  source_shape = [a.size for a in source]
+  target_shape = [b.size for b in target]
+  rows = numpy.arange(numpy.prod(target_shape)).reshape(target_shape)
+  data, row_indices, column_indices = [], [], []
+  # contribution of each corner of the cells containing the target nodes
+  for corner in numpy.ndindex(*([2]*len(source))):
+    corner_indices, corner_weights = [], numpy.ones(target_shape)
+    for axis, (i, w, offset) in enumerate(zip(indices, weights, corner)):
+      shape = [1]*len(source)
+      shape[axis] = -1
+      corner_indices.append((i+offset).reshape(shape))
+      corner_weights = corner_weights*(w if offset else 1.0-w).reshape(shape)
+    columns = numpy.ravel_multi_index(numpy.broadcast_arrays(*corner_indices),
+                                      source_shape)
+    data.append(corner_weights.ravel())
+    row_indices.append(rows.ravel())
+    column_indices.append(columns.ravel())
+  matrix = sparse.csr_matrix((numpy.concatenate(data),
+                              (numpy.concatenate(row_indices),
+                               numpy.concatenate(column_indices))),
+                             shape=(rows.size, numpy.prod(source_shape)))
+  inside = numpy.ix_(*inside)
+  mask = numpy.ones(target_shape, dtype=bool)
+  mask[inside] = False
+  outside = numpy.flatnonzero(mask)
+  _interpolation_operators[key] = (matrix, outside)
+  while len(_interpolation_operators) > _max_interpolation_operators:
+    _interpolation_operators.popitem(last=False)
+  return matrix, outside
+
+
+def get_interpolation_stencil(source, points, atol=1.0E-12):
+  """Returns the stencils interpolating (multi-)linearly values defined on
+  a grid at scattered points.
+
+  Parameters
+  ----------
+  source: list of 1d arrays of floats
+    Stations in each direction of the grid (increasing order).
+  points: 2d array of floats
+    Coordinates of the points; shape (number of points, number of directions).
+  atol: float, optional
+    Absolute tolerance used to consider a point on the boundary of the grid;
+    default: 1.0E-12.
+
+  Returns
+  -------
+  indices: tuple of 2d arrays of integers
+    Indices ((z,) y, x order) of the grid nodes of each stencil;
+    each array has shape (2**(number of directions), number of points).
+  weights: 2d array of floats
+    Weights of the grid nodes of each stencil.
+  outside: 1d array of booleans
+    True for the points located outside the grid.
+  """
+  points = numpy.atleast_2d(numpy.asarray(points, dtype=numpy.float64))
+  # (z,) y, x order to match the layout of the values
+  source, coordinates = source[::-1], points.T[::-1]
+  indices, weights, inside = zip(*[get_linear_weights(a, b, atol=atol)
+                                   for a, b in zip(source, coordinates)])
+  corners = list(numpy.ndindex(*([2]*len(source))))
+  stencil_indices = tuple(numpy.array([i+corner[axis] for corner in corners])
+                          for axis, i in enumerate(indices))
+  stencil_weights = numpy.ones((len(corners), points.shape[0]))
+  for n, corner in enumerate(corners):
+    for w, offset in zip(weights, corner):
+      stencil_weights[n] *= (w if offset else 1.0-w)
+  outside = numpy.logical_not(numpy.all(inside, axis=0))
+  return stencil_indices, stencil_weights, outside
+
+
+def get_linear_weights(a, b, atol=1.0E-12):
+  """Locates points in a 1D grid and returns their linear interpolation
+  weights.
+
+  Parameters
+  ----------
+  a: 1d array of floats
+    Stations of the grid (increasing order).
+  b: 1d array of floats
+    Coordinates of the points.
+  atol: float, optional
+    Absolute tolerance used to consider a point on the boundary of the grid;
+    default: 1.0E-12.
+
+  Returns
+  -------
+  i: 1d array of integers
+    Index of the left station of the interval containing each point.
+  w: 1d array of floats
+    Weight of the right station (the left one has weight 1-w).
+  inside: 1d array of booleans
+    True for the points located inside the grid.
+  """
+  a = numpy.asarray(a, dtype=numpy.float64)
+  b = numpy.asarray(b, dtype=numpy.float64)
+  i = numpy.clip(numpy.searchsorted(a, b, side='right')-1, 0, a.size-2)
+  w = numpy.clip((b-a[i])/(a[i+1]-a[i]), 0.0, 1.0)
+  inside = numpy.logical_and(b >= a[0]-atol, b <= a[-1]+atol)
+  return i, w, inside
@@ -0,0 +1,149 @@
+# file: fieldCache.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Implementation of the class `FieldCache`.
+
+
+import os
+import collections
+import threading
+
+
+class FieldCache(object):
+  """Least-recently-used cache of Field objects with a memory budget.
+
+  Each entry records the modification time (and size) of the files it was
+  read or derived from; the entry is discarded when one of them changes.
+  The values of a cached field are made read-only: the cached Field object
+  is shared by all the readers, so it should be copied before being modified.
+  """
+  def __init__(self, max_bytes=256*1024**2, max_entries=128):
+    """Creates an empty cache.
+
+    Parameters
+    ----------
+    max_bytes: integer, optional
+      Maximum number of bytes held by the values of the cached fields
+      (0 disables the cache);
+      default: 256 MiB.
+    max_entries: integer, optional
+      Maximum number of cached fields (memory-mapped values keep their file
+      open);
+      default: 128.
+    """
+    self.max_bytes = max(0, int(max_bytes))
+    self.max_entries = max(0, int(max_entries))
+    self.entries = collections.OrderedDict()
+    self.nbytes = 0
+    self.hits, self.misses, self.evictions = 0, 0, 0
+    self.lock = threading.Lock()
+
+  def __len__(self):
+    return len(self.entries)
+
+  def __contains__(self, key):
+    return key in self.entries
+
+  def __repr__(self):
+    return ('FieldCache(entries={}/{}, nbytes={}/{}, '
+            'hits={}, misses={}, evictions={})'
+            ''.format(len(self), self.max_entries, self.nbytes, self.max_bytes,
+                      self.hits, self.misses, self.evictions))
+
+  def get(self, key, file_paths=[]):
+    """Returns a cached field, or None if the field is not cached
+    or if one of its source files has changed since it was cached.
+
+    Parameters
+    ----------
+    key: hashable
+      Identifier of the field.
+    file_paths: list of strings, optional
+      Files the field is read or derived from;
+      default: [].
+
+    Returns
+    -------
+    field: Field object or None
+      The cached field (shared, with read-only values).
+    """
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is not None and entry['stamps'] != get_file_stamps(file_paths):
+        self._discard(key)
+        entry = None
+      if entry is None:
+        self.misses += 1
+        return None
+      self.entries[key] = self.entries.pop(key)  # most-recently used
+      self.hits += 1
+      return entry['field']
+
+  def peek(self, key):
+    """Returns a cached field without checking its source files
+    nor updating the counters and the order of use (None if not cached)."""
+    entry = self.entries.get(key)
+    return None if entry is None else entry['field']
+
+  def put(self, key, field, file_paths=[]):
+    """Caches a field, evicting the least-recently-used entries
+    to stay within the memory budget.
+
+    Parameters
+    ----------
+    key: hashable
+      Identifier of the field.
+    field: Field object
+      The field to cache (its values are made read-only once cached).
+    file_paths: list of strings, optional
+      Files the field is read or derived from;
+      default: [].
+    """
+    nbytes = field.values.nbytes
+    with self.lock:
+      if key in self.entries:
+        self._discard(key)
+      if not (self.max_bytes and self.max_entries) or nbytes > self.max_bytes:
+        return
+      while (self.nbytes+nbytes > self.max_bytes
+             or len(self.entries) >= self.max_entries):
+        self._discard(next(iter(self.entries)))
+        self.evictions += 1
+      field.values.flags.writeable = False
+      self.entries[key] = {'field': field,
+                           'stamps': get_file_stamps(file_paths),
+                           'nbytes': nbytes}
+      self.nbytes += nbytes
+
+  def clear(self):
+    """Empties the cache (the counters are kept)."""
+    with self.lock:
+      self.entries.clear()
+      self.nbytes = 0
+
+  def _discard(self, key):
+    """Removes an entry from the cache."""
+    self.nbytes -= self.entries.pop(key)['nbytes']
+
+
+def get_file_stamps(file_paths):
+  """Returns the modification time and the size of files
+  (None for a file that does not exist).
+
+  Parameters
+  ----------
+  file_paths: list of strings
+    Path of the files.
+
+  Returns
+  -------
+  stamps: tuple
+    The (modification time, size) of each file.
+  """
+  stamps = []
+  for file_path in file_paths:
+    try:
+      info = os.stat(file_path)
+      stamps.append((info.st_mtime, info.st_size))
+    except OSError:
+      stamps.append(None)
+  return tuple(stamps)
@@ -0,0 +1,185 @@
+# file: fieldStatistics.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Implementation of the class `FieldStatistics`.
+
+
+import copy
+
+import numpy
+
+from .field import Field
+
+
+class FieldStatistics(object):
+  """Running statistics (mean, variance and covariance) of fields over
+  time-steps, updated one snapshot at a time (Welford's algorithm).
+
+  Partial statistics computed over different time-steps (e.g. by different
+  processes) can be merged.
+  """
+  def __init__(self, field_names, covariances=[]):
+    """Creates empty statistics.
+
+    Parameters
+    ----------
+    field_names: list of strings
+      Name of the fields.
+    covariances: list of 2-tuples of strings, optional
+      Pairs of fields whose covariance is computed
+      (the two fields must be defined on the same grid);
+      default: [].
+    """
+    self.field_names = list(field_names)
+    self.covariances = [tuple(pair) for pair in covariances]
+    for pair in self.covariances:
+      for name in pair:
+        if name not in self.field_names:
+          self.field_names.append(name)
+    self.count = 0
+    self.time_steps = []
+    self.grids = {}
+    self.means, self.squares, self.products = {}, {}, {}
+
+  def update(self, fields, time_step=None):
+    """Adds a snapshot to the statistics.
+
+    Parameters
+    ----------
+    fields: dictionary of (string, Field object) items
+      The fields of the snapshot.
+    time_step: integer, optional
+      Time-step of the snapshot;
+      default: None (time-step of the fields).
+    """
+    self.count += 1
+    if time_step is None:
+      time_step = fields[self.field_names[0]].time_step
+    self.time_steps.append(time_step)
+    deltas = {}
+    for name in self.field_names:
+      values = numpy.asarray(fields[name].values, dtype=numpy.float64)
+      if self.count == 1:
+        field = fields[name]
+        self.grids[name] = (field.x, field.y, field.z)
+        self.means[name] = numpy.zeros(values.shape, dtype=numpy.float64)
+        self.squares[name] = numpy.zeros(values.shape, dtype=numpy.float64)
+      # deviation from the previous mean
+      deltas[name] = values-self.means[name]
+      self.means[name] += deltas[name]/self.count
+      self.squares[name] += deltas[name]*(values-self.means[name])
+    for a, b in self.covariances:
+      if self.count == 1:
+        if self.means[a].shape != self.means[b].shape:
+          raise ValueError('cannot compute the covariance of {} and {} '
+                           '(different grids)'.format(a, b))
+        self.products[a, b] = numpy.zeros(self.means[a].shape,
+                                          dtype=numpy.float64)
+      values_b = numpy.asarray(fields[b].values, dtype=numpy.float64)
+      self.products[a, b] += deltas[a]*(values_b-self.means[b])
+
+  def merge(self, other):
+    """Merges the statistics computed over other time-steps
+    (in place; the other statistics are left unchanged).
+
+    Parameters
+    ----------
+    other: FieldStatistics object
+      The statistics to merge.
+
+    Returns
+    -------
+    self: FieldStatistics object
+      The merged statistics.
+    """
+    if other.count == 0:
+      return self
+    if self.count == 0:
+      # copy the state: merging into self must not modify other
+      self.__dict__.update(copy.deepcopy(other.__dict__))
+      return self
+    count = self.count+other.count
+    factor = float(self.count)*other.count/count
+    deltas = {}
+    for name in self.field_names:
+      deltas[name] = other.means[name]-self.means[name]
+      self.means[name] += deltas[name]*other.count/count
+      self.squares[name] += other.squares[name] + deltas[name]**2*factor
+    for a, b in self.covariances:
+      self.products[a, b] += (other.products[a, b]
+                              + deltas[a]*deltas[b]*factor)
+    self.count = count
+    self.time_steps = sorted(self.time_steps+other.time_steps)
+    return self
+
+  def get_mean(self, name):
+    """Returns the time-averaged field.
+
+    Parameters
+    ----------
+    name: string
+      Name of the field.
+
+    Returns
+    -------
+    mean: Field object
+      The time-averaged field.
+    """
+    return self._create_field(name, self.means[name], name+'-mean')
+
+  def get_variance(self, name):
+    """Returns the variance of the field (biased estimate: divided by the
+    number of snapshots).
+
+    Parameters
+    ----------
+    name: string
+      Name of the field.
+
+    Returns
+    -------
+    variance: Field object
+      The variance of the field.
+    """
+    return self._create_field(name, self.squares[name]/self.count,
+                              name+'-variance')
+
+  def get_rms(self, name):
+    """Returns the root-mean-square of the fluctuations of the field.
+
+    Parameters
+    ----------
+    name: string
+      Name of the field.
+
+    Returns
+    -------
+    rms: Field object
+      The root-mean-square of the fluctuations.
+    """
+    return self._create_field(name, numpy.sqrt(self.squares[name]/self.count),
+                              name+'-rms')
+
+  def get_covariance(self, a, b):
+    """Returns the covariance of two fields
+    (e.g. the Reynolds shear-stress from the velocity components).
+
+    Parameters
+    ----------
+    a, b: strings
+      Name of the fields (pair given at creation).
+
+    Returns
+    -------
+    covariance: Field object
+      The covariance of the two fields.
+    """
+    return self._create_field(a, self.products[a, b]/self.count,
+                              '{}-{}-covariance'.format(a, b))
+
+  def _create_field(self, name, values, label):
+    """Creates a Field object defined on the grid of a field."""
+    x, y, z = self.grids[name]
+    return Field(x=x, y=y, z=z,
+                 values=values,
+                 time_step=(self.time_steps[-1] if self.time_steps else None),
+                 label=label)
@@ -4,7 +4,7 @@
 
 
 import numpy
-from scipy import signal
+from scipy import signal, ndimage
 
 
 class Force(object):
@@ -85,10 +85,21 @@ class Force(object):
   def get_extrema(self, limits=(0.0, float('inf')), order=5):
     """Computes masks (i.e. arrays of indices) of the extrema of the force.
 
+    The signal is restricted to the time-limits (plus `order` points on each
+    side) before the search, and the result is memoized for the given
+    time-limits and order.
+    The memoized extrema are discarded when `times` or `values` is replaced
+    by another array; in-place modifications of the arrays are not detected.
+
     Parameters
     ----------
-    order: integer, optional
-      Number of neighboring points used to define an extremum; 
+    limits: 2-tuple of floats, optional
+      Time-limits of the search; 
+      default: (0.0, inf).
+    order: integer or string, optional
+      Number of neighboring points used to define an extremum;
+      'auto' uses a quarter of a rough estimate of the period
+      (see `get_extremum_order`); 
       default: 5.
 
     Returns
@@ -98,18 +109,106 @@ class Force(object):
     maxima: 1D array of integers
       Index of all maxima.
     """
-    minima = signal.argrelextrema(self.values, numpy.less_equal, 
-                                  order=order)[0][:-1]
-    maxima = signal.argrelextrema(self.values, numpy.greater_equal, 
-                                  order=order)[0][:-1]
+    if order == 'auto':
+      order = self.get_extremum_order(limits=limits)
+    order = int(order)
+    key = (float(limits[0]), float(limits[1]), order)
+    extrema = self._get_extrema_cache()
+    if key in extrema:
+      return extrema[key]
+    start = numpy.searchsorted(self.times, limits[0], side='left')
+    end = numpy.searchsorted(self.times, limits[1], side='right')
+    if start >= end:
+      minima, maxima = numpy.array([], dtype=int), numpy.array([], dtype=int)
+    else:
+      # points within `order` of the window keep the same neighborhood
+      lo, hi = max(0, start-order), min(len(self.values), end+order)
+      minima, maxima = self._find_extrema(lo, hi, order)
+      # the last extremum of the whole signal is discarded
+      last_minimum, last_maximum = self._find_last_extrema(order)
+      minima = minima[(minima >= start) & (minima < end)
+                      & (minima != last_minimum)]
+      maxima = maxima[(maxima >= start) & (maxima < end)
+                      & (maxima != last_maximum)]
+      # remove indices that are too close
+      minima = minima[numpy.append(True, numpy.diff(minima) > order)
+                      [:minima.size]]
+      maxima = maxima[numpy.append(True, numpy.diff(maxima) > order)
+                      [:maxima.size]]
+    minima.flags.writeable = False
+    maxima.flags.writeable = False
+    extrema[key] = minima, maxima
+    return minima, maxima
+
+  def _find_extrema(self, lo, hi, order):
+    """Returns the indices of the minima and maxima of a slice of the signal
+    (an extremum is the smallest or largest value of its neighborhood,
+    the edges of the slice being repeated as in `argrelextrema`)."""
+    values = numpy.asarray(self.values[lo:hi])
+    size = 2*order+1
+    lowest = ndimage.minimum_filter1d(values, size, mode='nearest')
+    highest = ndimage.maximum_filter1d(values, size, mode='nearest')
+    return (numpy.flatnonzero(values <= lowest)+lo,
+            numpy.flatnonzero(values >= highest)+lo)
+
+  def _find_last_extrema(self, order):
+    """Returns the index of the last minimum and last maximum of the whole
+    signal (-1 if none), searching backward from the end."""
+    n = len(self.values)
+    size = max(4*order, 1024)
+    last_minimum, last_maximum = -1, -1
+    while True:
+      lo = max(0, n-size)
+      minima, maxima = self._find_extrema(lo, n, order)
+      # points within `order` of the start of the slice may be wrong
+      first = (lo+order if lo > 0 else 0)
+      minima, maxima = minima[minima >= first], maxima[maxima >= first]
+      if last_minimum < 0 and minima.size:
+        last_minimum = minima[-1]
+      if last_maximum < 0 and maxima.size:
+        last_maximum = maxima[-1]
+      if lo == 0 or (last_minimum >= 0 and last_maximum >= 0):
+        return last_minimum, last_maximum
+      size *= 2
+
+  def _get_extrema_cache(self):
+    """Returns the memoized extrema of the current signal (emptied when the
+    times or values are other arrays than those of the memoized extrema)."""
+    times, values, extrema = getattr(self, '_extrema', (None, None, None))
+    if (extrema is None or times is not self.times
+        or values is not self.values):
+      extrema = {}
+      # the arrays are referenced (not their id) so they cannot be reused
+      self._extrema = (self.times, self.values, extrema)
+    return extrema
+
+  def get_extremum_order(self, limits=(0.0, float('inf')), fraction=0.25):
+    """Estimates the number of neighbors defining an extremum from
+    the time-increment and a rough period of the signal
+    (peak of the windowed FFT of the signal).
+
+    Parameters
+    ----------
+    limits: 2-tuple of floats, optional
+      Time-limits to consider; 
+      default: (0.0, inf).
+    fraction: float, optional
+      Fraction of the period covered by the neighbors on each side;
+      default: 0.25.
+
+    Returns
+    -------
+    order: integer
+      The number of neighbors.
+    """
     mask = numpy.where(numpy.logical_and(self.times >= limits[0],
                                          self.times <= limits[1]))[0]
-    minima = numpy.intersect1d(minima, mask, assume_unique=True)
-    maxima = numpy.intersect1d(maxima, mask, assume_unique=True)
-    # remove indices that are too close
-    minima = minima[numpy.append(True, minima[1:]-minima[:-1] > order)]
-    maxima = maxima[numpy.append(True, maxima[1:]-maxima[:-1] > order)]
-    return minima, maxima
+    if mask.size < 4:
+      return 1
+    dt = (self.times[mask[-1]]-self.times[mask[0]])/(mask.size-1)
+    frequency = get_spectral_strouhals([self], limits=limits,
+                                       method='fft')['frequencies'][0]
+    return max(1, int(fraction/(frequency*dt)))
 
   def get_strouhal(self, L=1.0, U=1.0, limits=(0.0, float('inf')), order=5):
     """Computes the Strouhal number based on the frequency of the signal.
@@ -146,4 +245,200 @@ class Force(object):
                      'time-limits': (self.times[minima[0]], self.times[minima[-1]]),
                      'values': strouhals,
                      'mean': strouhals.mean()}
-    return self.strouhal
\ No newline at end of file
+    return self.strouhal
+
+  def get_spectral_strouhal(self, L=1.0, U=1.0, limits=(0.0, float('inf')),
+                            method='welch', window='hann', n_per_segment=None):
+    """Computes the Strouhal number from the dominant frequency of the
+    power spectral density of the signal.
+
+    The signal is resampled with a uniform time-increment (if needed), its
+    spectrum is computed with a windowed FFT or Welch's method, and the peak
+    is refined by parabolic interpolation of the log-spectrum around the
+    maximum bin.
+
+    Parameters
+    ----------
+    L: float, optional
+      Characteristics length of the body; 
+      default: 1.0.
+    U: float, optional
+      Characteristics velocity of the body; 
+      default: 1.0.
+    limits: 2-tuple of floats, optional
+      Time-limits used to compute the spectrum; 
+      default: (0.0, inf).
+    method: string, optional
+      Spectral estimator;
+      choices: 'fft' (single window over the whole signal), 'welch';
+      default: 'welch'.
+    window: string, optional
+      Name of the window (see `scipy.signal.get_window`);
+      default: 'hann'.
+    n_per_segment: integer, optional
+      Number of samples per segment ('welch' method);
+      default: None (a quarter of the signal).
+
+    Returns
+    -------
+    strouhal: dictionary
+      Returns the Strouhal number (same keys as `get_strouhal`: 'mean',
+      'values', 'time-limits' and the approximate 'n-periods'),
+      and the peak frequency.
+    """
+    strouhals = get_spectral_strouhals([self], L=L, U=U, limits=limits,
+                                       method=method, window=window,
+                                       n_per_segment=n_per_segment)
+    start, end = strouhals['time-limits'][0]
+    frequency = strouhals['frequencies'][0]
+    self.strouhal = {'n-periods': int(round(frequency*(end-start))),
+                     'time-limits': (start, end),
+                     'values': strouhals['values'][:1],
+                     'mean': strouhals['values'][0],
+                     'frequency': frequency}
+    return self.strouhal
+
+  def get_phase(self, times, method='extrema',
+                limits=(0.0, float('inf')), order=5):
+    """Computes the phase of the signal (in [0, 1), one unit per period)
+    at given times.
+
+    Parameters
+    ----------
+    times: 1D array of floats
+      Times at which the phase is computed.
+    method: string, optional
+      'extrema': the phase grows linearly between two consecutive minima
+      (each minimum starts a period);
+      'hilbert': angle of the analytic signal (Hilbert transform) of the
+      signal minus its mean, shifted to be zero at the minima;
+      default: 'extrema'.
+    limits: 2-tuple of floats, optional
+      Time-limits of the signal to consider;
+      default: (0.0, inf).
+    order: integer, optional
+      Number of neighbors used on each side to define an extremum
+      ('extrema' method);
+      default: 5.
+
+    Returns
+    -------
+    phase: 1D array of floats
+      The phase at each time (NaN outside the periods covered).
+    """
+    times = numpy.asarray(times, dtype=numpy.float64)
+    phase = numpy.empty(times.shape)
+    phase.fill(numpy.nan)
+    if method == 'extrema':
+      minima, _ = self.get_extrema(limits=limits, order=order)
+      starts = self.times[minima]
+      if starts.size < 2:
+        return phase
+      inside = numpy.logical_and(times >= starts[0], times < starts[-1])
+      k = numpy.searchsorted(starts, times[inside], side='right')-1
+      phase[inside] = ((times[inside]-starts[k])/(starts[k+1]-starts[k]))
+    elif method == 'hilbert':
+      mask = numpy.where(numpy.logical_and(self.times >= limits[0],
+                                           self.times <= limits[1]))[0]
+      values = self.values[mask]
+      angle = numpy.unwrap(numpy.angle(signal.hilbert(values-values.mean())))
+      inside = numpy.logical_and(times >= self.times[mask[0]],
+                                 times <= self.times[mask[-1]])
+      angle = numpy.interp(times[inside], self.times[mask], angle)
+      phase[inside] = numpy.mod((angle-numpy.pi)/(2.0*numpy.pi), 1.0)
+    else:
+      raise ValueError('unknown method to compute the phase: {}'.format(method))
+    return phase
+
+
+def get_spectral_strouhals(forces, L=1.0, U=1.0, limits=(0.0, float('inf')),
+                           method='welch', window='hann', n_per_segment=None):
+  """Computes the Strouhal numbers of several signals (e.g. the lift of a
+  sweep of simulations) from the peak of their power spectral density.
+
+  Each signal keeps its own number of samples over its time-limits
+  (a non-uniformly sampled signal is interpolated on as many uniformly spaced
+  samples); the spectra are computed with the same number of points,
+  zero-padding the shorter signals (or segments), so that the peaks of all
+  signals are searched in one vectorized pass.
+
+  Parameters
+  ----------
+  forces: list of Force objects
+    The signals.
+  L: float or 1D array of floats, optional
+    Characteristics length of the body (one per signal or shared); 
+    default: 1.0.
+  U: float or 1D array of floats, optional
+    Characteristics velocity of the body (one per signal or shared); 
+    default: 1.0.
+  limits: 2-tuple of floats, optional
+    Time-limits used to compute the spectra; 
+    default: (0.0, inf).
+  method: string, optional
+    Spectral estimator;
+    choices: 'fft' (single window over the whole signal), 'welch';
+    default: 'welch'.
+  window: string, optional
+    Name of the window (see `scipy.signal.get_window`);
+    default: 'hann'.
+  n_per_segment: integer, optional
+    Number of samples per segment ('welch' method);
+    default: None (a quarter of each signal).
+
+  Returns
+  -------
+  strouhals: dictionary
+    Returns the Strouhal numbers ('values'), the peak frequencies
+    ('frequencies') and the actual time-limits ('time-limits') of each signal.
+  """
+  windows = []
+  for force in forces:
+    mask = numpy.where(numpy.logical_and(force.times >= limits[0],
+                                         force.times <= limits[1]))[0]
+    windows.append((force.times[mask], force.values[mask]))
+  n_samples = numpy.array([times.size for times, _ in windows])
+  if n_samples.min() < 4:
+    raise ValueError('not enough samples to compute a spectrum')
+  starts = numpy.array([times[0] for times, _ in windows])
+  ends = numpy.array([times[-1] for times, _ in windows])
+  dts = (ends-starts)/(n_samples-1)
+  samples = []
+  for i, (times, signal_values) in enumerate(windows):
+    uniform = numpy.linspace(starts[i], ends[i], n_samples[i])
+    if not numpy.allclose(times, uniform, rtol=0.0, atol=1.0E-06*dts[i]):
+      signal_values = numpy.interp(uniform, times, signal_values)
+    samples.append(signal_values-signal_values.mean())
+  if method == 'fft':
+    n_fft = n_samples.max()
+    values = numpy.zeros((len(samples), n_fft))
+    for i, signal_values in enumerate(samples):
+      values[i, :n_samples[i]] = (signal_values
+                                  *signal.get_window(window, n_samples[i]))
+    power = numpy.absolute(numpy.fft.rfft(values, axis=1))**2
+  elif method == 'welch':
+    if n_per_segment:
+      n_per_segments = numpy.minimum(n_per_segment, n_samples)
+    else:
+      n_per_segments = numpy.maximum(4, n_samples//4)
+    n_fft = n_per_segments.max()
+    power = numpy.array([signal.welch(signal_values, fs=1.0, window=window,
+                                      nperseg=n_per_segments[i], nfft=n_fft)[1]
+                         for i, signal_values in enumerate(samples)])
+  else:
+    raise ValueError('unknown spectral method: {}'.format(method))
+  # maximum bin (excluding the mean) and parabolic fit of the log-spectrum
+  rows = numpy.arange(power.shape[0])
+  peaks = numpy.argmax(power[:, 1:], axis=1)+1
+  peaks = numpy.clip(peaks, 1, power.shape[1]-2)
+  tiny = numpy.finfo(numpy.float64).tiny
+  left, center, right = (numpy.log(power[rows, peaks+shift]+tiny)
+                         for shift in (-1, 0, 1))
+  curvature = left-2.0*center+right
+  shifts = numpy.zeros(rows.size)
+  mask = curvature < 0.0
+  shifts[mask] = 0.5*(left-right)[mask]/curvature[mask]
+  frequencies = (peaks+shifts)/(n_fft*dts)
+  return {'values': frequencies*numpy.asarray(L)/numpy.asarray(U),
+          'frequencies': frequencies,
+          'time-limits': zip(starts, ends)}
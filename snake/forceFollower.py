@@ -0,0 +1,185 @@
+# file: forceFollower.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Implementation of the class `ForceFollower`.
+
+
+import io
+import os
+
+import numpy
+
+from .force import Force
+
+
+class ForceFollower(object):
+  """Follows a forces file written by a running simulation.
+
+  Each poll parses only the complete lines appended since the previous one
+  (the byte offset is remembered), appends them to arrays that grow
+  geometrically, and updates the running mean and the extrema of each
+  force, so that the cost of a poll does not depend on the length of the run.
+  """
+  def __init__(self, file_path, usecols, labels,
+               order=5,
+               comments='#',
+               initial=None,
+               parser=None):
+    """Registers the file to follow (nothing is read yet).
+
+    Parameters
+    ----------
+    file_path: string
+      Path of the file containing the forces.
+    usecols: tuple of integers
+      Index of each column to read (the first one being the time).
+    labels: list of strings
+      Label of each force.
+    order: integer, optional
+      Number of neighboring points used to define an extremum;
+      default: 5.
+    comments: string, optional
+      Character starting a comment;
+      default: '#'.
+    initial: 2D array of floats, optional
+      Data preceding the file (e.g. from previous restarts), one row per
+      column of `usecols`;
+      default: None.
+    parser: callable, optional
+      Function parsing complete lines (bytes) into the columns `usecols`
+      (returns an array of shape (column, time));
+      default: None (columns separated by whitespaces).
+    """
+    self.file_path = file_path
+    self.usecols = tuple(usecols)
+    self.order = int(order)
+    self.comments = comments
+    self.initial = initial
+    self.parser = parser
+    self.forces = [Force(numpy.empty(0), numpy.empty(0), label=label)
+                   for label in labels[:len(self.usecols)-1]]
+    self._reset()
+
+  def _reset(self):
+    """Forgets everything read from the file."""
+    self.offset = 0
+    self.size = 0
+    self.data = numpy.empty((len(self.usecols), 1024), dtype=numpy.float64)
+    self.sums = numpy.zeros(len(self.usecols)-1, dtype=numpy.float64)
+    # extrema that can no longer change (their neighborhood is complete)
+    self.extrema = [{'minima': [], 'maxima': [], 'confirmed': 0}
+                    for _ in self.forces]
+    if self.initial is not None:
+      self._append(numpy.asarray(self.initial, dtype=numpy.float64))
+
+  def poll(self):
+    """Reads the lines appended to the file since the last poll.
+
+    Returns
+    -------
+    n_lines: integer
+      Number of new lines parsed.
+    """
+    try:
+      file_size = os.path.getsize(self.file_path)
+    except OSError:
+      return 0
+    if file_size < self.offset:
+      # the file has been rewritten
+      self._reset()
+    if file_size == self.offset:
+      return 0
+    with open(self.file_path, 'rb') as infile:
+      infile.seek(self.offset)
+      chunk = infile.read(file_size-self.offset)
+    # only parse complete lines
+    end = chunk.rfind(b'\n')+1
+    if end == 0:
+      return 0
+    self.offset += end
+    if self.parser:
+      data = self.parser(chunk[:end], self.usecols)
+    else:
+      with io.BytesIO(chunk[:end]) as buffer:
+        data = numpy.loadtxt(buffer, dtype=numpy.float64,
+                             comments=self.comments, usecols=self.usecols,
+                             ndmin=2).T
+    if data.size:
+      self._append(data)
+    return data.shape[1]
+
+  def _append(self, data):
+    """Appends rows (one per column read) to the arrays and updates
+    the running statistics."""
+    n_new = data.shape[1]
+    if self.size+n_new > self.data.shape[1]:
+      capacity = max(2*self.data.shape[1], self.size+n_new)
+      grown = numpy.empty((self.data.shape[0], capacity), dtype=numpy.float64)
+      grown[:, :self.size] = self.data[:, :self.size]
+      self.data = grown
+    self.data[:, self.size:self.size+n_new] = data
+    self.size += n_new
+    self.sums += data[1:].sum(axis=1)
+    times = self.data[0, :self.size]
+    for index, force in enumerate(self.forces):
+      force.times, force.values = times, self.data[index+1, :self.size]
+      force.mean = {'value': self.sums[index]/self.size,
+                    'start': times[0],
+                    'end': times[-1]}
+      self._update_extrema(index)
+
+  def _update_extrema(self, index):
+    """Searches extrema in the new part of the signal only, and registers
+    the extrema of the whole signal in the memoized extrema of the force
+    (as returned by `Force.get_extrema(order=order)`)."""
+    force, extrema, order = self.forces[index], self.extrema[index], self.order
+    n = force.values.size
+    confirmed = extrema['confirmed']
+    minima, maxima = force._find_extrema(max(0, confirmed-order), n, order)
+    # extrema whose right neighborhood is complete are final
+    final = max(confirmed, n-order)
+    extrema['minima'].append(minima[(minima >= confirmed) & (minima < final)])
+    extrema['maxima'].append(maxima[(maxima >= confirmed) & (maxima < final)])
+    extrema['confirmed'] = final
+    start = numpy.searchsorted(force.times, 0.0, side='left')
+    results = []
+    for name, tentative in zip(['minima', 'maxima'], [minima, maxima]):
+      if len(extrema[name]) > 1:
+        extrema[name] = [numpy.concatenate(extrema[name])]
+      # the last extremum of the whole signal is discarded
+      indices = numpy.append(extrema[name][0], tentative[tentative >= final])
+      indices = indices[:-1].astype(int)
+      indices = indices[indices >= start]
+      # remove indices that are too close
+      indices = indices[numpy.append(True, numpy.diff(indices) > order)
+                        [:indices.size]]
+      indices.flags.writeable = False
+      results.append(indices)
+    key = (0.0, float('inf'), order)
+    force._extrema = (force.times, force.values, {key: tuple(results)})
+
+  def get_strouhal(self, L=1.0, U=1.0, index=1):
+    """Computes the Strouhal number from the extrema of a force over the whole
+    signal (None if less than two periods are available).
+
+    Parameters
+    ----------
+    L: float, optional
+      Characteristics length of the body;
+      default: 1.0.
+    U: float, optional
+      Characteristics velocity of the body;
+      default: 1.0.
+    index: integer, optional
+      Index of the force to use;
+      default: 1 (lift).
+
+    Returns
+    -------
+    strouhal: dictionary or None
+      The Strouhal number (see `Force.get_strouhal`).
+    """
+    force = self.forces[index]
+    minima, _ = force.get_extrema(order=self.order)
+    if minima.size < 2:
+      return None
+    return force.get_strouhal(L=L, U=U, order=self.order)
@@ -0,0 +1,99 @@
+# file: gridMetrics.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Implementation of the class `GridMetrics`.
+
+
+import numpy
+
+
+class GridMetrics(object):
+  """Quantities derived from the stations of a staggered Cartesian grid,
+  computed once and shared by the readers and the derivations.
+  """
+  def __init__(self, grid):
+    """Computes the cell-widths, their inverse, the face areas and
+    the node locations of each staggered field.
+
+    Parameters
+    ----------
+    grid: list of 1D arrays of floats
+      Stations of the grid along each direction.
+    """
+    self.grid = grid
+    self.stations = [numpy.asarray(stations, dtype=numpy.float64)
+                     for stations in grid]
+    self.ndim = len(self.stations)
+    self.directions = 'xyz'[:self.ndim]
+    self.n_cells = [stations.size-1 for stations in self.stations]
+    self.widths = [stations[1:]-stations[:-1] for stations in self.stations]
+    self.inverse_widths = [1.0/widths for widths in self.widths]
+    self.centers = [0.5*(stations[:-1]+stations[1:])
+                    for stations in self.stations]
+    # stations that are not on the boundary (where fluxes are stored)
+    self.interior = [stations[1:-1] for stations in self.stations]
+    self.inverse_face_areas = self._get_inverse_face_areas()
+    # nodes of each field: the flux (and velocity) in a direction is located
+    # at the interior stations along that direction, at cell-centers otherwise
+    self.nodes = {'pressure': self.centers}
+    for i, direction in enumerate(self.directions):
+      nodes = [self.interior[j] if j == i else self.centers[j]
+               for j in range(self.ndim)]
+      self.nodes[direction+'-flux'] = nodes
+      self.nodes[direction+'-velocity'] = nodes
+    if self.ndim == 2:
+      self.vorticity_operators = self.get_vorticity_operators(
+                                     self.nodes['x-velocity'],
+                                     self.nodes['y-velocity'])
+
+  def describes(self, grid):
+    """Checks if the metrics have been computed for a given grid
+    (same object)."""
+    return self.grid is grid and len(grid) == self.ndim
+
+  def _get_inverse_face_areas(self):
+    """Returns the inverse of the area of the cell-faces crossed by each
+    flux component, shaped to broadcast against the flux arrays
+    (1/dy, 1/dx in 2D; 1/(dy*dz), 1/(dx*dz), 1/(dx*dy) in 3D)."""
+    if self.ndim == 3:
+      inv_dx, inv_dy, inv_dz = self.inverse_widths
+      return [(inv_dz[:, None]*inv_dy)[:, :, None],
+              (inv_dz[:, None]*inv_dx)[:, None, :],
+              (inv_dy[:, None]*inv_dx)[None, :, :]]
+    inv_dx, inv_dy = self.inverse_widths
+    return [inv_dy[:, None], inv_dx[None, :]]
+
+  def get_vorticity_operators(self, u_nodes, v_nodes):
+    """Returns the quantities needed to compute the vorticity from
+    velocity components located at given nodes.
+
+    The operators of the staggered velocity of the grid are computed once;
+    other node locations are processed on the fly.
+
+    Parameters
+    ----------
+    u_nodes, v_nodes: lists of 1D arrays of floats
+      Nodes of the x- and y-components of the velocity.
+
+    Returns
+    -------
+    operators: dictionary
+      Slices of the velocity components ('x-slice', 'y-slice') that are
+      within the vorticity region, vorticity nodes ('x', 'y'), and widths
+      between velocity nodes ('dx' as a row, 'dy' as a column).
+    """
+    operators = getattr(self, 'vorticity_operators', None)
+    if (operators is not None
+        and u_nodes[0] is self.nodes['x-velocity'][0]
+        and u_nodes[1] is self.nodes['x-velocity'][1]
+        and v_nodes[0] is self.nodes['y-velocity'][0]
+        and v_nodes[1] is self.nodes['y-velocity'][1]):
+      return operators
+    (ux, uy), (vx, vy) = u_nodes, v_nodes
+    mask_x = numpy.where(numpy.logical_and(ux > vx[0], ux < vx[-1]))[0]
+    mask_y = numpy.where(numpy.logical_and(vy > uy[0], vy < uy[-1]))[0]
+    return {'x-slice': slice(mask_x[0], mask_x[-1]+1),
+            'y-slice': slice(mask_y[0], mask_y[-1]+1),
+            'x': 0.5*(vx[:-1]+vx[1:]),
+            'y': 0.5*(uy[:-1]+uy[1:]),
+            'dx': (vx[1:]-vx[:-1])[None, :],
+            'dy': (uy[1:]-uy[:-1])[:, None]}
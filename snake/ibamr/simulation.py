@@ -34,7 +34,7 @@ class IBAMRSimulation(Simulation):
                                           directory=directory, 
                                           **kwargs)
 
-  def read_forces(self, file_path=None, labels=None):
+  def read_forces(self, file_path=None, labels=None, follow=False):
     """Reads forces from files.
 
     Parameters
@@ -45,9 +45,16 @@ class IBAMRSimulation(Simulation):
     labels: list of strings, optional
       Label of each force to read;
       default: None.
+    follow: boolean, optional
+      Set 'True' to only read the lines appended since the previous call
+      (for a running simulation);
+      default: False.
     """
     if not file_path:
       file_path = os.path.join(self.directory, 'dataIB', 'ib_Drag_force_struct_no_0')
+    if follow:
+      self.follow_forces(file_path, (0, 4, 5), labels or ['$F_x$', '$F_y$'])
+      return
     print('[info] reading forces from {} ...'.format(file_path)),
     with open(file_path, 'r') as infile:
       times, force_x, force_y = numpy.loadtxt(infile, dtype=float, 
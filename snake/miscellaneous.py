@@ -8,6 +8,11 @@ import sys
 import re
 import argparse
 import collections
+import threading
+try:
+  import Queue as queue
+except ImportError:
+  import queue
 
 try:
   import numpy
@@ -49,6 +54,77 @@ class ReadOptionsFromFile(argparse.Action):
     parser.parse_args(lines, namespace)
 
 
+class _PrefetchError(object):
+  """Wraps an exception raised in the prefetching thread."""
+  def __init__(self, exception):
+    self.exception = exception
+
+
+def prefetch(iterable, depth=2):
+  """Iterates over an iterable whose items are produced ahead of time
+  by a background thread.
+
+  The producer thread and the consumer share a bounded queue:
+  at most `depth` items are produced in advance.
+  An exception raised by the producer is re-raised in the consumer.
+
+  Parameters
+  ----------
+  iterable: iterable
+    The items to produce (e.g. a generator reading time-steps from file).
+  depth: integer, optional
+    Number of items produced in advance;
+    default: 2 (0 or less: items are produced in the calling thread).
+
+  Yields
+  ------
+  item: object
+    The next item of the iterable.
+  """
+  if depth <= 0:
+    for item in iterable:
+      yield item
+    return
+  items = queue.Queue(maxsize=depth)
+  done = object()
+  stop = threading.Event()
+
+  def put(item):
+    # gives up if the consumer stopped iterating
+    while not stop.is_set():
+      try:
+        items.put(item, timeout=0.1)
+        return True
+      except queue.Full:
+        continue
+    return False
+
+  def produce():
+    try:
+      for item in iterable:
+        if not put(item):
+          return
+    except Exception as exception:
+      put(_PrefetchError(exception))
+      return
+    put(done)
+
+  producer = threading.Thread(target=produce)
+  producer.daemon = True
+  producer.start()
+  try:
+    while True:
+      item = items.get()
+      if item is done:
+        break
+      if isinstance(item, _PrefetchError):
+        raise item.exception
+      yield item
+  finally:
+    stop.set()
+    producer.join(timeout=1.0)
+
+
 def display_image(figure):
   """Display figure into the Jupyter-Notebook."""
   if not os.path.isfile(figure):
@@ -0,0 +1,360 @@
+# file: modal.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Snapshot POD and exact DMD of a field over time-steps.
+
+
+import numpy
+
+from .field import Field
+
+
+class SnapshotMatrix(object):
+  """Matrix of snapshots (one row per time-step, one column per grid-node)
+  filled chunk by chunk from a time-series of a field.
+
+  The matrix can be stored in single precision and/or in a memory-mapped
+  file; products with the matrix are computed by blocks of columns
+  (accumulated in double precision) so that only one block is loaded at once.
+  """
+  def __init__(self, series,
+               dtype=numpy.float32,
+               file_path=None,
+               weights=None,
+               block_size=65536):
+    """Reads the snapshots.
+
+    Parameters
+    ----------
+    series: TimeSeriesField object
+      Time-series of the field (read chunk by chunk).
+    dtype: Numpy data-type, optional
+      Type used to store the snapshots;
+      default: numpy.float32.
+    file_path: string, optional
+      Path of the file used to store the matrix (memory-mapped);
+      default: None (stored in memory).
+    weights: Numpy array of floats, optional
+      Quadrature weights of the grid-nodes (e.g. the cell areas) defining the
+      inner product between snapshots;
+      default: None (uniform weights).
+    block_size: integer, optional
+      Number of columns (grid-nodes) processed at once;
+      default: 65536.
+    """
+    self.field_name = series.field_name
+    self.time_steps = numpy.array(series.time_steps, dtype=int)
+    self.spatial_shape = tuple(series.shape[1:])
+    self.n_snapshots = self.time_steps.size
+    self.n_points = int(numpy.prod(self.spatial_shape))
+    self.block_size = max(1, int(block_size))
+    shape = (self.n_snapshots, self.n_points)
+    if file_path:
+      self.values = numpy.memmap(file_path, dtype=dtype, mode='w+', shape=shape)
+    else:
+      self.values = numpy.empty(shape, dtype=dtype)
+    print('[info] reading {} snapshots of {} ...'.format(self.n_snapshots,
+                                                        self.field_name))
+    row = 0
+    for _, values in series.iter_chunks():
+      self.values[row:row+len(values)] = values.reshape(len(values), -1)
+      row += len(values)
+    self.x, self.y, self.z = series.x, series.y, series.z
+    self.sqrt_weights = None
+    if weights is not None:
+      self.sqrt_weights = numpy.sqrt(numpy.asarray(weights,
+                                                   dtype=numpy.float64)
+                                     .reshape(-1))
+    self.mean = self._get_mean()
+
+  def _get_mean(self):
+    """Computes the time-averaged snapshot (by blocks of rows)."""
+    mean = numpy.zeros(self.n_points, dtype=numpy.float64)
+    for start in range(0, self.n_snapshots, 64):
+      mean += self.values[start:start+64].sum(axis=0, dtype=numpy.float64)
+    return mean/self.n_snapshots
+
+  def iter_blocks(self, rows=slice(None), subtract_mean=False):
+    """Iterates over blocks of columns of the (weighted) matrix.
+
+    Parameters
+    ----------
+    rows: slice, optional
+      Snapshots to consider;
+      default: slice(None) (all snapshots).
+    subtract_mean: boolean, optional
+      Set 'True' to subtract the time-averaged snapshot;
+      default: False.
+
+    Yields
+    ------
+    columns: slice
+      Columns of the block.
+    block: 2D array of floats
+      The block in double precision.
+    """
+    for start in range(0, self.n_points, self.block_size):
+      columns = slice(start, min(start+self.block_size, self.n_points))
+      yield columns, self._get_block(rows, columns, subtract_mean)
+
+  def get_gram(self, rows=slice(None), subtract_mean=False):
+    """Computes the matrix of inner products between snapshots,
+    accumulated over blocks of columns.
+
+    Returns
+    -------
+    gram: 2D array of floats
+      The Gram matrix; shape (snapshot, snapshot).
+    """
+    gram = None
+    for _, block in self.iter_blocks(rows=rows, subtract_mean=subtract_mean):
+      product = block.dot(block.T)
+      gram = product if gram is None else gram+product
+    return gram
+
+  def dot_left(self, left, rows=slice(None), subtract_mean=False):
+    """Computes the product `left . X` (X: matrix of snapshots).
+
+    Parameters
+    ----------
+    left: 2D array of floats
+      Left operand; shape (k, snapshot).
+
+    Returns
+    -------
+    product: 2D array
+      The product; shape (k, grid-node).
+    """
+    product = numpy.empty((left.shape[0], self.n_points),
+                          dtype=numpy.result_type(left, numpy.float64))
+    for columns, block in self.iter_blocks(rows=rows,
+                                           subtract_mean=subtract_mean):
+      product[:, columns] = left.dot(block)
+    return product
+
+  def dot_right(self, right, rows=slice(None), subtract_mean=False):
+    """Computes the product `X . right^T` (X: matrix of snapshots).
+
+    Parameters
+    ----------
+    right: 2D array of floats
+      Right operand (transposed); shape (k, grid-node).
+
+    Returns
+    -------
+    product: 2D array
+      The product; shape (snapshot, k).
+    """
+    product = None
+    for columns, block in self.iter_blocks(rows=rows,
+                                           subtract_mean=subtract_mean):
+      partial = block.dot(right[:, columns].T)
+      product = partial if product is None else product+partial
+    return product
+
+  def svd(self, rank,
+          rows=slice(None),
+          subtract_mean=False,
+          randomized=False,
+          oversampling=10,
+          n_iterations=2,
+          seed=None):
+    """Computes the truncated singular value decomposition `X = U S V^T`.
+
+    The exact decomposition uses the eigen-decomposition of the Gram matrix
+    (method of snapshots); the randomized one (Halko et al., 2011) projects
+    the matrix onto a random subspace of size `rank+oversampling`, refined by
+    power iterations (one pass over the matrix each).
+
+    Parameters
+    ----------
+    rank: integer
+      Number of singular values to keep.
+    rows: slice, optional
+      Snapshots to consider;
+      default: slice(None).
+    subtract_mean: boolean, optional
+      Set 'True' to subtract the time-averaged snapshot;
+      default: False.
+    randomized: boolean, optional
+      Set 'True' to use the randomized decomposition;
+      default: False.
+    oversampling: integer, optional
+      Additional random vectors (randomized decomposition);
+      default: 10.
+    n_iterations: integer, optional
+      Number of power iterations (randomized decomposition);
+      default: 2.
+    seed: integer, optional
+      Seed of the random generator;
+      default: None.
+
+    Returns
+    -------
+    u: 2D array of floats
+      Left singular vectors (temporal); shape (snapshot, rank).
+    s: 1D array of floats
+      Singular values in decreasing order.
+    vt: 2D array of floats
+      Right singular vectors (spatial, weighted); shape (rank, grid-node).
+    """
+    n_rows = len(range(self.n_snapshots)[rows])
+    if randomized:
+      size = min(rank+oversampling, n_rows)
+      random = numpy.random.RandomState(seed)
+      y = None
+      for columns, block in self.iter_blocks(rows=rows,
+                                             subtract_mean=subtract_mean):
+        omega = random.standard_normal((block.shape[1], size))
+        partial = block.dot(omega)
+        y = partial if y is None else y+partial
+      q, _ = numpy.linalg.qr(y)
+      for _ in range(n_iterations):
+        y = None
+        for _, block in self.iter_blocks(rows=rows,
+                                         subtract_mean=subtract_mean):
+          partial = block.dot(block.T.dot(q))
+          y = partial if y is None else y+partial
+        q, _ = numpy.linalg.qr(y)
+      b = self.dot_left(q.T, rows=rows, subtract_mean=subtract_mean)
+      # singular values of the small matrix through its Gram matrix
+      eigenvalues, vectors = numpy.linalg.eigh(b.dot(b.T))
+      u = q.dot(vectors)
+    else:
+      b = None
+      eigenvalues, u = numpy.linalg.eigh(self.get_gram(rows=rows,
+                                                       subtract_mean=subtract_mean))
+    order = numpy.argsort(eigenvalues)[::-1][:rank]
+    eigenvalues, u = eigenvalues[order], u[:, order]
+    # discard the null space (e.g. the mean subtracted)
+    keep = eigenvalues > eigenvalues[0]*numpy.finfo(numpy.float64).eps*n_rows
+    s, u = numpy.sqrt(eigenvalues[keep]), u[:, keep]
+    if b is not None:
+      vt = vectors[:, order][:, keep].T.dot(b)/s[:, numpy.newaxis]
+    else:
+      vt = self.dot_left(u.T, rows=rows, subtract_mean=subtract_mean)
+      vt /= s[:, numpy.newaxis]
+    return u, s, vt
+
+  def _get_block(self, rows, columns, subtract_mean):
+    """Returns a block of columns of the (weighted) matrix."""
+    block = numpy.array(self.values[rows, columns], dtype=numpy.float64)
+    if subtract_mean:
+      block -= self.mean[columns]
+    if self.sqrt_weights is not None:
+      block *= self.sqrt_weights[columns]
+    return block
+
+  def unweight(self, vectors):
+    """Removes the quadrature weights from spatial vectors (in place)."""
+    if self.sqrt_weights is not None:
+      vectors /= self.sqrt_weights
+    return vectors
+
+  def create_field(self, values, label):
+    """Creates a Field object from a spatial vector."""
+    return Field(x=self.x, y=self.y, z=self.z,
+                 values=values.reshape(self.spatial_shape),
+                 time_step=self.time_steps[-1],
+                 label=label)
+
+
+def compute_pod(snapshots, n_modes=10, randomized=False, **kwargs):
+  """Computes the proper orthogonal decomposition of the fluctuations
+  around the time-averaged field (method of snapshots).
+
+  Parameters
+  ----------
+  snapshots: SnapshotMatrix or TimeSeriesField object
+    The snapshots.
+  n_modes: integer, optional
+    Number of modes to compute;
+    default: 10.
+  randomized: boolean, optional
+    Set 'True' to use a randomized singular value decomposition;
+    default: False.
+  kwargs: dictionary
+    Other parameters of `SnapshotMatrix.svd` (oversampling, n_iterations,
+    seed).
+
+  Returns
+  -------
+  pod: dictionary
+    The time-averaged field ('mean', Field object), the spatial modes
+    ('modes', list of Field objects, orthonormal for the weighted inner
+    product), the energy of each mode ('energies', eigenvalues of the
+    covariance), and the temporal coefficients ('coefficients';
+    shape (snapshot, mode)).
+  """
+  if not isinstance(snapshots, SnapshotMatrix):
+    snapshots = SnapshotMatrix(snapshots)
+  print('[info] computing {} POD modes of {} ...'.format(n_modes,
+                                                         snapshots.field_name))
+  u, s, vt = snapshots.svd(n_modes, subtract_mean=True,
+                           randomized=randomized, **kwargs)
+  vt = snapshots.unweight(vt)
+  name = snapshots.field_name
+  return {'mean': snapshots.create_field(snapshots.mean, name+'-mean'),
+          'modes': [snapshots.create_field(mode, '{}-pod-mode-{}'.format(name, k))
+                    for k, mode in enumerate(vt)],
+          'energies': s**2/snapshots.n_snapshots,
+          'coefficients': u*s}
+
+
+def compute_dmd(snapshots, time_increment, n_modes=10, randomized=False,
+                **kwargs):
+  """Computes the exact dynamic mode decomposition (Tu et al., 2014)
+  of the sequence of snapshots (assumed equally spaced in time).
+
+  Parameters
+  ----------
+  snapshots: SnapshotMatrix or TimeSeriesField object
+    The snapshots.
+  time_increment: float
+    Time between two consecutive snapshots.
+  n_modes: integer, optional
+    Rank of the decomposition;
+    default: 10.
+  randomized: boolean, optional
+    Set 'True' to use a randomized singular value decomposition;
+    default: False.
+  kwargs: dictionary
+    Other parameters of `SnapshotMatrix.svd` (oversampling, n_iterations,
+    seed).
+
+  Returns
+  -------
+  dmd: dictionary
+    The real and imaginary parts of the modes ('modes-real', 'modes-imag',
+    lists of Field objects), the discrete-time eigenvalues ('eigenvalues'),
+    the frequencies ('frequencies') and growth-rates ('growth-rates') of the
+    modes, and their amplitudes in the first snapshot ('amplitudes').
+  """
+  if not isinstance(snapshots, SnapshotMatrix):
+    snapshots = SnapshotMatrix(snapshots)
+  print('[info] computing {} DMD modes of {} ...'.format(n_modes,
+                                                         snapshots.field_name))
+  first, second = slice(0, -1), slice(1, None)
+  u, s, vt = snapshots.svd(n_modes, rows=first,
+                           randomized=randomized, **kwargs)
+  # projection of the linear operator onto the POD modes of the first snapshots
+  reduced = snapshots.dot_right(vt, rows=second).T.dot(u)/s
+  eigenvalues, vectors = numpy.linalg.eig(reduced)
+  # exact modes: X2 U S^-1 W
+  modes = snapshots.dot_left((u.dot(vectors/s[:, numpy.newaxis])).T,
+                             rows=second)
+  modes = snapshots.unweight(modes)
+  # the first snapshot (u[0]*s in the POD basis) in terms of the modes
+  # projected onto the same basis (reduced . W = W . diag(eigenvalues))
+  amplitudes = numpy.linalg.lstsq(vectors*eigenvalues, u[0]*s, rcond=None)[0]
+  exponents = numpy.log(eigenvalues.astype(numpy.complex128))/time_increment
+  name = snapshots.field_name
+  return {'modes-real': [snapshots.create_field(mode.real,
+                                                '{}-dmd-mode-{}-real'.format(name, k))
+                         for k, mode in enumerate(modes)],
+          'modes-imag': [snapshots.create_field(mode.imag,
+                                                '{}-dmd-mode-{}-imag'.format(name, k))
+                         for k, mode in enumerate(modes)],
+          'eigenvalues': eigenvalues,
+          'frequencies': exponents.imag/(2.0*numpy.pi),
+          'growth-rates': exponents.real,
+          'amplitudes': amplitudes}
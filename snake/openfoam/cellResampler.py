@@ -0,0 +1,193 @@
+# file: cellResampler.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Implementation of the class `CellResampler`.
+
+
+import numpy
+from scipy import sparse
+
+from ..field import Field
+
+
+class CellResampler(object):
+  """Resamples values defined at the cell-centers of an OpenFOAM mesh onto
+  a Cartesian grid.
+
+  The weights of the cell-centers surrounding each grid node are computed
+  once (from the KD-tree or the Delaunay triangulation of the cell-centers,
+  both cached on the mesh) and stored in a sparse matrix;
+  resampling a field (e.g. another time-step) then costs a single sparse
+  matrix-vector product.
+  """
+  def __init__(self, mesh, grid,
+               method='idw',
+               n_neighbors=8,
+               power=2.0,
+               max_distance=None,
+               z=None):
+    """Computes the resampling operator.
+
+    Parameters
+    ----------
+    mesh: PolyMesh object
+      The OpenFOAM mesh.
+    grid: list of 1d arrays of floats
+      Nodal stations in each direction of the Cartesian grid
+      (x, y for a 2D grid, compared to the x and y coordinates of the
+      cell-centers).
+    method: string, optional
+      Weights of the cell-centers;
+      choices: 'idw' (inverse-distance weighting of the nearest
+      cell-centers), 'linear' (barycentric coordinates in the Delaunay
+      triangulation of the cell-centers);
+      default: 'idw'.
+    n_neighbors: integer, optional
+      Number of nearest cell-centers used ('idw' method);
+      default: 8.
+    power: float, optional
+      Power of the inverse distance ('idw' method);
+      default: 2.0.
+    max_distance: float, optional
+      Grid nodes farther from the closest cell-center are outside
+      ('idw' method);
+      default: None (no limit).
+    z: float, optional
+      Location of the plane of a 2D grid in a 3D mesh;
+      default: None (the z-coordinate is ignored).
+    """
+    self.grid = [numpy.asarray(stations, dtype=numpy.float64)
+                 for stations in grid]
+    # grid nodes in the layout of the values ((z,) y, x in C-order)
+    coordinates = numpy.meshgrid(*self.grid[::-1], indexing='ij')[::-1]
+    points = numpy.column_stack([c.ravel() for c in coordinates])
+    if z is not None and len(self.grid) == 2:
+      points = numpy.column_stack((points, numpy.full(points.shape[0], z)))
+    self.shape = [stations.size for stations in self.grid[::-1]]
+    self.n_cells = mesh.n_cells
+    if method == 'idw':
+      self.matrix = get_idw_operator(mesh.get_tree(points.shape[1]), points,
+                                     n_neighbors=n_neighbors, power=power,
+                                     max_distance=max_distance)
+    elif method == 'linear':
+      self.matrix = get_barycentric_operator(
+                        mesh.get_triangulation(points.shape[1]), points)
+    else:
+      raise ValueError('unknown resampling method: {}'.format(method))
+    # grid nodes without any contributing cell-center
+    self.outside = numpy.flatnonzero(numpy.diff(self.matrix.indptr) == 0)
+
+  def resample(self, values, label=None, time_step=None,
+               fill_value=numpy.nan):
+    """Resamples values at the cell-centers onto the Cartesian grid.
+
+    Parameters
+    ----------
+    values: 1d array of floats
+      Values at the cell-centers.
+    label: string, optional
+      Label of the Field object to create;
+      default: None.
+    time_step: integer or float, optional
+      Time-step (or time) of the field;
+      default: None.
+    fill_value: float, optional
+      Value at the grid nodes outside the mesh;
+      default: numpy.nan.
+
+    Returns
+    -------
+    field: Field object
+      The field on the Cartesian grid.
+    """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    if values.shape[0] != self.n_cells:
+      raise ValueError('{} values for {} cells'.format(values.shape[0],
+                                                       self.n_cells))
+    resampled = self.matrix.dot(values)
+    resampled[self.outside] = fill_value
+    return Field(x=self.grid[0], y=self.grid[1],
+                 z=(self.grid[2] if len(self.grid) == 3 else None),
+                 values=resampled.reshape(self.shape),
+                 time_step=time_step,
+                 label=label)
+
+
+def get_idw_operator(tree, points, n_neighbors=8, power=2.0,
+                     max_distance=None):
+  """Returns the sparse operator of the inverse-distance weighting of the
+  nearest cell-centers.
+
+  Parameters
+  ----------
+  tree: scipy.spatial.cKDTree object
+    KD-tree of the cell-centers.
+  points: 2d array of floats
+    Coordinates of the points; shape (number of points, number of directions).
+  n_neighbors: integer, optional
+    Number of nearest cell-centers used;
+    default: 8.
+  power: float, optional
+    Power of the inverse distance;
+    default: 2.0.
+  max_distance: float, optional
+    Maximum distance of the cell-centers used;
+    default: None (no limit).
+
+  Returns
+  -------
+  matrix: scipy.sparse.csr_matrix object
+    Operator of shape (number of points, number of cells)
+    (rows of points without cell-centers closer than `max_distance` are empty).
+  """
+  n_cells = tree.n
+  n_neighbors = min(n_neighbors, n_cells)
+  distances, indices = tree.query(points, k=n_neighbors,
+                                  distance_upper_bound=(max_distance
+                                                        or numpy.inf))
+  distances = distances.reshape(points.shape[0], n_neighbors)
+  indices = indices.reshape(points.shape[0], n_neighbors)
+  valid = indices < n_cells
+  weights = numpy.zeros(distances.shape)
+  with numpy.errstate(divide='ignore'):
+    weights[valid] = 1.0/distances[valid]**power
+  # a point located on a cell-center takes its value
+  exact = distances[:, 0] == 0.0
+  weights[exact] = 0.0
+  weights[exact, 0] = 1.0
+  totals = weights.sum(axis=1)
+  rows = numpy.flatnonzero(totals > 0.0)
+  weights[rows] /= totals[rows, None]
+  valid &= weights > 0.0
+  return sparse.csr_matrix((weights[valid],
+                            (numpy.nonzero(valid)[0], indices[valid])),
+                           shape=(points.shape[0], n_cells))
+
+
+def get_barycentric_operator(triangulation, points):
+  """Returns the sparse operator of the linear interpolation of the
+  cell-centers (barycentric coordinates in their Delaunay triangulation).
+
+  Parameters
+  ----------
+  triangulation: scipy.spatial.Delaunay object
+    Delaunay triangulation of the cell-centers.
+  points: 2d array of floats
+    Coordinates of the points; shape (number of points, number of directions).
+
+  Returns
+  -------
+  matrix: scipy.sparse.csr_matrix object
+    Operator of shape (number of points, number of cells)
+    (rows of points outside the triangulation are empty).
+  """
+  n_dims = points.shape[1]
+  simplices = triangulation.find_simplex(points)
+  inside = numpy.flatnonzero(simplices >= 0)
+  transforms = triangulation.transform[simplices[inside]]
+  coordinates = numpy.einsum('ijk,ik->ij', transforms[:, :n_dims],
+                             points[inside]-transforms[:, n_dims])
+  weights = numpy.column_stack((coordinates, 1.0-coordinates.sum(axis=1)))
+  columns = triangulation.simplices[simplices[inside]]
+  rows = numpy.repeat(inside, n_dims+1)
+  return sparse.csr_matrix((weights.ravel(), (rows, columns.ravel())),
+                           shape=(points.shape[0], triangulation.npoints))
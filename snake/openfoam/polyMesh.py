@@ -0,0 +1,390 @@
+# file: polyMesh.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Readers of OpenFOAM meshes (polyMesh) and fields (no ParaView).
+
+
+import os
+import re
+import gzip
+
+import numpy
+from scipy import spatial
+
+
+class PolyMesh(object):
+  """OpenFOAM mesh (points, faces, owner and neighbour cells of each face)
+  with its geometry (face centers and area vectors, cell centers and
+  volumes), computed once with vectorized operations.
+  """
+  def __init__(self, directory):
+    """Reads the mesh and computes its geometry.
+
+    Parameters
+    ----------
+    directory: string
+      Directory containing the polyMesh files
+      (e.g. '<case>/constant/polyMesh').
+    """
+    self.directory = directory
+    print('[info] reading OpenFOAM mesh in {} ...'.format(directory))
+    self.points = read_list(os.path.join(directory, 'points'))
+    self.face_points, self.face_offsets = read_faces(os.path.join(directory,
+                                                                  'faces'))
+    self.owner = read_list(os.path.join(directory, 'owner'))
+    self.neighbour = read_list(os.path.join(directory, 'neighbour'))
+    self.n_faces = self.face_offsets.size-1
+    self.n_internal_faces = self.neighbour.size
+    self.n_cells = int(max(self.owner.max(), self.neighbour.max(initial=-1))+1)
+    self._compute_face_geometry()
+    self._compute_cell_geometry()
+
+  def _compute_face_geometry(self):
+    """Computes the center and the area vector of each face
+    (decomposition into triangles around the average of the points)."""
+    starts, sizes = self.face_offsets[:-1], numpy.diff(self.face_offsets)
+    points = self.points[self.face_points]
+    estimates = numpy.add.reduceat(points, starts, axis=0)/sizes[:, None]
+    # next point of each face (cyclic)
+    following = numpy.arange(1, self.face_points.size+1)
+    following[self.face_offsets[1:]-1] = starts
+    faces = numpy.repeat(numpy.arange(self.n_faces), sizes)
+    centers = estimates[faces]
+    next_points = points[following]
+    normals = 0.5*numpy.cross(next_points-points, centers-points)
+    areas = numpy.sqrt((normals**2).sum(axis=1))
+    triangle_centers = (points+next_points+centers)/3.0
+    total_areas = numpy.add.reduceat(areas, starts)
+    self.face_areas = numpy.add.reduceat(normals, starts, axis=0)
+    self.face_centers = (numpy.add.reduceat(areas[:, None]*triangle_centers,
+                                            starts, axis=0)
+                         / numpy.maximum(total_areas, numpy.finfo(float).tiny)
+                         [:, None])
+
+  def _compute_cell_geometry(self):
+    """Computes the center and the volume of each cell
+    (decomposition into pyramids based on the faces)."""
+    internal = slice(0, self.n_internal_faces)
+    cells = numpy.concatenate((self.owner, self.neighbour))
+    face_centers = numpy.concatenate((self.face_centers,
+                                      self.face_centers[internal]))
+    counts = numpy.bincount(cells, minlength=self.n_cells)
+    estimates = numpy.array([numpy.bincount(cells, weights=face_centers[:, i],
+                                            minlength=self.n_cells)
+                             for i in range(3)]).T/counts[:, None]
+    # the area vector points outward of the owner, inward of the neighbour
+    areas = numpy.concatenate((self.face_areas, -self.face_areas[internal]))
+    volumes = (areas*(face_centers-estimates[cells])).sum(axis=1)
+    centers = 0.75*face_centers+0.25*estimates[cells]
+    cell_volumes = numpy.bincount(cells, weights=volumes,
+                                  minlength=self.n_cells)
+    self.cell_centers = numpy.array([numpy.bincount(cells,
+                                                    weights=volumes*centers[:, i],
+                                                    minlength=self.n_cells)
+                                     for i in range(3)]).T/cell_volumes[:, None]
+    self.cell_volumes = cell_volumes/3.0
+
+  def get_tree(self, n_dims=3):
+    """Returns the KD-tree of the cell-centers (built on first use).
+
+    Parameters
+    ----------
+    n_dims: integer, optional
+      Number of coordinates of the cell-centers used (2: x and y);
+      default: 3.
+
+    Returns
+    -------
+    tree: scipy.spatial.cKDTree object
+      The KD-tree.
+    """
+    if not hasattr(self, 'trees'):
+      self.trees = {}
+    if n_dims not in self.trees:
+      self.trees[n_dims] = spatial.cKDTree(self.cell_centers[:, :n_dims])
+    return self.trees[n_dims]
+
+  def get_triangulation(self, n_dims=3):
+    """Returns the Delaunay triangulation of the cell-centers
+    (computed on first use).
+
+    Parameters
+    ----------
+    n_dims: integer, optional
+      Number of coordinates of the cell-centers used (2: x and y);
+      default: 3.
+
+    Returns
+    -------
+    triangulation: scipy.spatial.Delaunay object
+      The triangulation.
+    """
+    if not hasattr(self, 'triangulations'):
+      self.triangulations = {}
+    if n_dims not in self.triangulations:
+      self.triangulations[n_dims] = spatial.Delaunay(
+                                        self.cell_centers[:, :n_dims])
+    return self.triangulations[n_dims]
+
+
+def read_foam_file(file_path):
+  """Reads an OpenFOAM file (possibly compressed) and parses its header.
+
+  Parameters
+  ----------
+  file_path: string
+    Path of the file (the compressed file '<file_path>.gz' is read if the
+    file does not exist).
+
+  Returns
+  -------
+  header: dictionary of (string, string) items
+    Entries of the FoamFile dictionary (e.g. 'format', 'class').
+  content: bytes
+    Content of the file following the header.
+  """
+  if not os.path.isfile(file_path) and os.path.isfile(file_path+'.gz'):
+    with gzip.open(file_path+'.gz', 'rb') as infile:
+      content = infile.read()
+  else:
+    with open(file_path, 'rb') as infile:
+      content = infile.read()
+  header = {}
+  match = re.search(br'FoamFile\s*\{(.*?)\}', content, re.DOTALL)
+  if match:
+    # quoted values (e.g. the architecture) may contain semicolons
+    for key, value in re.findall(br'(\w+)\s+("[^"]*"|[^;]*);',
+                                 match.group(1)):
+      header[key.decode()] = value.strip().strip(b'"').decode()
+    content = content[match.end():]
+  return header, content
+
+
+def get_binary_dtype(header, integer=False):
+  """Returns the type of the labels or of the scalars of a binary file,
+  from the architecture in the header (e.g. 'LSB;label=32;scalar=64').
+
+  Parameters
+  ----------
+  header: dictionary of (string, string) items
+    Header of the file.
+  integer: boolean, optional
+    Set 'True' for the type of the labels;
+    default: False (type of the scalars).
+
+  Returns
+  -------
+  dtype: Numpy data-type
+    The type.
+  """
+  arch = header.get('arch', '')
+  byte_order = '>' if 'MSB' in arch else '<'
+  kind, default = ('label', 32) if integer else ('scalar', 64)
+  match = re.search(r'{}=(\d+)'.format(kind), arch)
+  size = int(match.group(1)) if match else default
+  if size not in (32, 64):
+    raise ValueError('unsupported {} size in binary file: {} bits'
+                     ''.format(kind, size))
+  return numpy.dtype('{}{}{}'.format(byte_order, 'i' if integer else 'f',
+                                     size//8))
+
+
+def parse_list(content, header, position=0, dtype=numpy.float64, n_components=1):
+  """Parses a list ('<size>(...)') of labels, scalars or vectors.
+
+  Parameters
+  ----------
+  content: bytes
+    Content of the file.
+  header: dictionary of (string, string) items
+    Header of the file (format and architecture).
+  position: integer, optional
+    Position in the content where to search for the list;
+    default: 0.
+  dtype: Numpy data-type, optional
+    Type of the values (numpy.int64 for labels);
+    default: numpy.float64.
+  n_components: integer, optional
+    Number of components of each value (3 for vectors);
+    default: 1.
+
+  Returns
+  -------
+  values: Numpy array
+    The values; shape (size,) or (size, n_components).
+  end: integer
+    Position in the content following the list.
+  """
+  match = re.compile(br'(\d+)\s*\(').search(content, position)
+  if not match:
+    raise ValueError('no list found in the file')
+  size = int(match.group(1))
+  start = match.end()
+  if header.get('format') == 'binary':
+    item = get_binary_dtype(header,
+                            integer=numpy.issubdtype(dtype, numpy.integer))
+    n_bytes = size*n_components*item.itemsize
+    values = numpy.frombuffer(content[start:start+n_bytes], dtype=item)
+    end = content.index(b')', start+n_bytes)+1
+  else:
+    end = find_closing_parenthesis(content, start-1,
+                                   nested=(n_components > 1 and size > 0))+1
+    text = content[start:end-1]
+    if n_components > 1:
+      text = text.replace(b'(', b' ').replace(b')', b' ')
+    values = parse_numbers(text, numpy.float64)
+  values = values.astype(dtype)
+  if values.size != size*n_components:
+    raise ValueError('list of {} values expected, {} read'
+                     ''.format(size, values.size//n_components))
+  if n_components > 1:
+    values = values.reshape(size, n_components)
+  return values, end
+
+
+def parse_numbers(text, dtype):
+  """Parses numbers separated by whitespaces (ASCII content) in C.
+
+  A parsing error stops the parsing; it is detected by the callers,
+  which know the number of values expected.
+  """
+  if not text.strip():
+    return numpy.empty(0, dtype=dtype)
+  return numpy.fromstring(text, dtype=dtype, sep=' ')
+
+
+def find_closing_parenthesis(content, position, nested=False):
+  """Returns the position of the parenthesis closing a list opened at a given
+  position (ASCII content).
+
+  The items of a list are either numbers or, for a nested list (e.g. vectors,
+  faces), groups of numbers in parentheses; the list is therefore closed by
+  the first parenthesis (or by the first one following a closing one).
+
+  Parameters
+  ----------
+  content: bytes
+    Content of the file.
+  position: integer
+    Position of the opening parenthesis of the list.
+  nested: boolean, optional
+    Set 'True' if the items are in parentheses (non-empty list);
+    default: False.
+
+  Returns
+  -------
+  position: integer
+    Position of the closing parenthesis.
+  """
+  if nested:
+    match = re.compile(br'\)\s*\)').search(content, position+1)
+    if match:
+      return match.end()-1
+  else:
+    end = content.find(b')', position+1)
+    if end >= 0:
+      return end
+  raise ValueError('unbalanced parentheses')
+
+
+def read_list(file_path):
+  """Reads a file containing a list of labels (owner, neighbour),
+  or of vectors (points).
+
+  Parameters
+  ----------
+  file_path: string
+    Path of the file.
+
+  Returns
+  -------
+  values: Numpy array
+    The values (integers for labels).
+  """
+  header, content = read_foam_file(file_path)
+  if header.get('class') == 'vectorField':
+    return parse_list(content, header, n_components=3)[0]
+  return parse_list(content, header, dtype=numpy.int64)[0]
+
+
+def read_faces(file_path):
+  """Reads the faces of the mesh (faceList or faceCompactList).
+
+  Parameters
+  ----------
+  file_path: string
+    Path of the file.
+
+  Returns
+  -------
+  face_points: 1D array of integers
+    Index of the points of all faces.
+  face_offsets: 1D array of integers
+    Offset of the first point of each face in `face_points`
+    (the last offset being the total number of points).
+  """
+  header, content = read_foam_file(file_path)
+  if header.get('class') == 'faceCompactList':
+    face_offsets, end = parse_list(content, header, dtype=numpy.int64)
+    face_points, _ = parse_list(content, header, position=end,
+                                dtype=numpy.int64)
+    return face_points, face_offsets
+  # faceList (ASCII): '<size>(<n>(p0 p1 ...) <n>(...) ...)'
+  match = re.compile(br'(\d+)\s*\(').search(content)
+  n_faces = int(match.group(1))
+  end = find_closing_parenthesis(content, match.end()-1, nested=(n_faces > 0))
+  text = content[match.end():end]
+  values = parse_numbers(text.replace(b'(', b' ').replace(b')', b' '),
+                         numpy.int64)
+  # faces with the same number of points (e.g. hexahedral meshes)
+  size = values[0] if values.size else 0
+  if size and values.size == n_faces*(size+1):
+    values = values.reshape(n_faces, size+1)
+    if numpy.all(values[:, 0] == size):
+      return (values[:, 1:].ravel(),
+              numpy.arange(n_faces+1, dtype=numpy.int64)*size)
+    values = values.ravel()
+  # the number of points of each face precedes its opening parenthesis
+  sizes = parse_numbers(b' '.join(re.findall(br'(\d+)\s*\(', text)),
+                        numpy.int64)
+  starts = numpy.cumsum(numpy.append(0, sizes[:-1]+1))
+  if (sizes.size != n_faces or values.size != n_faces+sizes.sum()
+      or not numpy.array_equal(values[starts], sizes)):
+    raise ValueError('inconsistent faces in {}'.format(file_path))
+  mask = numpy.ones(values.size, dtype=bool)
+  mask[starts] = False
+  return values[mask], numpy.append(0, numpy.cumsum(sizes))
+
+
+def read_internal_field(file_path, n_cells=None):
+  """Reads the internal field (cell values) of a volScalarField or
+  volVectorField file (ASCII or binary).
+
+  Parameters
+  ----------
+  file_path: string
+    Path of the field file (e.g. '<case>/<time>/U').
+  n_cells: integer, optional
+    Number of cells (to expand a uniform field);
+    default: None.
+
+  Returns
+  -------
+  values: Numpy array of floats
+    Values at cell-centers; shape (cell,) or (cell, 3).
+  """
+  header, content = read_foam_file(file_path)
+  n_components = 3 if header.get('class') == 'volVectorField' else 1
+  match = re.compile(br'internalField\s+(uniform|nonuniform)').search(content)
+  if not match:
+    raise ValueError('no internal field in {}'.format(file_path))
+  if match.group(1) == b'uniform':
+    end = content.index(b';', match.end())
+    text = content[match.end():end].replace(b'(', b' ').replace(b')', b' ')
+    value = numpy.array(text.split(), dtype=numpy.float64)
+    if n_cells is None:
+      return value if n_components > 1 else value[0]
+    return numpy.tile(value, (n_cells, 1)).squeeze(axis=1 if n_components == 1
+                                                   else None)
+  values, _ = parse_list(content, header, position=match.end(),
+                         n_components=n_components)
+  return values
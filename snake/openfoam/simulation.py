@@ -3,14 +3,32 @@
 # description: Implementation of the class `OpenFOAMSimulation`.
 
 
+import io
 import os
+import re
+import functools
+from multiprocessing.pool import ThreadPool
 
 import numpy
+import pandas
 from scipy import signal
 from matplotlib import pyplot
 
 from ..simulation import Simulation
 from ..force import Force
+from .solverLog import SolverLog
+from .polyMesh import PolyMesh, read_internal_field
+from .cellResampler import CellResampler
+
+
+# field file and component of each field
+FIELD_FILES = {'pressure': ('p', None),
+               'x-velocity': ('U', 0),
+               'y-velocity': ('U', 1),
+               'z-velocity': ('U', 2)}
+
+# data line of a forces file grouping the vector components in parentheses
+GROUPED_LINE = re.compile(br'^[^#\n]*\(', re.MULTILINE)
 
 
 class OpenFOAMSimulation(Simulation):
@@ -41,7 +59,9 @@ class OpenFOAMSimulation(Simulation):
                                              'forces'),
                   force_coefficients_folder=os.path.join('postProcessing', 
                                                          'forceCoeffs'),
-                  usecols=(0, 2, 3)):
+                  usecols=None,
+                  follow=False,
+                  jobs=4):
     """Reads forces from files.
 
     Parameters
@@ -62,7 +82,19 @@ class OpenFOAMSimulation(Simulation):
       default: 'postProcessing/forceCoeffs'.
     usecols: tuple of integers, optional
       Index of columns to read from file, including the time-column index;
-      default: (0, 2, 3).
+      in a forces file grouping the vectors in parentheses, the columns are
+      the time, the total force (x, y, z) and the total moment (x, y, z),
+      summing the pressure, viscous (and porous) contributions
+      (see `parse_force_data`);
+      default: None ((0, 2, 3) for the force coefficients,
+      (0, 1, 2) for the forces).
+    follow: boolean, optional
+      Set 'True' to only read the lines appended to the file of the latest
+      restart since the previous call (for a running simulation);
+      default: False.
+    jobs: integer, optional
+      Number of restart files parsed concurrently;
+      default: 4.
     """
     if display_coefficients:
       info = {'directory': os.path.join(self.directory, 
@@ -71,6 +103,8 @@ class OpenFOAMSimulation(Simulation):
               'description': 'force-coefficients'}
       if not labels:
         labels = ['$C_d$', '$C_l$']
+      if not usecols:
+        usecols = (0, 2, 3)
     else:
       info = {'directory': os.path.join(self.directory,
                                         forces_folder),
@@ -78,6 +112,8 @@ class OpenFOAMSimulation(Simulation):
               'description': 'forces'}
       if not labels:
         labels = ['$F_x$', '$F_y$']
+      if not usecols:
+        usecols = (0, 1, 2)
     info['usecols'] = usecols
     info['labels'] = labels
     # backward compatibility from 2.2.2 to 2.0.1
@@ -85,21 +121,56 @@ class OpenFOAMSimulation(Simulation):
       info['directory'] = '{}/forces'.format(self.directory)
       info['usecols'] = (0, 1, 2)
     # end of backward compatibility
+    # one subdirectory per restart, named after its starting time
+    subdirectories = sorted(os.listdir(info['directory']), key=float)
+    file_paths = [os.path.join(info['directory'], subdirectory,
+                               info['file-name'])
+                  for subdirectory in subdirectories]
+    if follow:
+      def read_previous_restarts():
+        """Reads the forces written before the latest restart."""
+        data = read_restarts(file_paths[:-1], info['usecols'], jobs=jobs)
+        return data[:, data[0] < float(subdirectories[-1])]
+      self.follow_forces(file_paths[-1], info['usecols'], info['labels'],
+                         initial=read_previous_restarts,
+                         parser=parse_force_data)
+      return
     print('[info] reading {} in {} ...'.format(info['description'], info['directory']))
-    subdirectories = sorted(os.listdir(info['directory']))
-    times = numpy.empty(0)
-    force_x, force_y = numpy.empty(0), numpy.empty(0)
-    for subdirectory in subdirectories:
-      forces_path = os.path.join(info['directory'], subdirectory, info['file-name'])
-      with open(forces_path, 'r') as infile:
-        t, fx, fy = numpy.loadtxt(infile, dtype=float, comments='#', 
-                                  usecols=info['usecols'], unpack=True)
-      times = numpy.append(times, t)
-      force_x, force_y = numpy.append(force_x, fx), numpy.append(force_y, fy)
+    data = read_restarts(file_paths, info['usecols'], jobs=jobs)
     # set Force objects
     self.forces = []
-    self.forces.append(Force(times, force_x, label=labels[0]))
-    self.forces.append(Force(times, force_y, label=labels[1]))
+    for index, values in enumerate(data[1:]):
+      self.forces.append(Force(data[0], values, label=labels[index]))
+
+  def read_log(self, file_path, use_cache=True):
+    """Reads the history of the time-steps from the log of the solver
+    (times, Courant numbers, residuals, iterations and timings).
+
+    The log is parsed once; the columns are stored in a sidecar file
+    ('<log>.snake.npz') so that reading the log again (e.g. while the
+    simulation is running) only parses the new time-steps.
+
+    Parameters
+    ----------
+    file_path: string
+      Path of the log file.
+    use_cache: boolean, optional
+      Set 'False' to ignore the sidecar file;
+      default: True.
+
+    Returns
+    -------
+    log: dictionary of (string, 1D array of floats) items
+      History of each quantity (see `SolverLog.read`).
+    """
+    if not hasattr(self, 'solver_logs'):
+      self.solver_logs = {}
+    key = (os.path.abspath(file_path), use_cache)
+    if key not in self.solver_logs:
+      self.solver_logs[key] = SolverLog(file_path, use_cache=use_cache)
+    print('[info] reading log {} ...'.format(file_path))
+    self.log = self.solver_logs[key].read()
+    return self.log
 
   def read_maximum_cfl(self, file_path):
     """Reads the instantaneous maximum CFL number from a given log file.
@@ -114,16 +185,8 @@ class OpenFOAMSimulation(Simulation):
     cfl: dictionary of (string, 1D array of floats) items
       Contains the discrete time and cfl values.
     """
-    print('[info] reading CFL from {} ...'.format(file_path)),
-    with open(file_path, 'r') as infile:
-      times = numpy.array([float(line.split()[-1]) 
-                           for line in infile if line.startswith('Time = ')])
-    with open(file_path, 'r') as infile:
-      cfl = numpy.array([float(line.split()[-1]) 
-                         for line in infile if line.startswith('Courant Number mean')])
-    assert(times.shape == cfl.shape)
-    self.cfl = {'times': times, 'values': cfl}
-    print('done')
+    log = self.read_log(file_path)
+    self.cfl = {'times': log['time'], 'values': log['courant-max']}
     return self.cfl
 
   def get_mean_maximum_cfl(self, limits=(0.0, float('inf'))):
@@ -234,6 +297,201 @@ class OpenFOAMSimulation(Simulation):
       pyplot.show()
     pyplot.close()
 
+  def read_mesh(self, directory=None):
+    """Reads the OpenFOAM mesh and computes its cell-centers
+    (once per mesh directory).
+
+    Parameters
+    ----------
+    directory: string, optional
+      Directory containing the polyMesh files;
+      default: None ('<simulation directory>/constant/polyMesh').
+
+    Returns
+    -------
+    mesh: PolyMesh object
+      The mesh (see `PolyMesh`).
+    """
+    if not directory:
+      directory = os.path.join(self.directory, 'constant', 'polyMesh')
+    if not hasattr(self, 'meshes'):
+      self.meshes = {}
+    key = os.path.abspath(directory)
+    if key not in self.meshes:
+      self.meshes[key] = PolyMesh(directory)
+    self.mesh = self.meshes[key]
+    return self.mesh
+
+  def get_time_directory(self, time):
+    """Returns the directory of the solution at a given time
+    (the name of the directory is compared as a float).
+
+    Parameters
+    ----------
+    time: float
+      Time of the solution.
+
+    Returns
+    -------
+    directory: string
+      Path of the time directory.
+    """
+    for name in os.listdir(self.directory):
+      try:
+        value = float(name)
+      except ValueError:
+        continue
+      if abs(value-time) <= 1.0E-06*max(1.0, abs(time)):
+        return os.path.join(self.directory, name)
+    raise ValueError('no solution at time {}'.format(time))
+
+  def read_cell_field(self, field_name, time, mesh_directory=None):
+    """Reads the values of a field at the cell-centers of the mesh,
+    without ParaView.
+
+    Parameters
+    ----------
+    field_name: string
+      Name of the field;
+      choices: pressure, x-velocity, y-velocity, z-velocity,
+      or the name of any OpenFOAM field file (e.g. 'U', 'p').
+    time: float
+      Time of the solution.
+    mesh_directory: string, optional
+      Directory containing the polyMesh files;
+      default: None ('<simulation directory>/constant/polyMesh').
+
+    Returns
+    -------
+    values: Numpy array of floats
+      Values at the cell-centers (`self.mesh.cell_centers`);
+      shape (cell,) or (cell, 3) for a vector field.
+    """
+    mesh = self.read_mesh(directory=mesh_directory)
+    file_name, component = FIELD_FILES.get(field_name, (field_name, None))
+    values = self._read_field_file(file_name, time, mesh)
+    if component is not None:
+      values = values[:, component]
+    return values
+
+  def _read_field_file(self, file_name, time, mesh):
+    """Reads the internal field of a field file at a given time."""
+    file_path = os.path.join(self.get_time_directory(time), file_name)
+    print('[info] reading {} at time {} ...'.format(file_name, time))
+    values = read_internal_field(file_path, n_cells=mesh.n_cells)
+    if values.shape[0] != mesh.n_cells:
+      raise ValueError('{} values in {} for {} cells'.format(values.shape[0],
+                                                             file_path,
+                                                             mesh.n_cells))
+    return values
+
+  def get_resampler(self, grid,
+                    method='idw',
+                    n_neighbors=8,
+                    power=2.0,
+                    max_distance=None,
+                    z=None,
+                    mesh_directory=None):
+    """Returns the operator resampling cell values onto a Cartesian grid
+    (computed once per mesh, grid and parameters).
+
+    Parameters
+    ----------
+    grid: list of 1d arrays of floats
+      Nodal stations in each direction of the Cartesian grid.
+    method: string, optional
+      Weights of the cell-centers;
+      choices: 'idw' (inverse-distance), 'linear' (barycentric);
+      default: 'idw'.
+    n_neighbors: integer, optional
+      Number of nearest cell-centers used ('idw' method);
+      default: 8.
+    power: float, optional
+      Power of the inverse distance ('idw' method);
+      default: 2.0.
+    max_distance: float, optional
+      Grid nodes farther from the closest cell-center are filled with NaN
+      ('idw' method);
+      default: None (no limit).
+    z: float, optional
+      Location of the plane of a 2D grid in a 3D mesh;
+      default: None (the z-coordinate is ignored).
+    mesh_directory: string, optional
+      Directory containing the polyMesh files;
+      default: None ('<simulation directory>/constant/polyMesh').
+
+    Returns
+    -------
+    resampler: CellResampler object
+      The resampling operator (see `CellResampler`).
+    """
+    mesh = self.read_mesh(directory=mesh_directory)
+    if not hasattr(self, 'resamplers'):
+      self.resamplers = {}
+    key = (id(mesh),
+           tuple(numpy.asarray(stations, dtype=numpy.float64).tobytes()
+                 for stations in grid),
+           method, n_neighbors, power, max_distance, z)
+    if key not in self.resamplers:
+      print('[info] computing the resampling weights ({}) ...'.format(method))
+      self.resamplers[key] = CellResampler(mesh, grid, method=method,
+                                           n_neighbors=n_neighbors,
+                                           power=power,
+                                           max_distance=max_distance, z=z)
+    return self.resamplers[key]
+
+  def read_fields(self, field_names, time, grid,
+                  method='idw',
+                  n_neighbors=8,
+                  power=2.0,
+                  max_distance=None,
+                  z=None,
+                  mesh_directory=None):
+    """Reads fields at a given time and resamples them onto a Cartesian
+    grid (to compare them with fields of other simulations).
+
+    The resampled fields are stored in the dictionary `self.fields`.
+
+    Parameters
+    ----------
+    field_names: list of strings or single string
+      Name of the fields to get;
+      choices: 'pressure', 'x-velocity', 'y-velocity', 'z-velocity',
+      or the name of any scalar OpenFOAM field file.
+    time: float
+      Time of the solution.
+    grid: list of 1d arrays of floats
+      Nodal stations in each direction of the Cartesian grid.
+    method, n_neighbors, power, max_distance, z, mesh_directory: optional
+      Parameters of the resampling (see `get_resampler`).
+
+    Returns
+    -------
+    fields: list of Field objects
+      The resampled fields.
+    """
+    if isinstance(field_names, basestring):
+      field_names = [field_names]
+    resampler = self.get_resampler(grid, method=method,
+                                   n_neighbors=n_neighbors, power=power,
+                                   max_distance=max_distance, z=z,
+                                   mesh_directory=mesh_directory)
+    mesh = self.mesh
+    # each field file (e.g. the velocity 'U') is read once
+    files = {}
+    fields = []
+    for field_name in field_names:
+      file_name, component = FIELD_FILES.get(field_name, (field_name, None))
+      if file_name not in files:
+        files[file_name] = self._read_field_file(file_name, time, mesh)
+      values = files[file_name]
+      if component is not None:
+        values = values[:, component]
+      self.fields[field_name] = resampler.resample(values, label=field_name,
+                                                   time_step=time)
+      fields.append(self.fields[field_name])
+    return fields
+
   def plot_field_contours_paraview(self, field_name,
                                    field_range=(-1.0, 1.0),
                                    view=(-2.0, -2.0, 2.0, 2.0), 
@@ -330,3 +588,120 @@ class OpenFOAMSimulation(Simulation):
                           'plotMesh2dParaView.py')
     arguments = ' '.join([key+' '+value for key, value in args.iteritems()])
     os.system('pvbatch {} {}'.format(script, arguments))
+
+
+def read_force_file(file_path, usecols):
+  """Reads columns of an OpenFOAM forces (or force-coefficients) file.
+
+  Parameters
+  ----------
+  file_path: string
+    Path of the file.
+  usecols: tuple of integers
+    Index of the columns to read (see `parse_force_data`).
+
+  Returns
+  -------
+  data: 2D array of floats
+    The columns read; shape (column, time).
+  """
+  with open(file_path, 'rb') as infile:
+    content = infile.read()
+  return parse_force_data(content, usecols)
+
+
+def parse_force_data(content, usecols):
+  """Parses the content of an OpenFOAM forces (or force-coefficients) file
+  with the C parser of Pandas.
+
+  The forces files of OpenFOAM-2.x group the components of each contribution
+  in parentheses: `time ((pressure) (viscous) [(porous)]) ((pressure)
+  (viscous) [(porous)])`, the first group being the force, the second one
+  the moment.
+  In such a file, the contributions are summed and the columns are:
+  0, the time; 1 to 3, the total force (x, y, z);
+  4 to 6, the total moment (x, y, z).
+  Other files (e.g. force coefficients) are read as they are.
+  Incomplete lines (file being written) are dropped.
+
+  Parameters
+  ----------
+  content: bytes
+    Content of the file (complete lines).
+  usecols: tuple of integers
+    Index of the columns to read.
+
+  Returns
+  -------
+  data: 2D array of floats
+    The columns read; shape (column, time).
+  """
+  # parentheses in the comments (e.g. 'Cl(f)') do not count
+  grouped = GROUPED_LINE.search(content) is not None
+  if grouped:
+    content = content.translate(None, b'()')
+  try:
+    dataframe = pandas.read_csv(io.BytesIO(content), engine='c',
+                                delim_whitespace=True, comment='#',
+                                header=None, 
+                                usecols=(None if grouped else list(usecols)),
+                                float_precision='round_trip')
+  except pandas.errors.EmptyDataError:
+    return numpy.empty((len(usecols), 0))
+  if grouped:
+    data = dataframe.values.astype(numpy.float64).T
+    # time, then the contributions (3 components each) to the force and
+    # to the moment
+    n_contributions, remainder = divmod(data.shape[0]-1, 6)
+    if remainder or not n_contributions:
+      raise ValueError('unexpected number of columns in forces file: {}'
+                       ''.format(data.shape[0]))
+    totals = data[1:].reshape(2, n_contributions, 3, -1).sum(axis=1)
+    data = numpy.concatenate((data[:1], totals.reshape(6, -1)))[list(usecols)]
+  else:
+    data = dataframe[list(usecols)].values.astype(numpy.float64).T
+  return data[:, ~numpy.isnan(data).any(axis=0)]
+
+
+def read_restarts(file_paths, usecols, jobs=4):
+  """Reads the forces files of consecutive restarts concurrently and
+  concatenates them once.
+
+  When a restart rewrites part of the history, the data of the latest
+  restart are kept: the data of a restart are truncated at the first time
+  of the following ones.
+
+  Parameters
+  ----------
+  file_paths: list of strings
+    Path of the forces file of each restart, in chronological order.
+  usecols: tuple of integers
+    Index of the columns to read (the first one being the time).
+  jobs: integer, optional
+    Number of files parsed concurrently;
+    default: 4.
+
+  Returns
+  -------
+  data: 2D array of floats
+    The columns read; shape (column, time).
+  """
+  if not file_paths:
+    return numpy.empty((len(usecols), 0))
+  reader = functools.partial(read_force_file, usecols=usecols)
+  if jobs > 1 and len(file_paths) > 1:
+    pool = ThreadPool(processes=min(jobs, len(file_paths)))
+    try:
+      chunks = pool.map(reader, file_paths)
+    finally:
+      pool.close()
+      pool.join()
+  else:
+    chunks = [reader(file_path) for file_path in file_paths]
+  cutoff = float('inf')
+  for index in range(len(chunks)-1, -1, -1):
+    chunk = chunks[index]
+    chunks[index] = chunk[:, chunk[0] < cutoff]
+    if chunk.shape[1]:
+      cutoff = min(cutoff, chunk[0, 0])
+  return numpy.concatenate(chunks, axis=1)
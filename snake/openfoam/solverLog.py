@@ -0,0 +1,222 @@
+# file: solverLog.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Implementation of the class `SolverLog`.
+
+
+import os
+import re
+import mmap
+
+import numpy
+
+
+# lines of interest in the log of an OpenFOAM solver (e.g. icoFoam);
+# starting with a new-line character lets the search skip to the next line
+LOG_PATTERN = re.compile(
+    br'\n(?:'
+    br'Time = ([^\n]*)'
+    br'|Courant Number mean: (\S+) max: (\S+)'
+    br'|[^\n:]+:\s+Solving for (\w+), '
+    br'Initial residual = ([^,\s]+), '
+    br'Final residual = ([^,\s]+), '
+    br'No Iterations (\d+)'
+    br'|ExecutionTime = (\S+) s\s+ClockTime = (\S+) s)')
+
+# number of bytes, at the beginning of the log (banner, date, time and PID
+# of the run) and before the end of the part parsed, identifying a log
+SIGNATURE_HEAD_SIZE = 4096
+SIGNATURE_TAIL_SIZE = 256
+
+
+class SolverLog(object):
+  """Columnar history of an OpenFOAM solver log (time, Courant numbers,
+  residuals, iterations and timings of each time-step).
+
+  The log is memory-mapped and scanned once with a precompiled pattern
+  (matches are collected by the regular-expression engine);
+  the columns and the byte offset of the last complete time-step are stored
+  in a sidecar file, so that reading the log again only parses the new tail.
+  """
+  def __init__(self, file_path, use_cache=True):
+    """Registers the log file (nothing is read yet).
+
+    Parameters
+    ----------
+    file_path: string
+      Path of the log file.
+    use_cache: boolean, optional
+      Set 'False' to ignore (and not write) the sidecar file;
+      default: True.
+    """
+    self.file_path = file_path
+    self.cache_path = file_path+'.snake.npz'
+    self.use_cache = use_cache
+    self.offset = 0
+    self.columns = {}
+
+  def read(self):
+    """Parses the complete time-steps written since the last read
+    (from the sidecar file, if any, the first time).
+
+    Returns
+    -------
+    columns: dictionary of (string, 1D array of floats) items
+      History of each quantity, one value per time-step: 'time',
+      'courant-mean', 'courant-max', 'execution-time', 'clock-time', and
+      '<field>-initial-residual', '<field>-final-residual',
+      '<field>-iterations' for each field solved (initial residual of the
+      first solve, final residual of the last solve, and total number of
+      iterations during the time-step; NaN if not solved).
+    """
+    size = os.path.getsize(self.file_path)
+    if not self.columns and self.use_cache:
+      self._load_cache(size)
+    if (size < self.offset
+        or self.columns.get('signature') != self._get_signature(self.offset)):
+      # the log has been rewritten
+      self.offset, self.columns = 0, {}
+    if size > self.offset:
+      with open(self.file_path, 'rb') as infile:
+        buffer = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+          end = self._get_last_step_end(buffer, self.offset, size)
+          if end > self.offset:
+            columns = self._parse(buffer, self.offset, end)
+            self._append(columns)
+            self.offset = end
+            self.columns['signature'] = self._get_signature(end)
+            if self.use_cache:
+              self._save_cache()
+        finally:
+          buffer.close()
+    return dict((key, value) for key, value in self.columns.items()
+                if key != 'signature')
+
+  def _get_signature(self, offset):
+    """Returns the beginning of the log (identifies the run) followed by the
+    bytes preceding a given offset (identifies the part already parsed:
+    they are unchanged when lines are appended, but not when the log is
+    rewritten by a new run with the same banner)."""
+    if not offset:
+      return None
+    with open(self.file_path, 'rb') as infile:
+      head = infile.read(min(SIGNATURE_HEAD_SIZE, offset))
+      start = max(len(head), offset-SIGNATURE_TAIL_SIZE)
+      infile.seek(start)
+      return head+infile.read(offset-start)
+
+  def _get_last_step_end(self, buffer, start, end):
+    """Returns the byte offset following the last complete time-step
+    (line starting with 'ExecutionTime = ' terminated by a new line)."""
+    while True:
+      position = buffer.rfind(b'\nExecutionTime = ', start, end)
+      if position < 0:
+        return start
+      line_end = buffer.find(b'\n', position+1, end)
+      if line_end >= 0:
+        return line_end+1
+      end = position+1
+
+  def _parse(self, buffer, start, end):
+    """Parses a part of the log made of complete time-steps."""
+    times, courants, timings = [], [], []
+    # per field: time-step, initial and final residuals, and iterations
+    # of each solve
+    residuals = {}
+    step = -1
+    # the part parsed starts after the timings of a time-step (or at the
+    # beginning of the log)
+    timed = True
+    # the new-line character preceding the start is part of the first match
+    for groups in LOG_PATTERN.findall(buffer, max(0, start-1), end):
+      if groups[0]:
+        times.append(float(groups[0]))
+        step += 1
+        timed = False
+      elif groups[1]:
+        # a Courant number printed after the timings of a time-step
+        # (e.g. pimpleFoam) belongs to the next time-step
+        courants.append((step+1 if timed else step,
+                         float(groups[1]), float(groups[2])))
+      elif groups[3]:
+        solves = residuals.get(groups[3])
+        if solves is None:
+          solves = residuals[groups[3]] = ([], [], [], [])
+        solves[0].append(step)
+        solves[1].append(float(groups[4]))
+        solves[2].append(float(groups[5]))
+        solves[3].append(int(groups[6]))
+      else:
+        timings.append((step, float(groups[7]), float(groups[8])))
+        timed = True
+    n_steps = len(times)
+    columns = {'time': numpy.array(times)}
+    for names, values in [(('courant-mean', 'courant-max'), courants),
+                          (('execution-time', 'clock-time'), timings)]:
+      values = numpy.array(values, dtype=numpy.float64).reshape(-1, 3)
+      steps = values[:, 0].astype(int)
+      # values outside the time-steps parsed are ignored
+      mask = (steps >= 0) & (steps < n_steps)
+      for name, column_values in zip(names, values[mask, 1:].T):
+        column = numpy.full(n_steps, numpy.nan)
+        column[steps[mask]] = column_values
+        columns[name] = column
+    for field, solves in residuals.items():
+      steps, initials, finals, iterations = (numpy.array(values)
+                                             for values in solves)
+      # solves before the first time-step are ignored
+      mask = steps >= 0
+      steps, initials = steps[mask], initials[mask]
+      finals, iterations = finals[mask], iterations[mask]
+      if not steps.size:
+        continue
+      # first and last solve of each time-step
+      firsts = numpy.flatnonzero(numpy.append(True, numpy.diff(steps) != 0))
+      lasts = numpy.append(firsts[1:]-1, steps.size-1)
+      name = str(field.decode())
+      for suffix, values in [('-initial-residual', initials[firsts]),
+                             ('-final-residual', finals[lasts]),
+                             ('-iterations',
+                              numpy.add.reduceat(iterations, firsts))]:
+        column = numpy.full(n_steps, numpy.nan)
+        column[steps[firsts]] = values
+        columns[name+suffix] = column
+    return columns
+
+  def _append(self, columns):
+    """Appends parsed columns to the history (missing columns are NaN)."""
+    n_old = self.columns['time'].size if 'time' in self.columns else 0
+    n_new = columns['time'].size
+    for name in set(self.columns) | set(columns):
+      if name == 'signature':
+        continue
+      old = self.columns.get(name, numpy.full(n_old, numpy.nan))
+      new = columns.get(name, numpy.full(n_new, numpy.nan))
+      self.columns[name] = numpy.concatenate((old, new))
+
+  def _load_cache(self, size):
+    """Loads the columns and the offset from the sidecar file
+    (ignored if it does not match the log)."""
+    try:
+      with numpy.load(self.cache_path) as cache:
+        columns = dict((name, cache[name]) for name in cache.files)
+    except (IOError, OSError, ValueError):
+      return
+    offset = int(columns.pop('offset'))
+    columns['signature'] = columns['signature'].tostring()
+    if offset > size or columns['signature'] != self._get_signature(offset):
+      return
+    self.columns, self.offset = columns, offset
+
+  def _save_cache(self):
+    """Writes the columns and the offset in the sidecar file."""
+    columns = dict((name, value) for name, value in self.columns.items()
+                   if name != 'signature')
+    columns['offset'] = numpy.array(self.offset)
+    columns['signature'] = numpy.frombuffer(self.columns['signature'],
+                                            dtype=numpy.uint8)
+    try:
+      with open(self.cache_path, 'wb') as outfile:
+        numpy.savez(outfile, **columns)
+    except (IOError, OSError):
+      pass
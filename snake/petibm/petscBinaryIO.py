@@ -0,0 +1,67 @@
+# file: petscBinaryIO.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Reads and writes PETSc vectors in PETSc binary format
+#              (no PETSc installation required).
+
+
+import numpy
+
+
+# PETSc identifier written at the beginning of a binary Vec
+VEC_FILE_CLASSID = 1211214
+
+
+def read_vec(file_path, index_dtype='>i4', scalar_dtype='>f8'):
+  """Reads a PETSc Vec from a file written in PETSc binary format.
+
+  The file starts with a big-endian header (class identifier and number of
+  values) followed by the big-endian values.
+  The values are memory-mapped (copy-on-write), i.e. they are paged-in from
+  the file on access and any reshaping or slicing of the returned array is
+  a view that does not copy data.
+
+  Parameters
+  ----------
+  file_path: string
+    Path of the file.
+  index_dtype: string, optional
+    Data-type of the integers in the header;
+    default: '>i4' (PETSc configured with 32-bit indices).
+  scalar_dtype: string, optional
+    Data-type of the values;
+    default: '>f8' (PETSc configured with double-precision real scalars).
+
+  Returns
+  -------
+  vec: 1D memory-mapped array of floats
+    The values of the vector.
+  """
+  index_dtype = numpy.dtype(index_dtype)
+  header = numpy.fromfile(file_path, dtype=index_dtype, count=2)
+  if header.size < 2 or header[0] != VEC_FILE_CLASSID:
+    raise ValueError('{} does not contain a PETSc Vec'.format(file_path))
+  n = int(header[1])
+  return numpy.memmap(file_path, dtype=scalar_dtype, mode='c',
+                      offset=2*index_dtype.itemsize, shape=(n,))
+
+
+def write_vec(file_path, values, index_dtype='>i4', scalar_dtype='>f8'):
+  """Writes values in a file as a PETSc Vec in PETSc binary format.
+
+  Parameters
+  ----------
+  file_path: string
+    Path of the file.
+  values: Numpy array of floats
+    Values to write (flattened in C-order).
+  index_dtype: string, optional
+    Data-type of the integers in the header;
+    default: '>i4'.
+  scalar_dtype: string, optional
+    Data-type of the values;
+    default: '>f8'.
+  """
+  values = numpy.asarray(values).flatten()
+  with open(file_path, 'wb') as outfile:
+    numpy.array([VEC_FILE_CLASSID, values.size], dtype=index_dtype).tofile(outfile)
+    values.astype(scalar_dtype).tofile(outfile)
@@ -4,26 +4,25 @@
 
 
 import os
-import sys
 import struct
 
 import numpy
 
-try:
-  sys.path.append(os.path.join(os.environ['PETSC_DIR'], 'bin', 'pythonscripts'))
-  import PetscBinaryIO
-except:
-  pass
-
 from ..barbaGroupSimulation import BarbaGroupSimulation
 from ..field import Field
+from ..gridMetrics import GridMetrics
 from ..force import Force
+from . import petscBinaryIO
 
 
 class PetIBMSimulation(BarbaGroupSimulation):
   """Contains info about a PetIBM simulation.
   Inherits from the class BarbaGroupSimulation.
   """
+  # solution files (in each time-step folder) containing fluxes and pressure
+  flux_file_names = ['qx.dat', 'qy.dat', 'qz.dat']
+  pressure_file_names = ['phi.dat']
+
   def __init__(self, description=None, directory=os.getcwd(), **kwargs):
     """Initializes by calling the parent constructor.
 
@@ -71,9 +70,10 @@ class PetIBMSimulation(BarbaGroupSimulation):
         n_cells = numpy.array([int(n) for n in infile.readline().strip().split()])
         coords = numpy.loadtxt(infile, dtype=numpy.float64)
       self.grid = numpy.array(numpy.split(coords, numpy.cumsum(n_cells[:-1]+1)))
+    self.grid_metrics = GridMetrics(self.grid)
     print('\tgrid-size: {}x{}'.format(self.grid[0].size-1, self.grid[0].size-1))
 
-  def read_forces(self, file_path=None, labels=None):
+  def read_forces(self, file_path=None, labels=None, follow=False):
     """Reads forces from files.
 
     Parameters
@@ -84,23 +84,36 @@ class PetIBMSimulation(BarbaGroupSimulation):
     labels: list of strings, optional
       Label to give to each force that will be read from file;
       default: None
+    follow: boolean, optional
+      Set 'True' to only read the lines appended since the previous call
+      (for a running simulation);
+      default: False.
     """
     if not file_path:
       file_path = os.path.join(self.directory, 'forces.txt')
+    if not labels:
+      labels = ['f_x', 'f_z', 'f_z'] # default labels
+    if follow:
+      with open(file_path, 'r') as infile:
+        n_columns = len(infile.readline().split())
+      self.follow_forces(file_path, range(n_columns), labels)
+      return
     print('[info] reading forces ...'),
     with open(file_path, 'r') as infile:
       data = numpy.loadtxt(infile, dtype=numpy.float64, unpack=True)
     times = data[0]
-    if not labels:
-      labels = ['f_x', 'f_z', 'f_z'] # default labels
     self.forces = []
     for index, values in enumerate(data[1:]):
       self.forces.append(Force(times, values, label=labels[index]))
     print('done')
 
-  def read_fluxes(self, time_step, periodic_directions=[], **kwargs):
+  def read_fluxes(self, time_step, periodic_directions=[], directory=None,
+                  **kwargs):
     """Reads the flux fields at a given time-step.
 
+    The values of the returned fields are views into the memory-mapped
+    PETSc binary files.
+
     Parameters
     ----------
     time_step: integer
@@ -108,6 +121,9 @@ class PetIBMSimulation(BarbaGroupSimulation):
     periodic_directions: list of strings, optional
       Directions that have periodic boundary conditions; 
       default: [].
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
 
     Returns
     -------
@@ -115,75 +131,42 @@ class PetIBMSimulation(BarbaGroupSimulation):
       Fluxes in the x-, y-, and z-directions.
     """
     print('[time-step {}] reading fluxes from files ...'.format(time_step)),
-    dim3 = (len(self.grid) == 3)
+    metrics = self.get_grid_metrics()
     # folder with numerical solution
-    folder = os.path.join(self.directory, '{:0>7}'.format(time_step))
-    # read grid-stations and fluxes
-    x, y = self.grid[:2]
-    nx, ny = x.size-1, y.size-1
-    qx_file_path = os.path.join(folder, 'qx.dat')
-    qx = PetscBinaryIO.PetscBinaryIO().readBinaryFile(qx_file_path)[0]
-    qy_file_path = os.path.join(folder, 'qy.dat')
-    qy = PetscBinaryIO.PetscBinaryIO().readBinaryFile(qy_file_path)[0]
-    if dim3:
-      z = self.grid[2]
-      nz = z.size-1
-      qz_file_path = os.path.join(folder, 'qz.dat')
-      qz = PetscBinaryIO.PetscBinaryIO().readBinaryFile(qz_file_path)[0]
+    if not directory:
+      directory = self.directory
+    folder = os.path.join(directory, '{:0>7}'.format(time_step))
     # create flux Field objects in staggered arrangement
-    # reshape fluxes in multi-dimensional arrays
-    if dim3:
-      qx = qx.reshape((nz, ny, (nx if 'x' in periodic_directions else nx-1)))
-      qx = qx[:, :, :(-1 if 'x' in periodic_directions else None)]
-      qx = Field(label='x-flux',
-                 time_step=time_step,
-                 x=x[1:-1], 
-                 y=0.5*(y[:-1]+y[1:]), 
-                 z=0.5*(z[:-1]+z[1:]), 
-                 values=qx)
-      qy = qy.reshape((nz, (ny if 'y' in periodic_directions else ny-1), nx))
-      qy = qy[:, :(-1 if 'y' in periodic_directions else None), :]
-      qy = Field(label='y-flux',
-                 time_step=time_step,
-                 x=0.5*(x[:-1]+x[1:]), 
-                 y=y[1:-1], 
-                 z=0.5*(z[:-1]+z[1:]), 
-                 values=qy)
-      qz = qz.reshape(((nz if 'z' in periodic_directions else nz-1), ny, nx))
-      qz = qz[:(-1 if 'z' in periodic_directions else None), :, :]
-      qz = Field(label='z-flux',
-                 time_step=time_step,
-                 x=0.5*(x[:-1]+x[1:]), 
-                 y=0.5*(y[:-1]+y[1:]), 
-                 z=z[1:-1], 
-                 values=qz)
-      print('done')
-      return qx, qy, qz
-    else:
-      qx = qx.reshape((ny, (nx if 'x' in periodic_directions else nx-1)))
-      qx = qx[:, :(-1 if 'x' in periodic_directions else None)]
-      qx = Field(label='x-flux',
-                 time_step=time_step,
-                 x=x[1:-1],
-                 y=0.5*(y[:-1]+y[1:]),
-                 values=qx)
-      qy = qy.reshape(((ny if 'y' in periodic_directions else ny-1), nx))
-      qy = qy[:(-1 if 'y' in periodic_directions else None), :]
-      qy = Field(label='y-flux',
-                 time_step=time_step,
-                 x=0.5*(x[:-1]+x[1:]),
-                 y= y[1:-1],
-                 values=qy)
-      print('done')
-      return qx, qy
-
-  def read_pressure(self, time_step, **kwargs):
+    # (arrays are ordered z, y, x)
+    fluxes = []
+    for i, direction in enumerate(metrics.directions):
+      q = petscBinaryIO.read_vec(os.path.join(folder, 'q{}.dat'.format(direction)))
+      periodic = direction in periodic_directions
+      # a periodic direction stores one more flux (duplicated), dropped here
+      shape = [n-1 if j == i and not periodic else n
+               for j, n in enumerate(metrics.n_cells)]
+      key = [slice(None)]*metrics.ndim
+      key[i] = slice(None, (-1 if periodic else None))
+      q = q.reshape(shape[::-1])[tuple(key[::-1])]
+      nodes = metrics.nodes[direction+'-flux']
+      fluxes.append(Field(label=direction+'-flux',
+                          time_step=time_step,
+                          x=nodes[0], y=nodes[1],
+                          z=(nodes[2] if metrics.ndim == 3 else None),
+                          values=q))
+    print('done')
+    return tuple(fluxes)
+
+  def read_pressure(self, time_step, directory=None, **kwargs):
     """Reads the pressure field from file given the time-step.
 
     Parameters
     ----------
     time_step: integer
       Time-step at which the field will be read.
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
 
     Returns
     -------
@@ -191,31 +174,19 @@ class PetIBMSimulation(BarbaGroupSimulation):
       The pressure field.
     """
     print('[time-step {}] reading pressure field ...'.format(time_step)),
-    dim3 = (len(self.grid) == 3)
-    # get grid stations and number of cells along each direction
-    x, y = self.grid[:2]
-    nx, ny = x.size-1, y.size-1
-    if dim3:
-      z = self.grid[2]
-      nz = z.size-1
+    metrics = self.get_grid_metrics()
     # folder with numerical solution
-    folder = os.path.join(self.directory, '{:0>7}'.format(time_step))
+    if not directory:
+      directory = self.directory
+    folder = os.path.join(directory, '{:0>7}'.format(time_step))
     # read pressure
-    phi_file_path = os.path.join(folder, 'phi.dat')
-    p = PetscBinaryIO.PetscBinaryIO().readBinaryFile(phi_file_path)[0]
+    p = petscBinaryIO.read_vec(os.path.join(folder, 'phi.dat'))
     # set pressure Field object
-    if dim3:
-      p = Field(label='pressure',
-                time_step=time_step,
-                x=0.5*(x[:-1]+x[1:]), 
-                y=0.5*(y[:-1]+y[1:]), 
-                z=0.5*(z[:-1]+z[1:]), 
-                values=p.reshape((z.size-1, y.size-1, x.size-1)))
-    else:
-      p = Field(label='pressure',
-                time_step=time_step,
-                x=0.5*(x[:-1]+x[1:]), 
-                y=0.5*(y[:-1]+y[1:]), 
-                values=p.reshape((y.size-1, x.size-1)))
+    nodes = metrics.nodes['pressure']
+    p = Field(label='pressure',
+              time_step=time_step,
+              x=nodes[0], y=nodes[1],
+              z=(nodes[2] if metrics.ndim == 3 else None),
+              values=p.reshape(metrics.n_cells[::-1]))
     print('done')
     return p
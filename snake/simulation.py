@@ -12,6 +12,7 @@ import pandas
 
 from .field import Field
 from .force import Force
+from .forceFollower import ForceFollower
 
 
 class Simulation(object):
@@ -77,6 +78,54 @@ class Simulation(object):
             'cuibm, petibm, openfoam, or ibamr')
       sys.exit(0)
 
+  def follow_forces(self, file_path, usecols, labels, order=5, initial=None,
+                    parser=None):
+    """Reads the lines appended to a forces file since the previous call
+    (the whole file the first time) and updates the forces.
+
+    Parameters
+    ----------
+    file_path: string
+      Path of the file containing the forces.
+    usecols: tuple of integers
+      Index of each column to read (the first one being the time).
+    labels: list of strings
+      Label of each force.
+    order: integer, optional
+      Number of neighboring points used to define an extremum
+      (extrema are updated on each call);
+      default: 5.
+    initial: 2D array of floats or callable, optional
+      Data preceding the file (e.g. from previous restarts), or function
+      returning them (only called when the file is followed for the first
+      time);
+      default: None.
+    parser: callable, optional
+      Function parsing the lines of the file into the columns `usecols`
+      (see `ForceFollower`);
+      default: None (columns separated by whitespaces).
+
+    Returns
+    -------
+    follower: ForceFollower object
+      The follower of the file.
+    """
+    if not hasattr(self, 'force_followers'):
+      self.force_followers = {}
+    key = (os.path.abspath(file_path), tuple(usecols), order)
+    follower = self.force_followers.get(key)
+    if follower is None:
+      if callable(initial):
+        initial = initial()
+      follower = ForceFollower(file_path, usecols, labels,
+                               order=order, initial=initial, parser=parser)
+      self.force_followers[key] = follower
+    n_lines = follower.poll()
+    print('[info] {} new lines of forces in {} ({} in total)'
+          ''.format(n_lines, file_path, follower.size))
+    self.forces = follower.forces
+    return follower
+
   def get_mean_forces(self, 
                       limits=(0.0, float('inf')), 
                       last_period=False, 
@@ -104,7 +153,8 @@ class Simulation(object):
                    L=1.0, U=1.0, 
                    limits=(0.0, float('inf')), 
                    order=5, 
-                   index=1):
+                   index=1,
+                   method='extrema'):
     """Computes the Strouhal number based on the frequency of the force signal.
 
     Parameters
@@ -124,8 +174,17 @@ class Simulation(object):
     index: integer, optional
       Index of the list of forces to use to compute the Strouhal number;
       default: 1 (most of the time, 1 corresponds to the lift force).
+    method: string, optional
+      How the frequency is computed;
+      choices: 'extrema' (periods between minima), 'fft', 'welch'
+      (peak of the power spectral density);
+      default: 'extrema'.
     """
-    return self.forces[index].get_strouhal(L=L, U=U, limits=limits, order=order)
+    if method == 'extrema':
+      return self.forces[index].get_strouhal(L=L, U=U, limits=limits,
+                                             order=order)
+    return self.forces[index].get_spectral_strouhal(L=L, U=U, limits=limits,
+                                                    method=method)
 
   def plot_forces(self, 
                   indices=None, labels=None,
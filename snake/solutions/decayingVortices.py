@@ -4,12 +4,12 @@
 
 
 import os
-import sys
 import math
 
 import numpy
 
 from ..field import Field
+from ..petibm import petscBinaryIO
 
 
 class DecayingVortices(object):
@@ -200,19 +200,14 @@ class DecayingVortices(object):
       save_directory = os.path.join(os.getcwd(), '0000000')
     if not os.path.isdir(save_directory):
       os.makedirs(save_directory)
-    sys.path.append(os.path.join(os.environ['PETSC_DIR'], 'bin', 'pythonscripts'))
-    import PetscBinaryIO
     # write fluxes
-    vec = qx.flatten().view(PetscBinaryIO.Vec)
     file_path = os.path.join(save_directory, 'qx.dat')
     print('[info] writing fluxes in x-direction in file ...')
-    PetscBinaryIO.PetscBinaryIO().writeBinaryFile(file_path, [vec,])
-    vec = qy.flatten().view(PetscBinaryIO.Vec)
+    petscBinaryIO.write_vec(file_path, qx)
     file_path = os.path.join(save_directory, 'qy.dat')
     print('[info] writing fluxes in y-direction in file ...')
-    PetscBinaryIO.PetscBinaryIO().writeBinaryFile(file_path, [vec,])
+    petscBinaryIO.write_vec(file_path, qy)
     # write pressure -- pressure field set to zero everywhere
-    vec = numpy.zeros((y.size-1, x.size-1)).flatten().view(PetscBinaryIO.Vec)
     file_path = os.path.join(save_directory, 'phi.dat')
     print('[info] writing pressure in file ...')
-    PetscBinaryIO.PetscBinaryIO().writeBinaryFile(file_path, [vec,])
\ No newline at end of file
+    petscBinaryIO.write_vec(file_path, numpy.zeros((y.size-1, x.size-1)))
\ No newline at end of file
@@ -87,13 +87,60 @@ def test_three_grids(nx=11, ny=11, ratio=3, offset=0):
   assert p == 1.0
 
 
+class Case(object):
+  """Solution of a manufactured field on a uniform grid."""
+  def __init__(self, n):
+    self.x, self.y = numpy.linspace(0.0, 1.0, n+1), numpy.linspace(0.0, 2.0, 2*n+1)
+    X, Y = numpy.meshgrid(self.x, self.y)
+    self.fields = {'pressure': Field(x=self.x, y=self.y, time_step=0,
+                                     values=numpy.sin(X)*numpy.cos(Y)+1.0/n**2,
+                                     label='pressure')}
+
+  def get_grid_spacing(self):
+    return self.x[1]-self.x[0]
+
+
+def test_study():
+  """Compares the study with the functions restricting the fields
+  at each call."""
+  coarse, medium, fine, exact = Case(10), Case(20), Case(40), Case(80)
+  study = convergence.ConvergenceStudy(coarse)
+  grid = [coarse.x, coarse.y]
+  ratio = coarse.get_grid_spacing()/medium.get_grid_spacing()
+  order = convergence.get_observed_order(coarse.fields['pressure'],
+                                         medium.fields['pressure'],
+                                         fine.fields['pressure'],
+                                         ratio, grid)
+  assert numpy.isclose(order, 2.0, atol=1.0E-06)
+  assert numpy.isclose(study.get_observed_order(coarse, medium, fine,
+                                                'pressure', ratio), order)
+  for case in [coarse, medium, fine]:
+    for norm in ['L2', 'Linf']:
+      assert numpy.isclose(study.get_difference(case, exact, 'pressure', norm=norm),
+                           case.fields['pressure'].get_difference(exact.fields['pressure'],
+                                                                  coarse.fields['pressure'],
+                                                                  norm=norm))
+  asymptotic_range = convergence.get_asymptotic_range(coarse.fields['pressure'],
+                                                      medium.fields['pressure'],
+                                                      fine.fields['pressure'],
+                                                      order, ratio, grid)
+  cached = study.get_asymptotic_range(coarse, medium, fine, 'pressure', order, ratio)
+  assert numpy.allclose(cached.values, asymptotic_range.values, equal_nan=True)
+  assert cached.label == asymptotic_range.label
+  # each field has been restricted once, and is left untouched by the GCI
+  assert len(study.restricted) == 4
+  restricted = study.restrict(coarse.fields['pressure'], 'pressure')
+  assert not numpy.any(numpy.isnan(restricted.values))
+
+
 def main():
   test_same_grid()
   test_three_grids(nx=11, ny=11, ratio=2, offset=0)
   test_three_grids(nx=11, ny=11, ratio=2, offset=1)
   test_three_grids(nx=10, ny=21, ratio=3, offset=0)
   test_three_grids(nx=21, ny=10, ratio=3, offset=1)
+  test_study()
 
 
 if __name__ == '__main__':
-  main()
\ No newline at end of file
+  main()
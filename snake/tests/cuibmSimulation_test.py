@@ -0,0 +1,248 @@
+# file: cuibmSimulation_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the readers of the class `CuIBMSimulation`.
+
+
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from snake.cuibm.simulation import CuIBMSimulation
+from snake.force import Force
+from snake import barbaGroupSimulation
+
+
+def write_solution_file(file_path, values, binary=True):
+  """Writes values in a cuIBM solution file (number of values, then values)."""
+  if binary:
+    with open(file_path, 'wb') as outfile:
+      numpy.array([values.size], dtype=numpy.int32).tofile(outfile)
+      values.astype(numpy.float64).tofile(outfile)
+  else:
+    with open(file_path, 'w') as outfile:
+      outfile.write('{}\n'.format(values.size))
+      numpy.savetxt(outfile, values)
+
+
+def check_readers(binary):
+  """Writes fluxes and pressure in a temporary directory,
+  reads them back and compares."""
+  directory = tempfile.mkdtemp()
+  try:
+    simulation = CuIBMSimulation(directory=directory)
+    x, y = numpy.linspace(0.0, 1.0, 6), numpy.linspace(-1.0, 1.0, 9)
+    nx, ny = x.size-1, y.size-1
+    simulation.grid = x, y
+    qx = numpy.random.rand(ny, nx-1)
+    qy = numpy.random.rand(ny-1, nx)
+    p = numpy.random.rand(ny, nx)
+    forces = numpy.random.rand(10)
+    for time_step in [0, 10]:
+      folder = os.path.join(directory, '{:0>7}'.format(time_step))
+      os.makedirs(folder)
+      write_solution_file(os.path.join(folder, 'q'),
+                          numpy.concatenate((qx.flatten(), qy.flatten())),
+                          binary=binary)
+      write_solution_file(os.path.join(folder, 'lambda'),
+                          numpy.concatenate((p.flatten(), forces)),
+                          binary=binary)
+      fluxes = simulation.read_fluxes(time_step)
+      pressure = simulation.read_pressure(time_step)
+      assert numpy.allclose(fluxes[0].values, qx, atol=1.0E-06)
+      assert numpy.allclose(fluxes[1].values, qy, atol=1.0E-06)
+      assert numpy.allclose(pressure.values, p, atol=1.0E-06)
+      assert numpy.allclose(pressure.x, 0.5*(x[:-1]+x[1:]), atol=1.0E-06)
+    assert simulation.file_layouts['q']['binary'] == binary
+    assert simulation.file_layouts['lambda']['size'] == p.size+forces.size
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_read_binary():
+  check_readers(binary=True)
+
+
+def test_read_ascii():
+  check_readers(binary=False)
+
+
+def test_read_grid():
+  file_path = os.path.join(os.path.dirname(__file__), 'cuibmSimulation', 'grid')
+  simulation = CuIBMSimulation(directory=os.path.dirname(file_path))
+  simulation.read_grid(file_path=file_path)
+  x, y = simulation.grid
+  assert x.size-1 == 1704
+  assert numpy.all(x[1:] > x[:-1])
+  assert numpy.all(y[1:] > y[:-1])
+
+
+def test_read_fields():
+  """Requests fluxes, velocity and vorticity at once and checks that the
+  fluxes are read only once (and not again when the fields are cached)."""
+  directory = tempfile.mkdtemp()
+  try:
+    simulation = CuIBMSimulation(directory=directory)
+    x = numpy.cumsum(numpy.random.rand(6))
+    y = numpy.cumsum(numpy.random.rand(9))
+    nx, ny = x.size-1, y.size-1
+    dx, dy = x[1:]-x[:-1], y[1:]-y[:-1]
+    simulation.grid = x, y
+    qx = numpy.random.rand(ny, nx-1)
+    qy = numpy.random.rand(ny-1, nx)
+    folder = os.path.join(directory, '{:0>7}'.format(0))
+    os.makedirs(folder)
+    write_solution_file(os.path.join(folder, 'q'),
+                        numpy.concatenate((qx.flatten(), qy.flatten())))
+    read_fluxes, calls = simulation.read_fluxes, []
+    def counted_read_fluxes(*args, **kwargs):
+      calls.append(args)
+      return read_fluxes(*args, **kwargs)
+    simulation.read_fluxes = counted_read_fluxes
+    simulation.read_fields(['vorticity', 'x-velocity', 'x-flux'], 0)
+    assert len(calls) == 1
+    assert numpy.allclose(simulation.fields['x-flux'].values, qx, atol=1.0E-12)
+    assert numpy.allclose(simulation.fields['x-velocity'].values,
+                          qx/dy[:, numpy.newaxis], atol=1.0E-12)
+    assert numpy.allclose(simulation.fields['y-velocity'].values,
+                          qy/dx, atol=1.0E-12)
+    assert simulation.fields['vorticity'].values.shape == (ny-1, nx-1)
+    # fields read again from the cache, unless the solution file changes
+    vorticity = simulation.fields['vorticity']
+    simulation.read_fields(['vorticity', 'x-flux'], 0)
+    assert len(calls) == 1
+    assert simulation.fields['vorticity'] is vorticity
+    file_path = os.path.join(folder, 'q')
+    info = os.stat(file_path)
+    os.utime(file_path, (info.st_atime, info.st_mtime+1.0))
+    simulation.read_fields(['vorticity'], 0)
+    assert len(calls) == 2
+    assert simulation.fields['vorticity'] is not vorticity
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_extract_probes():
+  """Writes linear velocity and pressure fields at several time-steps
+  and probes them (the interpolation is exact)."""
+  directory = tempfile.mkdtemp()
+  try:
+    simulation = CuIBMSimulation(directory=directory)
+    x = numpy.cumsum(numpy.random.rand(9))
+    y = numpy.cumsum(numpy.random.rand(7))
+    simulation.grid = x, y
+    metrics = simulation.get_grid_metrics()
+    dx, dy = metrics.widths
+    linear = lambda t, X, Y: t*(1.0+2.0*X-3.0*Y)
+    time_steps = [0, 10, 20]
+    for t in time_steps:
+      folder = os.path.join(directory, '{:0>7}'.format(t))
+      os.makedirs(folder)
+      X, Y = numpy.meshgrid(*metrics.nodes['x-flux'])
+      qx = linear(t, X, Y)*dy[:, numpy.newaxis]
+      X, Y = numpy.meshgrid(*metrics.nodes['y-flux'])
+      qy = linear(-t, X, Y)*dx
+      X, Y = numpy.meshgrid(*metrics.nodes['pressure'])
+      write_solution_file(os.path.join(folder, 'q'),
+                          numpy.concatenate((qx.flatten(), qy.flatten())))
+      write_solution_file(os.path.join(folder, 'lambda'),
+                          linear(2.0*t, X, Y).flatten())
+    points = numpy.array([[x[3], 0.5*(y[2]+y[3])],
+                          [0.5*(x[4]+x[6]), y[5]],
+                          [x[-1]+1.0, y[3]]])
+    for jobs in [1, 3]:
+      probes = simulation.extract_probes(points,
+                                         ['x-velocity', 'y-velocity', 'pressure'],
+                                         jobs=jobs)
+      assert probes['x-velocity'].shape == (len(time_steps), len(points))
+      for name, factor in zip(['x-velocity', 'y-velocity', 'pressure'],
+                              [1.0, -1.0, 2.0]):
+        expected = [linear(factor*t, points[:2, 0], points[:2, 1])
+                    for t in time_steps]
+        assert numpy.allclose(probes[name][:, :2], expected, atol=1.0E-10)
+        assert numpy.all(numpy.isnan(probes[name][:, 2]))
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_get_phase_averages():
+  """Writes pressure fields (value: time-step) and bins them with the phase
+  of a sinusoidal lift (period: 10 time-steps)."""
+  directory = tempfile.mkdtemp()
+  try:
+    simulation = CuIBMSimulation(directory=directory)
+    simulation.grid = numpy.linspace(0.0, 1.0, 5), numpy.linspace(0.0, 1.0, 4)
+    time_steps = range(45)
+    for time_step in time_steps:
+      folder = os.path.join(directory, '{:0>7}'.format(time_step))
+      os.makedirs(folder)
+      write_solution_file(os.path.join(folder, 'lambda'),
+                          time_step*numpy.ones(12))
+    times = numpy.linspace(0.0, 5.0, 501)
+    simulation.forces = [Force(times, numpy.ones(times.size)),
+                         Force(times, -numpy.cos(2.0*numpy.pi*(times-0.05)))]
+    # minima at t = 0.05, 1.05, ..., 4.05 (and at the end of the signal)
+    expected = [[10*period+k for period in range(4) for k in [2*b+1, 2*b+2]]
+                for b in range(5)]
+    for jobs in [1, 2]:
+      bins = simulation.get_phase_averages('pressure', time_steps, 0.1,
+                                           n_bins=5, jobs=jobs)
+      assert len(bins) == 5
+      assert not barbaGroupSimulation._statistics_worker
+      for statistics, steps in zip(bins, expected):
+        assert sorted(statistics.time_steps) == steps
+        assert numpy.allclose(statistics.get_mean('pressure').values,
+                              numpy.mean(steps))
+    # with 20 bins (half a time-step wide), some bins gather no time-step
+    try:
+      simulation.get_phase_averages('pressure', time_steps, 0.1, n_bins=20)
+    except ValueError as exception:
+      assert 'phase bin(s) 4, 6, 8, ' in str(exception)
+    else:
+      assert False, 'empty phase bins were not reported'
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_plot_contours():
+  """Writes pressure fields and plots their contours, serially and with
+  a pool of processes; checks one image is saved per time-step."""
+  from matplotlib import pyplot
+  pyplot.switch_backend('agg')
+  directory = tempfile.mkdtemp()
+  try:
+    simulation = CuIBMSimulation(directory=directory)
+    simulation.grid = numpy.linspace(0.0, 1.0, 9), numpy.linspace(0.0, 1.0, 7)
+    time_steps = [10, 20, 30]
+    for time_step in time_steps:
+      folder = os.path.join(directory, '{:0>7}'.format(time_step))
+      os.makedirs(folder)
+      write_solution_file(os.path.join(folder, 'lambda'),
+                          numpy.random.rand(6*8))
+    for jobs in [1, 2]:
+      save_directory = os.path.join(directory, 'images{}'.format(jobs))
+      simulation.plot_contours('pressure', time_steps, jobs=jobs,
+                               field_range=[0.0, 1.0, 11],
+                               save_directory=save_directory)
+      assert not barbaGroupSimulation._contour_worker
+      folder, = os.listdir(save_directory)
+      assert (sorted(os.listdir(os.path.join(save_directory, folder)))
+              == ['pressure{:0>7}.png'.format(time_step)
+                  for time_step in time_steps])
+  finally:
+    shutil.rmtree(directory)
+
+
+def main():
+  test_read_binary()
+  test_read_ascii()
+  test_read_grid()
+  test_read_fields()
+  test_extract_probes()
+  test_get_phase_averages()
+  test_plot_contours()
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,92 @@
+# file: fieldCache_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the class `FieldCache`.
+
+
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from snake.field import Field
+from snake.fieldCache import FieldCache
+
+
+def create_field(n, label=None):
+  """Creates a 1D field with n nodes (8n bytes)."""
+  return Field(x=numpy.arange(n), values=numpy.ones(n), label=label)
+
+
+def test_eviction():
+  """Fills the cache above its budget and checks the LRU entry is evicted."""
+  cache = FieldCache(max_bytes=3*800)
+  for key in ['a', 'b', 'c']:
+    cache.put(key, create_field(100, label=key))
+  assert cache.get('a') is not None  # 'b' becomes the least-recently used
+  cache.put('d', create_field(100))
+  assert 'b' not in cache and 'a' in cache
+  assert cache.nbytes == 3*800 and cache.evictions == 1
+  assert (cache.hits, cache.misses) == (1, 0)
+  assert cache.get('b') is None and cache.misses == 1
+  # a field larger than the budget is not cached
+  cache.put('e', create_field(1000))
+  assert 'e' not in cache and len(cache) == 3
+
+
+def test_max_entries():
+  """Checks the limit on the number of entries and the disabled cache."""
+  cache = FieldCache(max_entries=2)
+  for key in ['a', 'b', 'c']:
+    cache.put(key, create_field(10))
+  assert list(cache.entries.keys()) == ['b', 'c']
+  disabled = FieldCache(max_bytes=0)
+  disabled.put('a', create_field(10))
+  assert len(disabled) == 0
+
+
+def test_invalidation():
+  """Modifies the source file of a cached field."""
+  directory = tempfile.mkdtemp()
+  try:
+    file_path = os.path.join(directory, 'q')
+    with open(file_path, 'w') as outfile:
+      outfile.write('0')
+    cache = FieldCache()
+    cache.put('a', create_field(10), [file_path])
+    assert cache.get('a', [file_path]) is not None
+    info = os.stat(file_path)
+    os.utime(file_path, (info.st_atime, info.st_mtime+1.0))
+    assert cache.get('a', [file_path]) is None
+    assert len(cache) == 0 and cache.nbytes == 0
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_read_only():
+  """Checks the values of a cached field cannot be modified."""
+  cache = FieldCache()
+  cache.put('a', create_field(10))
+  field = cache.get('a')
+  try:
+    field.values[0] = 2.0
+  except ValueError:
+    pass
+  else:
+    assert False, 'the values of the cached field were modified'
+  assert numpy.all(cache.get('a').values == 1.0)
+  # a field not cached is left writeable
+  field = create_field(1000)
+  FieldCache(max_bytes=800).put('b', field)
+  assert field.values.flags.writeable
+
+
+def main():
+  test_eviction()
+  test_max_entries()
+  test_invalidation()
+  test_read_only()
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,69 @@
+# file: fieldStatistics_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the class `FieldStatistics`.
+
+
+import numpy
+
+from snake.field import Field
+from snake.fieldStatistics import FieldStatistics
+
+
+def test_statistics():
+  """Compares running and merged statistics with the ones computed
+  from all snapshots."""
+  x, y = numpy.linspace(0.0, 1.0, 5), numpy.linspace(0.0, 1.0, 4)
+  u = 1.0E+06 + numpy.random.rand(20, y.size, x.size)
+  v = numpy.random.rand(20, y.size, x.size) - 0.5*u
+  snapshots = [{'u': Field(x=x, y=y, values=u[n], time_step=n),
+                'v': Field(x=x, y=y, values=v[n], time_step=n)}
+               for n in range(20)]
+  whole = FieldStatistics(['u'], covariances=[('u', 'v')])
+  first, second = (FieldStatistics(['u'], covariances=[('u', 'v')]),
+                   FieldStatistics(['u'], covariances=[('u', 'v')]))
+  for n, fields in enumerate(snapshots):
+    whole.update(fields)
+    (first if n < 7 else second).update(fields)
+  merged = second.merge(first)
+  for statistics in [whole, merged]:
+    assert statistics.field_names == ['u', 'v']
+    assert numpy.allclose(statistics.get_mean('u').values, u.mean(axis=0),
+                          rtol=1.0E-12)
+    assert numpy.allclose(statistics.get_rms('v').values, v.std(axis=0),
+                          rtol=1.0E-08)
+    covariance = ((u-u.mean(axis=0))*(v-v.mean(axis=0))).mean(axis=0)
+    assert numpy.allclose(statistics.get_covariance('u', 'v').values,
+                          covariance, rtol=1.0E-08)
+  assert merged.time_steps == range(20)
+  assert merged.get_mean('u').time_step == 19
+  assert merged.get_rms('u').label == 'u-rms'
+
+
+def test_merge_into_empty():
+  """Merges partial statistics into empty ones and checks the partial
+  statistics are left unchanged."""
+  x, y = numpy.linspace(0.0, 1.0, 3), numpy.linspace(0.0, 1.0, 2)
+  partials = []
+  for n in range(3):
+    statistics = FieldStatistics(['p'])
+    statistics.update({'p': Field(x=x, y=y, time_step=n,
+                                  values=float(n)*numpy.ones((2, 3)))})
+    partials.append(statistics)
+  merged = FieldStatistics(['p'])
+  for statistics in partials:
+    merged.merge(statistics)
+  assert numpy.allclose(merged.get_mean('p').values, 1.0)
+  assert merged.time_steps == [0, 1, 2]
+  for n, statistics in enumerate(partials):
+    assert statistics.count == 1 and statistics.time_steps == [n]
+    assert numpy.allclose(statistics.get_mean('p').values, float(n))
+    assert numpy.allclose(statistics.get_variance('p').values, 0.0)
+
+
+def main():
+  test_statistics()
+  test_merge_into_empty()
+
+
+if __name__ == '__main__':
+  main()
@@ -5,6 +5,8 @@
 
 import os
 import sys
+import shutil
+import tempfile
 
 import numpy
 
@@ -49,6 +51,166 @@ class FieldTest(object):
     assert numpy.allclose(self.field.values, numpy.zeros_like(self.field.values), atol=1.0E-06)
     print('ok')
 
-  
+
+
+def test_restriction_3d():
+  """Restricts a 3D field and reuses the index maps for another field."""
+  x, y, z = (numpy.linspace(0.0, 1.0, 13), numpy.linspace(-1.0, 1.0, 25),
+             numpy.linspace(0.0, 2.0, 7))
+  field = Field(x=x, y=y, z=z, time_step=0,
+                values=numpy.random.rand(z.size, y.size, x.size),
+                label='test')
+  # coarse nodes slightly perturbed (within tolerance)
+  grid = [x[::2]+1.0E-14, y[::4], z[::3]-1.0E-14]
+  indices = field.get_restriction_indices(grid)
+  restricted = field.restriction(grid, indices=indices)
+  assert numpy.allclose(restricted.z, z[::3], atol=1.0E-12)
+  assert numpy.array_equal(restricted.values, field.values[::3, ::4, ::2])
+  assert restricted.label == 'test-restricted'
+  other = Field(x=x, y=y, z=z, values=2.0*field.values, label='other')
+  assert numpy.array_equal(other.restriction(grid, indices=indices).values,
+                           2.0*restricted.values)
+
+
+def test_get_shared_indices():
+  """Matches nodes with an unsorted array and nodes out of tolerance."""
+  from snake.field import get_shared_indices
+  a = numpy.linspace(0.0, 1.0, 11)
+  b = numpy.array([1.0, 0.5+1.0E-09, 0.0, 0.3+1.0E-14, 2.0])
+  assert list(get_shared_indices(a, b)) == [0, 3, 10]
+  assert list(get_shared_indices(a, b, atol=1.0E-06)) == [0, 3, 5, 10]
+  assert get_shared_indices(a, []).size == 0
+
+
+def test_interpolate():
+  """Interpolates bilinear and trilinear functions (reproduced exactly)
+  between stretched grids."""
+  x, y = numpy.cumsum(numpy.random.rand(8)), numpy.cumsum(numpy.random.rand(6))
+  X, Y = numpy.meshgrid(x, y)
+  field = Field(x=x, y=y, values=1.0+2.0*X-3.0*Y+4.0*X*Y, time_step=0, label='f')
+  xt = numpy.linspace(x[0], x[-1], 11)
+  yt = numpy.append(numpy.linspace(y[0], y[-1], 7), y[-1]+1.0)
+  interpolated = field.interpolate([xt, yt])
+  Xt, Yt = numpy.meshgrid(xt, yt)
+  assert interpolated.label == 'f-interpolated'
+  assert numpy.allclose(interpolated.values[:-1],
+                        (1.0+2.0*Xt-3.0*Yt+4.0*Xt*Yt)[:-1], atol=1.0E-12)
+  # target nodes outside the grid
+  assert numpy.all(numpy.isnan(interpolated.values[-1]))
+  # the operator is reused for the same pair of grids
+  from snake.field import get_interpolation_operator
+  operator = get_interpolation_operator([x, y], [xt, yt])
+  assert get_interpolation_operator([x.copy(), y], [xt, yt])[0] is operator[0]
+  z = numpy.cumsum(numpy.random.rand(4))
+  Z, Y, X = numpy.meshgrid(z, y, x, indexing='ij')
+  field = Field(x=x, y=y, z=z, values=1.0+X-2.0*Y+3.0*Z+X*Y*Z)
+  zt = numpy.linspace(z[0], z[-1], 5)
+  interpolated = field.interpolate([xt, yt[:-1], zt])
+  Z, Y, X = numpy.meshgrid(zt, yt[:-1], xt, indexing='ij')
+  assert numpy.allclose(interpolated.values, 1.0+X-2.0*Y+3.0*Z+X*Y*Z,
+                        atol=1.0E-12)
+
+
+def test_contour_renderer():
+  """Renders two time-steps with the same renderer and checks the contour
+  is replaced while the colorbar and the levels are kept."""
+  from matplotlib import pyplot
+  pyplot.switch_backend('agg')
+  from snake.field import ContourRenderer
+  directory = tempfile.mkdtemp()
+  try:
+    x, y = numpy.linspace(0.0, 2.0, 21), numpy.linspace(0.0, 1.0, 11)
+    X, Y = numpy.meshgrid(x, y)
+    renderer = ContourRenderer(x, y, 'pressure',
+                               field_range=[-1.0, 1.0, 21],
+                               view=[0.0, 0.0, 2.0, 1.0])
+    try:
+      renderer.render(Field(x=x, y=y, time_step=10, label='pressure',
+                            values=numpy.sin(X)*numpy.cos(Y)),
+                      save_directory=directory)
+      first, colorbar_axes = renderer.contour, renderer.colorbar_axes
+      n_collections = len(renderer.ax.collections)
+      renderer.render(Field(x=x, y=y, time_step=20, label='pressure',
+                            values=0.5*numpy.cos(X)*numpy.sin(Y)),
+                      save_directory=directory)
+      # the previous contour is removed from the axes
+      assert renderer.contour is not first
+      assert len(renderer.ax.collections) == n_collections
+      for artist in getattr(first, 'collections', [first]):
+        assert artist not in renderer.ax.collections
+      # the colorbar and the levels of the fixed range are reused
+      assert renderer.colorbar_axes is colorbar_axes
+      assert colorbar_axes in renderer.fig.axes
+      assert numpy.allclose(renderer.contour.levels, first.levels)
+      assert numpy.allclose(first.levels, numpy.linspace(-1.0, 1.0, 21))
+    finally:
+      renderer.close()
+    assert sorted(os.listdir(directory)) == ['pressure0000010.png',
+                                             'pressure0000020.png']
+  finally:
+    shutil.rmtree(directory)
+
+
+def get_pixel_colors(renderer, points):
+  """Returns the RGB colors of the figure of a renderer at given points."""
+  renderer.fig.canvas.draw()
+  width, height = renderer.fig.canvas.get_width_height()
+  image = numpy.frombuffer(renderer.fig.canvas.buffer_rgba(),
+                           dtype=numpy.uint8).reshape(height, width, 4)
+  pixels = numpy.floor(renderer.ax.transData.transform(points)).astype(int)
+  return image[height-1-pixels[:, 1], pixels[:, 0], :3].astype(int)
+
+
+def test_contour_renderer_raster():
+  """Rasterizes a cell-centered field on a stretched grid: the cells are
+  bounded by the gridlines and the colors at the nodes match the contour."""
+  from matplotlib import pyplot
+  pyplot.switch_backend('agg')
+  from snake.field import ContourRenderer
+  directory = tempfile.mkdtemp()
+  try:
+    grid = [numpy.array([0.0, 0.1, 0.3, 0.7, 1.0, 1.2, 2.0]),
+            numpy.array([0.0, 0.4, 0.5, 0.8, 1.0])]
+    x, y = [0.5*(stations[:-1]+stations[1:]) for stations in grid]
+    # one color band per cell
+    values = 0.5+numpy.arange(x.size*y.size).reshape(y.size, x.size)
+    field = Field(x=x, y=y, time_step=0, label='pressure', values=values)
+    settings = dict(field_range=[0.0, values.size, values.size+1],
+                    view=[0.0, 0.0, 2.0, 1.0],
+                    colorbar=False)
+    raster = ContourRenderer(x, y, 'pressure', mode='raster', grid=grid,
+                             **settings)
+    contour = ContourRenderer(x, y, 'pressure', **settings)
+    try:
+      raster.render(field, save_name='raster', save_directory=directory)
+      contour.render(field, save_name='contour', save_directory=directory)
+      assert numpy.allclose(raster.raster_x_edges, grid[0])
+      assert numpy.allclose(raster.raster_y_edges, grid[1])
+      X, Y = numpy.meshgrid(x, y)
+      node_colors = get_pixel_colors(raster, numpy.c_[X.ravel(), Y.ravel()])
+      # points inside each cell, close to its gridlines, have the color of
+      # the node of the cell
+      for fraction in [0.1, 0.9]:
+        X, Y = numpy.meshgrid(grid[0][:-1]+fraction*numpy.diff(grid[0]),
+                              grid[1][:-1]+fraction*numpy.diff(grid[1]))
+        assert numpy.abs(get_pixel_colors(raster, numpy.c_[X.ravel(), Y.ravel()])
+                         -node_colors).max() <= 2
+      # same colors as the contour at the nodes
+      # (the contour is not drawn beyond the boundary nodes)
+      X, Y = numpy.meshgrid(x[1:-1], y[1:-1])
+      nodes = numpy.c_[X.ravel(), Y.ravel()]
+      assert numpy.abs(get_pixel_colors(raster, nodes)
+                       -get_pixel_colors(contour, nodes)).max() <= 2
+    finally:
+      raster.close()
+      contour.close()
+  finally:
+    shutil.rmtree(directory)
+
+
 if __name__ == '__main__':
-  test = FieldTest()
\ No newline at end of file
+  test = FieldTest()
+  test_restriction_3d()
+  test_get_shared_indices()
+  test_contour_renderer()
+  test_contour_renderer_raster()
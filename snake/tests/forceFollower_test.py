@@ -0,0 +1,71 @@
+# file: forceFollower_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the class `ForceFollower`.
+
+
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from snake.force import Force
+from snake.forceFollower import ForceFollower
+from snake.cuibm.simulation import CuIBMSimulation
+
+
+def test_follow_forces():
+  """Appends lines (the last one incomplete) to a forces file between polls
+  and compares with the forces read at once."""
+  directory = tempfile.mkdtemp()
+  try:
+    file_path = os.path.join(directory, 'forces')
+    random = numpy.random.RandomState(0)
+    times = numpy.linspace(0.0, 30.0, 3001)
+    drag = 1.0 + 0.1*numpy.cos(4.0*numpy.pi*times/5.0)
+    lift = (numpy.round(numpy.sin(2.0*numpy.pi*times/5.0)
+                        + 0.05*random.standard_normal(times.size), 2))
+    text = ''.join('{!r} {!r} {!r}\n'.format(*row)
+                   for row in zip(times, drag, lift))
+    simulation = CuIBMSimulation(directory=directory)
+    cuts = [0, 5, 1000, 1001, 2500, len(text)-3, len(text)]
+    for cut in cuts[1:]:
+      with open(file_path, 'w') as outfile:
+        outfile.write(text[:cut])
+      simulation.read_forces(follow=True)
+      follower = simulation.force_followers.values()[0]
+      n = text[:cut].count('\n')
+      assert follower.size == n
+      # the incomplete last line is left for the next poll
+      assert follower.offset == text[:cut].rfind('\n')+1
+      if n < 20:
+        continue
+      force = simulation.forces[1]
+      assert numpy.array_equal(force.times, times[:n])
+      assert numpy.array_equal(force.values, lift[:n])
+      assert numpy.isclose(force.mean['value'], lift[:n].mean())
+      reference = Force(times[:n], lift[:n])
+      for memoized, expected in zip(force.get_extrema(order=5),
+                                    reference.get_extrema(order=5)):
+        assert numpy.array_equal(memoized, expected)
+    assert len(simulation.force_followers) == 1
+    follower = ForceFollower(file_path, (0, 1, 2), ['drag', 'lift'],
+                             order=100)
+    assert follower.get_strouhal() is None
+    follower.poll()
+    expected = Force(times, lift).get_strouhal(order=100)
+    assert numpy.isclose(follower.get_strouhal()['mean'], expected['mean'])
+    follower = simulation.force_followers.values()[0]
+    # a rewritten (shorter) file is read again from the start
+    with open(file_path, 'w') as outfile:
+      outfile.write(text[:200])
+    simulation.read_forces(follow=True)
+    assert follower.size == text[:200].count('\n')
+    assert numpy.array_equal(simulation.forces[0].values,
+                             drag[:follower.size])
+  finally:
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+  test_follow_forces()
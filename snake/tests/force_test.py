@@ -0,0 +1,113 @@
+# file: force_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the class `Force`.
+
+
+import numpy
+from scipy import signal
+
+from snake.force import Force, get_spectral_strouhals
+
+
+def test_get_phase():
+  """Computes the phase of a sinusoidal signal with both methods."""
+  period = 2.0
+  times = numpy.linspace(0.0, 20.0, 2001)
+  force = Force(times, -numpy.cos(2.0*numpy.pi*times/period))
+  samples = numpy.array([-1.0, 0.5, 3.0, 4.25, 11.5, 30.0])
+  expected = numpy.mod(samples/period, 1.0)
+  phase = force.get_phase(samples, method='extrema')
+  # minima at t = 0, 2, ..., 18 (the last one is skipped)
+  assert numpy.all(numpy.isnan(phase[[0, 5]]))
+  assert numpy.allclose(phase[1:5], expected[1:5], atol=1.0E-08)
+  phase = force.get_phase(samples, method='hilbert', limits=(0.0, 20.0))
+  assert numpy.all(numpy.isnan(phase[[0, 5]]))
+  difference = numpy.mod(phase[1:5]-expected[1:5]+0.5, 1.0)-0.5
+  assert numpy.allclose(difference, 0.0, atol=1.0E-02)
+
+
+def test_get_spectral_strouhal():
+  """Recovers the frequency of noisy signals with two harmonics
+  (uniform and non-uniform sampling)."""
+  random = numpy.random.RandomState(0)
+  frequencies = [0.21, 0.37, 0.5]
+  forces = []
+  for i, frequency in enumerate(frequencies):
+    times = numpy.sort(random.uniform(0.0, 100.0, 4000+1000*i))
+    if i == 0:
+      times = numpy.linspace(0.0, 100.0, 4001)
+    values = (numpy.sin(2.0*numpy.pi*frequency*times)
+              + 0.3*numpy.sin(4.0*numpy.pi*frequency*times+1.0)
+              + 0.2*random.standard_normal(times.size))
+    forces.append(Force(times, values))
+  for method in ['fft', 'welch']:
+    strouhals = get_spectral_strouhals(forces, L=2.0, method=method,
+                                       limits=(10.0, 100.0))
+    tolerance = (1.0E-03 if method == 'fft' else 5.0E-03)
+    assert numpy.allclose(strouhals['frequencies'], frequencies,
+                          rtol=tolerance)
+    assert numpy.allclose(strouhals['values'], 2.0*strouhals['frequencies'])
+  strouhal = forces[0].get_spectral_strouhal(method='fft')
+  assert abs(strouhal['mean']-frequencies[0]) < 1.0E-03
+  assert strouhal['time-limits'] == (0.0, 100.0)
+
+
+def test_get_spectral_strouhal_lengths():
+  """Computes the spectra of a short, coarsely sampled signal and of a long,
+  finely sampled one (whose frequency is above the Nyquist frequency of the
+  short one): each signal keeps its own sampling."""
+  times = numpy.linspace(0.0, 30.0, 301)
+  coarse = Force(times, numpy.sin(2.0*numpy.pi*0.3*times))
+  times = numpy.linspace(0.0, 200.0, 20001)
+  fine = Force(times, (numpy.sin(2.0*numpy.pi*2.9*times)
+                       + 0.5*numpy.sin(2.0*numpy.pi*0.2*times)))
+  for method in ['fft', 'welch']:
+    strouhals = get_spectral_strouhals([coarse, fine], method=method)
+    assert numpy.allclose(strouhals['frequencies'], [0.3, 2.9], rtol=5.0E-03)
+    # the coarse signal does not degrade the spectrum of the fine one
+    alone = get_spectral_strouhals([fine], method=method)
+    assert numpy.allclose(strouhals['frequencies'][1], alone['frequencies'][0])
+
+
+def test_get_extrema():
+  """Compares the windowed search with `argrelextrema` over the whole signal,
+  and checks the memoization and the automatic order."""
+  random = numpy.random.RandomState(1)
+  times = numpy.linspace(0.0, 50.0, 5001)
+  values = numpy.round(numpy.sin(2.0*numpy.pi*0.2*times)
+                       + 0.1*random.standard_normal(times.size), 2)
+  force = Force(times, values)
+  for limits, order in [((0.0, float('inf')), 5), ((12.3, 31.7), 40),
+                        ((20.0, 50.0), 120)]:
+    mask = numpy.where(numpy.logical_and(times >= limits[0],
+                                         times <= limits[1]))[0]
+    for extrema, comparator in zip(force.get_extrema(limits=limits, order=order),
+                                   [numpy.less_equal, numpy.greater_equal]):
+      expected = signal.argrelextrema(values, comparator, order=order)[0][:-1]
+      expected = numpy.intersect1d(expected, mask)
+      expected = expected[numpy.append(True, numpy.diff(expected) > order)]
+      assert numpy.array_equal(extrema, expected)
+  minima, _ = force.get_extrema(limits=(12.3, 31.7), order=40)
+  assert force.get_extrema(limits=(12.3, 31.7), order=40)[0] is minima
+  # the memoized extrema are discarded when the signal is replaced
+  force.values = -values
+  assert numpy.array_equal(force.get_extrema(limits=(12.3, 31.7), order=40)[1],
+                           minima)
+  force.values = values
+  # a quarter of the period (5 time-units) in number of time-steps
+  assert abs(force.get_extremum_order()-125) <= 5
+  # one extremum per period (noise does not create spurious ones)
+  minima, maxima = force.get_extrema(order='auto')
+  assert numpy.allclose(numpy.diff(times[minima[1:]]), 5.0, atol=0.5)
+  assert numpy.allclose(numpy.diff(times[maxima[1:]]), 5.0, atol=0.5)
+
+
+def main():
+  test_get_phase()
+  test_get_extrema()
+  test_get_spectral_strouhal()
+  test_get_spectral_strouhal_lengths()
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,55 @@
+# file: gridMetrics_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the class `GridMetrics`.
+
+
+import numpy
+
+from snake.gridMetrics import GridMetrics
+
+
+def test_staggered_nodes():
+  """Checks the nodes and face areas on a stretched 3D grid."""
+  x = numpy.cumsum(numpy.random.rand(6))
+  y = numpy.cumsum(numpy.random.rand(9))
+  z = numpy.cumsum(numpy.random.rand(4))
+  grid = [x, y, z]
+  metrics = GridMetrics(grid)
+  assert metrics.describes(grid) and not metrics.describes([x, y, z])
+  assert metrics.n_cells == [5, 8, 3]
+  xu, yu, zu = metrics.nodes['x-velocity']
+  assert numpy.allclose(xu, x[1:-1]) and numpy.allclose(yu, 0.5*(y[:-1]+y[1:]))
+  assert metrics.nodes['z-flux'][2].size == 2
+  dx, dy, dz = x[1:]-x[:-1], y[1:]-y[:-1], z[1:]-z[:-1]
+  areas = [numpy.outer(dz, dy)[:, :, None],
+           numpy.outer(dz, dx)[:, None, :],
+           numpy.outer(dy, dx)[None, :, :]]
+  for area, inverse_area in zip(areas, metrics.inverse_face_areas):
+    assert numpy.allclose(area*inverse_area, 1.0)
+
+
+def test_vorticity_operators():
+  """Checks the precomputed operators match the ones computed on the fly."""
+  x = numpy.cumsum(numpy.random.rand(7))
+  y = numpy.cumsum(numpy.random.rand(5))
+  metrics = GridMetrics((x, y))
+  operators = metrics.get_vorticity_operators(metrics.nodes['x-velocity'],
+                                              metrics.nodes['y-velocity'])
+  assert operators is metrics.vorticity_operators
+  copies = metrics.get_vorticity_operators(
+               [nodes.copy() for nodes in metrics.nodes['x-velocity']],
+               [nodes.copy() for nodes in metrics.nodes['y-velocity']])
+  assert copies is not operators
+  for key in ['x', 'y', 'dx', 'dy']:
+    assert numpy.allclose(copies[key], operators[key])
+  assert operators['x-slice'] == slice(0, x.size-2)
+  assert operators['dy'].shape == (y.size-2, 1)
+
+
+def main():
+  test_staggered_nodes()
+  test_vorticity_operators()
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,60 @@
+# file: miscellaneous_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the function `prefetch`.
+
+
+import threading
+
+from snake import miscellaneous
+
+
+def test_prefetch_order():
+  """Checks the items are yielded in order, with or without a producer
+  thread."""
+  for depth in [0, 1, 3]:
+    items = list(miscellaneous.prefetch(iter(range(50)), depth=depth))
+    assert items == list(range(50))
+
+
+def test_prefetch_exception():
+  """Checks an exception raised by the producer is re-raised in the
+  consumer after the items produced before it."""
+  def produce():
+    for item in range(3):
+      yield item
+    raise ValueError('cannot read time-step')
+
+  items = []
+  try:
+    for item in miscellaneous.prefetch(produce(), depth=2):
+      items.append(item)
+  except ValueError as exception:
+    assert str(exception) == 'cannot read time-step'
+  else:
+    assert False, 'the exception of the producer was not re-raised'
+  assert items == [0, 1, 2]
+
+
+def test_prefetch_stop():
+  """Stops iterating over an endless producer and checks the producer thread
+  terminates."""
+  producers = []
+
+  def produce():
+    producers.append(threading.current_thread())
+    item = 0
+    while True:
+      yield item
+      item += 1
+
+  iterator = miscellaneous.prefetch(produce(), depth=2)
+  assert [next(iterator) for _ in range(5)] == list(range(5))
+  iterator.close()
+  assert len(producers) == 1
+  assert not producers[0].is_alive()
+
+
+if __name__ == '__main__':
+  test_prefetch_order()
+  test_prefetch_exception()
+  test_prefetch_stop()
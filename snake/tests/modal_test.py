@@ -0,0 +1,74 @@
+# file: modal_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the snapshot POD and DMD.
+
+
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from snake.cuibm.simulation import CuIBMSimulation
+from snake.modal import SnapshotMatrix, compute_pod, compute_dmd
+
+
+def test_pod_dmd():
+  """Writes a traveling wave (two POD modes, one pair of DMD modes)
+  and decomposes it."""
+  directory = tempfile.mkdtemp()
+  try:
+    simulation = CuIBMSimulation(directory=directory)
+    x, y = numpy.linspace(0.0, 2.0, 41), numpy.linspace(-1.0, 1.0, 21)
+    simulation.grid = x, y
+    X, Y = numpy.meshgrid(0.5*(x[:-1]+x[1:]), 0.5*(y[:-1]+y[1:]))
+    dt, frequency = 0.1, 0.7
+    time_steps = range(40)
+    for time_step in time_steps:
+      t = time_step*dt
+      values = (2.0 + numpy.exp(-Y**2)*numpy.sin(numpy.pi*X
+                                                 - 2.0*numpy.pi*frequency*t))
+      folder = os.path.join(directory, '{:0>7}'.format(time_step))
+      os.makedirs(folder)
+      with open(os.path.join(folder, 'lambda'), 'wb') as outfile:
+        numpy.array([values.size], dtype=numpy.int32).tofile(outfile)
+        values.tofile(outfile)
+    series = simulation.get_time_series('pressure', chunk_size=7)
+    snapshots = SnapshotMatrix(series, dtype=numpy.float64,
+                               file_path=os.path.join(directory, 'matrix.dat'),
+                               block_size=50)
+    assert snapshots.values.shape == (40, 800)
+    history = series[:].reshape(40, -1)
+    fluctuations = history - history.mean(axis=0)
+    exact = numpy.linalg.svd(fluctuations, compute_uv=False)
+    for randomized in [False, True]:
+      pod = compute_pod(snapshots, n_modes=4, randomized=randomized, seed=0)
+      assert len(pod['modes']) == 2
+      assert numpy.allclose(pod['energies'], exact[:2]**2/40, rtol=1.0E-08)
+      assert numpy.allclose(pod['mean'].values, history.mean(axis=0).reshape(20, 40))
+      modes = numpy.array([mode.values.flatten() for mode in pod['modes']])
+      assert numpy.allclose(modes.dot(modes.T), numpy.identity(2), atol=1.0E-08)
+      assert numpy.allclose(pod['coefficients'].dot(modes), fluctuations,
+                            atol=1.0E-08)
+    dmd = compute_dmd(snapshots, dt, n_modes=3)
+    assert len(dmd['modes-real']) == 3
+    assert numpy.allclose(numpy.abs(dmd['eigenvalues']), 1.0, atol=1.0E-08)
+    assert numpy.allclose(sorted(numpy.abs(dmd['frequencies'])),
+                          [0.0, frequency, frequency], atol=1.0E-08)
+    assert numpy.allclose(dmd['growth-rates'], 0.0, atol=1.0E-06)
+    # reconstruction of the first snapshot
+    modes = numpy.array([real.values.flatten() + 1j*imag.values.flatten()
+                         for real, imag in zip(dmd['modes-real'],
+                                               dmd['modes-imag'])])
+    assert numpy.allclose(dmd['amplitudes'].dot(modes), history[0], atol=1.0E-08)
+    # single-precision storage
+    snapshots = SnapshotMatrix(series)
+    assert snapshots.values.dtype == numpy.float32
+    pod = compute_pod(snapshots, n_modes=2)
+    assert numpy.allclose(pod['energies'], exact[:2]**2/40, rtol=1.0E-05)
+  finally:
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+  test_pod_dmd()
@@ -0,0 +1,481 @@
+# file: openfoamSimulation_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the readers of the class `OpenFOAMSimulation`.
+
+
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from snake.field import Field
+from snake.openfoam.simulation import OpenFOAMSimulation
+from snake.openfoam.solverLog import SolverLog
+
+
+def write_restart(directory, start, times, values, layout):
+  """Writes the forces file of a restart.
+
+  The values are the pressure and viscous contributions to the x- and
+  y-components of the force (or the drag and lift coefficients),
+  written in the layout of the files of a given OpenFOAM version:
+  '2.2.x' (pressure, viscous and porous forces and moments), '2.0.x'
+  (pressure and viscous forces and moments) or 'coefficients'.
+  """
+  folder = os.path.join(directory, '{:g}'.format(start))
+  os.makedirs(folder)
+  file_name = ('forceCoeffs.dat' if layout == 'coefficients' else 'forces.dat')
+  with open(os.path.join(folder, file_name), 'w') as outfile:
+    if layout == 'coefficients':
+      outfile.write('# Time Cm Cd Cl Cl(f) Cl(r)\n')
+    elif layout == '2.2.x':
+      outfile.write('# Time forces(pressure viscous porous) '
+                    'moment(pressure viscous porous)\n')
+    else:
+      outfile.write('# Time forces(pressure, viscous) '
+                    'moment(pressure, viscous)\n')
+    for t, (px, py, vx, vy) in zip(times, values):
+      if layout == 'coefficients':
+        outfile.write('{!r}\t0.5\t{!r}\t{!r}\t0.1\t0.2\n'.format(t, px, py))
+        continue
+      forces = ['({!r} {!r} 0.25)'.format(px, py),
+                '({!r} {!r} 0.5)'.format(vx, vy)]
+      moments = ['(1 2 3)', '(4 5 6)']
+      if layout == '2.2.x':
+        forces.append('(0 0 0)')
+        moments.append('(0 0 0)')
+      outfile.write('{!r}\t({})\t({})\n'.format(t, ' '.join(forces),
+                                                 ' '.join(moments)))
+
+
+def check_read_forces(layout):
+  """Writes three restarts (the last two rewriting part of the history)
+  and checks that the latest data are kept for each time."""
+  directory = tempfile.mkdtemp()
+  try:
+    if layout == '2.0.x':
+      folder = os.path.join(directory, 'forces')
+    elif layout == '2.2.x':
+      folder = os.path.join(directory, 'postProcessing', 'forces')
+    else:
+      folder = os.path.join(directory, 'postProcessing', 'forceCoeffs')
+    times = numpy.arange(1, 101)*0.5
+    values = numpy.random.rand(times.size, 4)
+    # restarts at t=20 and t=35 (the first ones wrote beyond)
+    write_restart(folder, 0, times[:60], values[:60]+1.0, layout)
+    write_restart(folder, 20, times[39:80], values[39:80]+2.0, layout)
+    write_restart(folder, 35, times[69:], values[69:], layout)
+    expected = numpy.concatenate((values[:39]+1.0, values[39:69]+2.0,
+                                  values[69:]))
+    if layout != 'coefficients':
+      # pressure plus viscous contributions
+      expected = expected[:, :2]+expected[:, 2:]
+    simulation = OpenFOAMSimulation(directory=directory)
+    for jobs, follow in [(1, False), (3, False), (1, True)]:
+      simulation.read_forces(display_coefficients=(layout == 'coefficients'),
+                             jobs=jobs, follow=follow)
+      assert numpy.array_equal(simulation.forces[0].times, times)
+      assert numpy.allclose(simulation.forces[0].values, expected[:, 0],
+                            rtol=1.0E-14, atol=0.0)
+      assert numpy.allclose(simulation.forces[1].values, expected[:, 1],
+                            rtol=1.0E-14, atol=0.0)
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_read_forces():
+  check_read_forces('2.2.x')
+
+
+def test_read_forces_parentheses():
+  check_read_forces('2.0.x')
+
+
+def test_read_force_coefficients():
+  check_read_forces('coefficients')
+
+
+def write_log_steps(outfile, steps, solver='icoFoam'):
+  """Writes time-steps in the format of the log of icoFoam
+  (Courant number after the time) or pimpleFoam (Courant number before the
+  time)."""
+  for n in steps:
+    courant = 'Courant Number mean: {} max: {}\n'.format(0.1*n, 0.2*n)
+    if solver == 'pimpleFoam':
+      outfile.write(courant+'deltaT = 0.01\n')
+    outfile.write('Time = {}\n\n'.format(0.01*n))
+    if solver == 'icoFoam':
+      outfile.write(courant)
+    outfile.write('smoothSolver:  Solving for Ux, Initial residual = {}, '
+                  'Final residual = 1e-06, No Iterations {}\n'.format(n, n))
+    if n % 2:
+      outfile.write('smoothSolver:  Solving for Uy, Initial residual = 0.5, '
+                    'Final residual = 2e-06, No Iterations 3\n')
+    outfile.write('DICPCG:  Solving for p, Initial residual = {}, '
+                  'Final residual = 0.01, No Iterations 20\n'.format(n))
+    outfile.write('time step continuity errors : sum local = 1e-09\n')
+    outfile.write('DICPCG:  Solving for p, Initial residual = 0.1, '
+                  'Final residual = {}, No Iterations 22\n'.format(1.0E-06*n))
+    outfile.write('ExecutionTime = {} s  ClockTime = {} s\n\n'.format(0.5*n, n))
+
+
+def test_read_log():
+  """Writes a log in several parts (the last time-step incomplete)
+  and reads it incrementally, then from the sidecar file."""
+  directory = tempfile.mkdtemp()
+  try:
+    file_path = os.path.join(directory, 'log.icoFoam')
+    with open(file_path, 'w') as outfile:
+      outfile.write('/*  OpenFOAM header  */\nCreate time\n\n'
+                    'Starting time loop\n\n')
+      write_log_steps(outfile, range(1, 6))
+      outfile.write('Time = 0.06\n\nCourant Number mean: 0.6 max: 1.2\n')
+    simulation = OpenFOAMSimulation(directory=directory)
+    log = simulation.read_log(file_path)
+    steps = numpy.arange(1, 6)
+    assert numpy.allclose(log['time'], 0.01*steps)
+    assert numpy.allclose(log['courant-max'], 0.2*steps)
+    assert numpy.allclose(log['Ux-initial-residual'], steps)
+    assert numpy.allclose(log['p-initial-residual'], steps)
+    assert numpy.allclose(log['p-final-residual'], 1.0E-06*steps)
+    assert numpy.allclose(log['p-iterations'], 42)
+    assert numpy.allclose(log['Uy-iterations'][::2], 3)
+    assert numpy.all(numpy.isnan(log['Uy-iterations'][1::2]))
+    assert numpy.allclose(log['clock-time'], steps)
+    # complete the time-step and add others
+    with open(file_path, 'a') as outfile:
+      outfile.write('DICPCG:  Solving for p, Initial residual = 6, '
+                    'Final residual = 6e-06, No Iterations 20\n'
+                    'ExecutionTime = 3 s  ClockTime = 6 s\n\n')
+      write_log_steps(outfile, range(7, 9))
+    offset = simulation.solver_logs.values()[0].offset
+    cfl = simulation.read_maximum_cfl(file_path)
+    assert simulation.solver_logs.values()[0].offset > offset
+    assert numpy.allclose(cfl['times'], 0.01*numpy.arange(1, 9))
+    assert numpy.allclose(cfl['values'], 0.2*numpy.arange(1, 9))
+    log = simulation.log
+    assert numpy.isnan(log['Ux-iterations'][5])
+    assert numpy.allclose(log['p-iterations'], [42]*5+[20]+[42]*2)
+    # a new reader starts from the sidecar file
+    reader = SolverLog(file_path)
+    reader._parse = None  # nothing should be parsed
+    cached = reader.read()
+    assert sorted(cached.keys()) == sorted(log.keys())
+    for name in log:
+      assert numpy.allclose(cached[name], log[name], equal_nan=True)
+    # a rewritten log is parsed again
+    with open(file_path, 'w') as outfile:
+      outfile.write('/*  new OpenFOAM header  */\n')
+      write_log_steps(outfile, range(1, 3))
+    log = SolverLog(file_path).read()
+    assert numpy.allclose(log['time'], [0.01, 0.02])
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_read_log_rewritten():
+  """Overwrites a log with the longer log of a new run with the same banner
+  and checks the history of the previous run is not reused."""
+  # static part of the banner (longer than 512 bytes), as in a real log
+  rule = '/*{}*/\n'.format('-'*75)
+  banner = (rule
+            + ''.join('| {:<76}|\n'.format(line)
+                      for line in ['=========', 'F ield', 'O peration',
+                                   'A nd', 'M anipulation',
+                                   'OpenFOAM: The Open Source CFD Toolbox',
+                                   'Version:  2.2.x', 'Web: www.OpenFOAM.org'])
+            + rule
+            + 'Build  : 2.2.x-5f8f5a1fef4b\nExec   : icoFoam\n'
+            'Date   : Oct 16 2026\nTime   : 10:00:00\nHost   : "node"\n'
+            'PID    : 1234\nCase   : /cavity\nnProcs : 1\n\n'
+            'Create time\n\nStarting time loop\n\n')
+  directory = tempfile.mkdtemp()
+  try:
+    file_path = os.path.join(directory, 'log.icoFoam')
+    with open(file_path, 'w') as outfile:
+      outfile.write(banner)
+      write_log_steps(outfile, range(1, 4))
+    reader = SolverLog(file_path)
+    assert numpy.allclose(reader.read()['time'], [0.01, 0.02, 0.03])
+    with open(file_path, 'w') as outfile:
+      outfile.write(banner)
+      write_log_steps(outfile, range(101, 110))
+    assert os.path.getsize(file_path) > reader.offset
+    # from the (stale) sidecar file, then from the history in memory
+    for log in [SolverLog(file_path).read(), reader.read()]:
+      assert numpy.allclose(log['time'], 0.01*numpy.arange(101, 110))
+      assert numpy.allclose(log['clock-time'], numpy.arange(101, 110))
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_read_log_courant_first():
+  """Reads incrementally the log of a solver printing the Courant number
+  before the time and checks each Courant number belongs to its
+  time-step."""
+  directory = tempfile.mkdtemp()
+  try:
+    file_path = os.path.join(directory, 'log.pimpleFoam')
+    with open(file_path, 'w') as outfile:
+      outfile.write('/*  OpenFOAM header  */\nCreate time\n\n'
+                    'Courant Number mean: 0 max: 0\n\n'
+                    'Starting time loop\n\n')
+      write_log_steps(outfile, range(1, 4), solver='pimpleFoam')
+      # Courant number of the next (incomplete) time-step
+      outfile.write('Courant Number mean: 0.4 max: 0.8\ndeltaT = 0.01\n')
+    reader = SolverLog(file_path, use_cache=False)
+    log = reader.read()
+    assert numpy.allclose(log['time'], [0.01, 0.02, 0.03])
+    assert numpy.allclose(log['courant-max'], [0.2, 0.4, 0.6])
+    assert numpy.allclose(log['clock-time'], [1, 2, 3])
+    with open(file_path, 'a') as outfile:
+      outfile.write('Time = 0.04\n\n'
+                    'ExecutionTime = 2 s  ClockTime = 4 s\n\n')
+      write_log_steps(outfile, range(5, 7), solver='pimpleFoam')
+    log = reader.read()
+    steps = numpy.arange(1, 7)
+    assert numpy.allclose(log['time'], 0.01*steps)
+    assert numpy.allclose(log['courant-mean'], 0.1*steps)
+    assert numpy.allclose(log['courant-max'], 0.2*steps)
+    assert numpy.allclose(log['execution-time'], 0.5*steps)
+    assert numpy.allclose(log['clock-time'], steps)
+    assert numpy.isnan(log['p-iterations'][3])
+    assert numpy.allclose(log['p-iterations'][4:], 42)
+  finally:
+    shutil.rmtree(directory)
+
+
+FOAM_HEADER = ('FoamFile\n{{\n    version     2.0;\n    format      {};\n'
+               '    arch        "{}";\n'
+               '    class       {};\n    object      {};\n}}\n\n')
+
+
+def write_foam_file(file_path, fmt, cls, body, arch='LSB;label=32;scalar=64'):
+  """Writes an OpenFOAM file (header followed by the body)."""
+  with open(file_path, 'wb') as outfile:
+    outfile.write(FOAM_HEADER.format(fmt, arch, cls,
+                                     os.path.basename(file_path)).encode())
+    outfile.write(body)
+
+
+def write_list(values, fmt, dtypes=('<i4', '<f8')):
+  """Returns the body of a list of labels, scalars or vectors
+  (binary types of the labels and of the scalars given by `dtypes`)."""
+  values = numpy.asarray(values)
+  if fmt == 'binary':
+    dtype = dtypes[0] if values.dtype.kind == 'i' else dtypes[1]
+    return ('{}('.format(values.shape[0]).encode()
+            + values.astype(dtype).tostring() + b')\n')
+  if values.ndim == 1:
+    items = ['{!r}'.format(value) for value in values.tolist()]
+  else:
+    items = ['({})'.format(' '.join('{!r}'.format(v) for v in value))
+             for value in values.tolist()]
+  return '{}\n(\n{}\n)\n'.format(values.shape[0], '\n'.join(items)).encode()
+
+
+def write_hex_mesh(directory, xs, ys, zs, fmt):
+  """Writes a structured hexahedral mesh in the polyMesh format
+  (internal faces first, area vectors pointing out of the owner)."""
+  nx, ny, nz = len(xs)-1, len(ys)-1, len(zs)-1
+  vertex = lambda i, j, k: i+(nx+1)*(j+(ny+1)*k)
+  cell = lambda i, j, k: i+nx*(j+ny*k)
+  points = [(x, y, z) for z in zs for y in ys for x in xs]
+  internal, boundary = [], []
+  for k in range(nz):
+    for j in range(ny):
+      for i in range(nx):
+        faces = [((i, j, k), (i, j, k+1), (i, j+1, k+1), (i, j+1, k)),
+                 ((i+1, j, k), (i+1, j+1, k), (i+1, j+1, k+1), (i+1, j, k+1)),
+                 ((i, j, k), (i+1, j, k), (i+1, j, k+1), (i, j, k+1)),
+                 ((i, j+1, k), (i, j+1, k+1), (i+1, j+1, k+1), (i+1, j+1, k)),
+                 ((i, j, k), (i, j+1, k), (i+1, j+1, k), (i+1, j, k)),
+                 ((i, j, k+1), (i+1, j, k+1), (i+1, j+1, k+1), (i, j+1, k+1))]
+        neighbours = [(i-1, j, k), (i+1, j, k), (i, j-1, k), (i, j+1, k),
+                      (i, j, k-1), (i, j, k+1)]
+        for face, (a, b, c) in zip(faces, neighbours):
+          face = [vertex(*corner) for corner in face]
+          if 0 <= a < nx and 0 <= b < ny and 0 <= c < nz:
+            if cell(a, b, c) > cell(i, j, k):
+              internal.append((face, cell(i, j, k), cell(a, b, c)))
+          else:
+            boundary.append((face, cell(i, j, k), None))
+  faces = internal+boundary
+  os.makedirs(directory)
+  path = lambda name: os.path.join(directory, name)
+  write_foam_file(path('points'), fmt, 'vectorField',
+                  write_list(numpy.array(points, dtype=float), fmt))
+  if fmt == 'binary':
+    write_foam_file(path('faces'), fmt, 'faceCompactList',
+                    write_list(numpy.arange(len(faces)+1)*4, fmt)
+                    + write_list(numpy.array([f[0] for f in faces]).ravel(),
+                                 fmt))
+  else:
+    items = ['{}({})'.format(len(f[0]), ' '.join(str(p) for p in f[0]))
+             for f in faces]
+    write_foam_file(path('faces'), fmt, 'faceList',
+                    '{}\n(\n{}\n)\n'.format(len(faces),
+                                             '\n'.join(items)).encode())
+  write_foam_file(path('owner'), fmt, 'labelList',
+                  write_list(numpy.array([f[1] for f in faces]), fmt))
+  write_foam_file(path('neighbour'), fmt, 'labelList',
+                  write_list(numpy.array([f[2] for f in internal]), fmt))
+
+
+def test_read_cell_field():
+  """Writes a stretched hexahedral mesh and fields (ASCII and binary),
+  and checks the cell-centers and the values read."""
+  xs, ys, zs = [0.0, 1.0, 3.0, 3.5], [-1.0, 0.0, 0.5], [0.0, 0.1]
+  centers = numpy.array([(x, y, 0.05)
+                         for y in 0.5*numpy.add(ys[1:], ys[:-1])
+                         for x in 0.5*numpy.add(xs[1:], xs[:-1])])
+  for fmt in ['ascii', 'binary']:
+    directory = tempfile.mkdtemp()
+    try:
+      write_hex_mesh(os.path.join(directory, 'constant', 'polyMesh'),
+                     xs, ys, zs, fmt)
+      os.makedirs(os.path.join(directory, '0.5'))
+      velocity = numpy.random.rand(6, 3)
+      write_foam_file(os.path.join(directory, '0.5', 'U'), fmt,
+                      'volVectorField',
+                      b'dimensions [0 1 -1 0 0 0 0];\n\n'
+                      b'internalField nonuniform List<vector> '
+                      + write_list(velocity, fmt) + b';\n\n'
+                      b'boundaryField\n{\n}\n')
+      write_foam_file(os.path.join(directory, '0.5', 'p'), fmt,
+                      'volScalarField',
+                      b'dimensions [0 2 -2 0 0 0 0];\n\n'
+                      b'internalField uniform 2;\n\nboundaryField\n{\n}\n')
+      simulation = OpenFOAMSimulation(directory=directory)
+      values = simulation.read_cell_field('y-velocity', 0.5)
+      assert numpy.array_equal(values, velocity[:, 1])
+      assert numpy.array_equal(simulation.read_cell_field('pressure', 0.5),
+                               numpy.full(6, 2.0))
+      mesh = simulation.mesh
+      assert mesh.n_cells == 6 and mesh.n_internal_faces == 7
+      assert numpy.allclose(mesh.cell_centers, centers)
+      assert numpy.allclose(mesh.cell_volumes,
+                            numpy.outer(numpy.diff(ys), numpy.diff(xs)).ravel()
+                            * 0.1)
+      # the mesh is read once
+      assert simulation.read_mesh() is mesh
+    finally:
+      shutil.rmtree(directory)
+
+
+def test_read_mesh_files():
+  """Reads faces with different numbers of points, empty and nested ASCII
+  lists, and binary lists of other architectures."""
+  from snake.openfoam.polyMesh import read_faces, read_list, parse_list
+  directory = tempfile.mkdtemp()
+  try:
+    faces = [[0, 1, 2], [1, 2, 3, 4], [4, 5, 6, 7, 8], [8, 9, 0], [2, 3, 4, 5]]
+    file_path = os.path.join(directory, 'faces')
+    write_foam_file(file_path, 'ascii', 'faceList',
+                    '{}\n(\n{}\n)\n'.format(len(faces), '\n'.join(
+                        '{}({})'.format(len(face), ' '.join(map(str, face)))
+                        for face in faces)).encode())
+    face_points, face_offsets = read_faces(file_path)
+    assert list(face_points) == sum(faces, [])
+    assert list(face_offsets) == [0, 3, 7, 12, 15, 19]
+    # ASCII lists (the closing parenthesis is followed by other lists)
+    header = {'format': 'ascii'}
+    vectors, end = parse_list(b'2\n(\n(1 2 3)\n(4 5 6)\n)\n3(7 8 9) (1)',
+                              header, n_components=3)
+    assert numpy.array_equal(vectors, [[1, 2, 3], [4, 5, 6]])
+    assert numpy.array_equal(parse_list(b'2\n(\n(1 2 3)\n(4 5 6)\n)\n3(7 8 9)',
+                                        header, position=end)[0], [7, 8, 9])
+    vectors, end = parse_list(b'0\n(\n)\n1((1 2 3))', header, n_components=3)
+    assert vectors.shape == (0, 3)
+    assert numpy.array_equal(parse_list(b'0\n(\n)\n1((1 2 3))', header,
+                                        position=end, n_components=3)[0],
+                             [[1, 2, 3]])
+    # binary lists written on other architectures
+    points = numpy.random.rand(4, 3)
+    for arch, dtypes in [('MSB;label=64;scalar=32', ('>i8', '>f4')),
+                         ('LSB;label=32;scalar=32', ('<i4', '<f4'))]:
+      write_foam_file(os.path.join(directory, 'points'), 'binary',
+                      'vectorField', write_list(points, 'binary', dtypes),
+                      arch=arch)
+      assert numpy.array_equal(read_list(os.path.join(directory, 'points')),
+                               points.astype(numpy.float32))
+      write_foam_file(os.path.join(directory, 'owner'), 'binary',
+                      'labelList', write_list([3, 1, 2], 'binary', dtypes),
+                      arch=arch)
+      assert list(read_list(os.path.join(directory, 'owner'))) == [3, 1, 2]
+    write_foam_file(os.path.join(directory, 'points'), 'binary',
+                    'vectorField', write_list(points, 'binary'),
+                    arch='LSB;label=32;scalar=128')
+    try:
+      read_list(os.path.join(directory, 'points'))
+    except ValueError:
+      pass
+    else:
+      assert False, 'unsupported scalar size not detected'
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_read_fields():
+  """Resamples linear fields onto Cartesian grids and compares them with
+  the exact fields."""
+  directory = tempfile.mkdtemp()
+  try:
+    xs, ys = numpy.linspace(0.0, 2.0, 21), numpy.linspace(0.0, 1.0, 11)**1.5
+    write_hex_mesh(os.path.join(directory, 'constant', 'polyMesh'),
+                   xs, ys, [0.0, 0.1], 'ascii')
+    simulation = OpenFOAMSimulation(directory=directory)
+    centers = simulation.read_mesh().cell_centers
+    os.makedirs(os.path.join(directory, '2'))
+    pressure = 2.0*centers[:, 0]+3.0*centers[:, 1]
+    velocity = numpy.column_stack((centers[:, 0], -centers[:, 1],
+                                   numpy.zeros(centers.shape[0])))
+    for name, cls, values in [('p', 'Scalar', pressure),
+                              ('U', 'Vector', velocity)]:
+      write_foam_file(os.path.join(directory, '2', name), 'ascii',
+                      'vol{}Field'.format(cls),
+                      'internalField nonuniform List<{}> '.format(cls.lower())
+                      .encode() + write_list(values, 'ascii') + b';\n')
+    # linear interpolation is exact for linear fields within the cell-centers
+    grid = [numpy.linspace(0.1, 1.9, 13), numpy.linspace(0.1, 0.9, 7)]
+    pressure, u = simulation.read_fields(['pressure', 'x-velocity'], 2.0, grid,
+                                         method='linear')
+    x, y = numpy.meshgrid(*grid)
+    exact = Field(x=grid[0], y=grid[1], values=2.0*x+3.0*y, label='pressure')
+    inside = numpy.isfinite(pressure.values)
+    assert inside.sum() > 0.8*inside.size
+    assert numpy.allclose(pressure.values[inside], exact.values[inside])
+    assert numpy.allclose(u.values[inside], x[inside])
+    difference = pressure.subtract(exact)
+    assert numpy.nanmax(numpy.abs(difference.values)) < 1.0E-12
+    # the weights are computed once per grid
+    assert len(simulation.resamplers) == 1
+    simulation.read_fields('y-velocity', 2.0, grid, method='linear')
+    assert len(simulation.resamplers) == 1
+    assert numpy.allclose(simulation.fields['y-velocity'].values[inside],
+                          -y[inside])
+    # inverse-distance weighting takes the values at the cell-centers
+    grid = [numpy.unique(centers[:, 0]), numpy.unique(centers[:, 1])]
+    field, = simulation.read_fields('pressure', 2.0, grid, n_neighbors=4)
+    x, y = numpy.meshgrid(*grid)
+    exact = Field(x=grid[0], y=grid[1], values=2.0*x+3.0*y, label='pressure')
+    assert field.get_difference(exact, exact, norm='Linf') < 1.0E-12
+    # nodes far from the cell-centers are outside
+    field, = simulation.read_fields('pressure', 2.0, [[1.0, 5.0], [0.5]],
+                                    max_distance=0.5)
+    assert numpy.isfinite(field.values[0, 0]) and numpy.isnan(field.values[0, 1])
+  finally:
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+  test_read_forces()
+  test_read_forces_parentheses()
+  test_read_force_coefficients()
+  test_read_log()
+  test_read_log_rewritten()
+  test_read_log_courant_first()
+  test_read_cell_field()
+  test_read_mesh_files()
+  test_read_fields()
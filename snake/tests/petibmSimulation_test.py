@@ -0,0 +1,101 @@
+# file: petibmSimulation_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the readers of the class `PetIBMSimulation`.
+
+
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from snake.petibm.simulation import PetIBMSimulation
+from snake.petibm import petscBinaryIO
+
+
+def test_read_write_vec():
+  """Writes a PETSc Vec and reads it back."""
+  directory = tempfile.mkdtemp()
+  try:
+    file_path = os.path.join(directory, 'vec.dat')
+    values = numpy.random.rand(3, 4)
+    petscBinaryIO.write_vec(file_path, values)
+    vec = petscBinaryIO.read_vec(file_path)
+    assert vec.dtype == numpy.dtype('>f8')
+    assert numpy.allclose(vec.reshape(3, 4), values, atol=1.0E-12)
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_read_fluxes_pressure(periodic_directions=['x']):
+  """Writes 3D fluxes and pressure (with periodic x-direction),
+  reads them back and compares."""
+  directory = tempfile.mkdtemp()
+  try:
+    simulation = PetIBMSimulation(directory=directory)
+    x = numpy.linspace(0.0, 1.0, 6)
+    y = numpy.linspace(-1.0, 1.0, 9)
+    z = numpy.linspace(0.0, 0.5, 4)
+    nx, ny, nz = x.size-1, y.size-1, z.size-1
+    simulation.grid = [x, y, z]
+    qx = numpy.random.rand(nz, ny, nx)
+    qy = numpy.random.rand(nz, ny-1, nx)
+    qz = numpy.random.rand(nz-1, ny, nx)
+    p = numpy.random.rand(nz, ny, nx)
+    folder = os.path.join(directory, '{:0>7}'.format(0))
+    os.makedirs(folder)
+    for name, values in zip(['qx', 'qy', 'qz', 'phi'], [qx, qy, qz, p]):
+      petscBinaryIO.write_vec(os.path.join(folder, name+'.dat'), values)
+    fluxes = simulation.read_fluxes(0, periodic_directions=periodic_directions)
+    pressure = simulation.read_pressure(0)
+    assert numpy.allclose(fluxes[0].values, qx[:, :, :-1], atol=1.0E-12)
+    assert numpy.allclose(fluxes[1].values, qy, atol=1.0E-12)
+    assert numpy.allclose(fluxes[2].values, qz, atol=1.0E-12)
+    assert numpy.allclose(pressure.values, p, atol=1.0E-12)
+    assert numpy.allclose(fluxes[2].z, z[1:-1], atol=1.0E-12)
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_get_velocity():
+  """Writes 3D fluxes on a stretched grid, converts them into velocities
+  (with and without reusing the flux buffers) and compares."""
+  directory = tempfile.mkdtemp()
+  try:
+    simulation = PetIBMSimulation(directory=directory)
+    x = numpy.cumsum(numpy.random.rand(6))
+    y = numpy.cumsum(numpy.random.rand(9))
+    z = numpy.cumsum(numpy.random.rand(4))
+    nx, ny, nz = x.size-1, y.size-1, z.size-1
+    dx, dy, dz = x[1:]-x[:-1], y[1:]-y[:-1], z[1:]-z[:-1]
+    simulation.grid = [x, y, z]
+    qx = numpy.random.rand(nz, ny, nx-1)
+    qy = numpy.random.rand(nz, ny-1, nx)
+    qz = numpy.random.rand(nz-1, ny, nx)
+    folder = os.path.join(directory, '{:0>7}'.format(0))
+    os.makedirs(folder)
+    for name, values in zip(['qx', 'qy', 'qz'], [qx, qy, qz]):
+      petscBinaryIO.write_vec(os.path.join(folder, name+'.dat'), values)
+    expected = [qx/numpy.outer(dz, dy).reshape(nz, ny, 1),
+                qy/numpy.outer(dz, dx).reshape(nz, 1, nx),
+                qz/numpy.outer(dy, dx).reshape(1, ny, nx)]
+    for in_place in [False, True]:
+      velocities = simulation.get_velocity(0, in_place=in_place)
+      for velocity, values in zip(velocities, expected):
+        assert numpy.allclose(velocity.values, values, atol=1.0E-12)
+    assert velocities[2].label == 'z-velocity'
+    # the flux files are left untouched
+    assert numpy.allclose(petscBinaryIO.read_vec(os.path.join(folder, 'qz.dat')),
+                          qz.flatten(), atol=1.0E-12)
+  finally:
+    shutil.rmtree(directory)
+
+
+def main():
+  test_read_write_vec()
+  test_read_fluxes_pressure()
+  test_get_velocity()
+
+
+if __name__ == '__main__':
+  main()
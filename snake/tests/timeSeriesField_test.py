@@ -0,0 +1,56 @@
+# file: timeSeriesField_test.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Tests the class `TimeSeriesField`.
+
+
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from snake.cuibm.simulation import CuIBMSimulation
+
+
+def test_time_series():
+  """Writes the pressure at a few time-steps and checks slicing,
+  reductions and probes computed chunk by chunk."""
+  directory = tempfile.mkdtemp()
+  try:
+    simulation = CuIBMSimulation(directory=directory)
+    x, y = numpy.linspace(0.0, 1.0, 6), numpy.linspace(-1.0, 1.0, 9)
+    nx, ny = x.size-1, y.size-1
+    simulation.grid = x, y
+    time_steps = [10, 20, 30, 40, 50]
+    history = numpy.random.rand(len(time_steps), ny, nx)
+    for values, time_step in zip(history, time_steps):
+      folder = os.path.join(directory, '{:0>7}'.format(time_step))
+      os.makedirs(folder)
+      with open(os.path.join(folder, 'lambda'), 'wb') as outfile:
+        numpy.array([values.size], dtype=numpy.int32).tofile(outfile)
+        values.tofile(outfile)
+    simulation.read_fields('pressure', time_steps[0])
+    loaded = simulation.fields['pressure']
+    series = simulation.get_time_series('pressure', chunk_size=2)
+    assert list(series.time_steps) == time_steps
+    assert series.shape == (len(time_steps), ny, nx)
+    assert numpy.allclose(series[:], history)
+    assert numpy.allclose(series[1], history[1])
+    assert numpy.allclose(series[1:4, 2, :], history[1:4, 2, :])
+    assert numpy.allclose(series.mean().values, history.mean(axis=0))
+    assert numpy.allclose(series.max().values, history.max(axis=0))
+    assert numpy.allclose(series.min().values, history.min(axis=0))
+    probes = series.get_probes([(series.x[1], series.y[3]),
+                                (series.x[4], series.y[0])])
+    assert probes.shape == (len(time_steps), 2)
+    assert numpy.allclose(probes[:, 0], history[:, 3, 1])
+    assert numpy.allclose(probes[:, 1], history[:, 0, 4])
+    # iterating the series does not replace the field loaded by the caller
+    assert simulation.fields['pressure'] is loaded
+    assert list(simulation.fields.keys()) == ['pressure']
+  finally:
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+  test_time_series()
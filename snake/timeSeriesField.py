@@ -0,0 +1,249 @@
+# file: timeSeriesField.py
+# author: Olivier Mesnard (mesnardo@gwu.edu)
+# description: Implementation of the class `TimeSeriesField`.
+
+
+import numpy
+
+from .field import Field
+
+
+class TimeSeriesField(object):
+  """Lazy stack of a field over saved time-steps.
+
+  Behaves like an array of shape (time, y, x) (or (time, z, y, x) in 3D):
+  the time-steps are read from file, chunk by chunk, only when accessed.
+  """
+  def __init__(self, simulation, field_name,
+               time_steps=None,
+               periodic_directions=[],
+               directory=None,
+               chunk_size=10):
+    """Registers the simulation, the field and the time-steps.
+
+    Parameters
+    ----------
+    simulation: BarbaGroupSimulation object
+      The simulation (with its grid already read).
+    field_name: string
+      Name of the field;
+      choices: 'pressure', 'vorticity',
+               'x-velocity', 'y-velocity', 'z-velocity',
+               'x-flux', 'y-flux', 'z-flux'.
+    time_steps: list of integers, optional
+      Time-steps to consider;
+      default: None (all saved time-steps).
+    periodic_directions: list of strings, optional
+      Directions that uses periodic boundary conditions;
+      choices: 'x', 'y', 'z',
+      default: [].
+    directory: string, optional
+      Directory containing the saved time-step folders;
+      default: None.
+    chunk_size: integer, optional
+      Number of time-steps loaded in memory at once;
+      default: 10.
+    """
+    self.simulation = simulation
+    self.field_name = field_name
+    if time_steps is None:
+      time_steps = simulation.get_time_steps(directory=directory)
+    self.time_steps = numpy.array(time_steps, dtype=int)
+    self.periodic_directions = periodic_directions
+    self.directory = directory
+    self.chunk_size = max(1, int(chunk_size))
+    self.x, self.y, self.z = None, None, None
+    self.spatial_shape = None
+
+  def read_field(self, time_step):
+    """Reads the field at a given time-step through the simulation readers.
+
+    The fields already loaded in the simulation are left untouched.
+
+    Parameters
+    ----------
+    time_step: integer
+      The time-step.
+
+    Returns
+    -------
+    field: Field object
+      The field at the given time-step.
+    """
+    loaded_fields = self.simulation.fields.copy()
+    try:
+      self.simulation.read_fields([self.field_name], time_step,
+                                  periodic_directions=self.periodic_directions,
+                                  directory=self.directory)
+      field = self.simulation.fields[self.field_name]
+    finally:
+      self.simulation.fields.clear()
+      self.simulation.fields.update(loaded_fields)
+    if self.spatial_shape is None:
+      self.x, self.y = field.x, field.y
+      self.z = getattr(field, 'z', None)
+      self.spatial_shape = field.values.shape
+    return field
+
+  def _get_spatial_shape(self):
+    """Returns the spatial shape of the field (reads the first time-step if
+    the shape is not known yet)."""
+    if self.spatial_shape is None:
+      self.read_field(self.time_steps[0])
+    return self.spatial_shape
+
+  @property
+  def shape(self):
+    """Shape of the stacked array."""
+    return (self.time_steps.size,) + tuple(self._get_spatial_shape())
+
+  @property
+  def ndim(self):
+    """Number of dimensions of the stacked array."""
+    return len(self.shape)
+
+  def __len__(self):
+    return self.time_steps.size
+
+  def iter_chunks(self, indices=None, spatial_key=Ellipsis, chunk_size=None):
+    """Iterates over chunks of time-steps.
+
+    Parameters
+    ----------
+    indices: 1D array of integers, optional
+      Indices (in the list of time-steps) to load;
+      default: None (all time-steps).
+    spatial_key: slice, tuple or Ellipsis, optional
+      Spatial sub-array to extract at each time-step;
+      default: Ellipsis (whole field).
+    chunk_size: integer, optional
+      Number of time-steps in each chunk;
+      default: None (the chunk size of the object).
+
+    Yields
+    ------
+    time_steps: 1D array of integers
+      Time-steps of the chunk.
+    values: Numpy array of floats
+      Values of the chunk stacked along the first axis.
+    """
+    if indices is None:
+      indices = numpy.arange(self.time_steps.size)
+    if not chunk_size:
+      chunk_size = self.chunk_size
+    for start in range(0, len(indices), chunk_size):
+      chunk_indices = indices[start:start+chunk_size]
+      values = None
+      for n, index in enumerate(chunk_indices):
+        data = self.read_field(self.time_steps[index]).values[spatial_key]
+        if values is None:
+          values = numpy.empty((len(chunk_indices),)+numpy.shape(data),
+                               dtype=numpy.float64)
+        values[n] = data
+      yield self.time_steps[chunk_indices], values
+
+  def __getitem__(self, key):
+    """Returns the values of the stacked field for a given key.
+
+    The first index selects the time-steps (integer, slice or list of
+    integers), the remaining ones are applied to the field at each time-step.
+    """
+    if not isinstance(key, tuple):
+      key = (key,)
+    time_key, spatial_key = key[0], key[1:]
+    if not spatial_key:
+      spatial_key = Ellipsis
+    indices = numpy.arange(self.time_steps.size)[time_key]
+    if numpy.ndim(indices) == 0:
+      return self.read_field(self.time_steps[indices]).values[spatial_key].copy()
+    chunks = [values for _, values in self.iter_chunks(indices=indices,
+                                                       spatial_key=spatial_key)]
+    if not chunks:
+      return numpy.empty((0,), dtype=numpy.float64)
+    return numpy.concatenate(chunks)
+
+  def mean(self):
+    """Computes the time-averaged field, chunk by chunk.
+
+    Returns
+    -------
+    mean: Field object
+      The time-averaged field.
+    """
+    total = numpy.zeros(self._get_spatial_shape(), dtype=numpy.float64)
+    for _, values in self.iter_chunks():
+      total += values.sum(axis=0)
+    return self._create_field(total/self.time_steps.size, 'mean')
+
+  def max(self):
+    """Computes the maximum over time, chunk by chunk.
+
+    Returns
+    -------
+    maximum: Field object
+      The maximum values over time.
+    """
+    maximum = numpy.full(self._get_spatial_shape(), -numpy.inf)
+    for _, values in self.iter_chunks():
+      numpy.maximum(maximum, values.max(axis=0), out=maximum)
+    return self._create_field(maximum, 'max')
+
+  def min(self):
+    """Computes the minimum over time, chunk by chunk.
+
+    Returns
+    -------
+    minimum: Field object
+      The minimum values over time.
+    """
+    minimum = numpy.full(self._get_spatial_shape(), numpy.inf)
+    for _, values in self.iter_chunks():
+      numpy.minimum(minimum, values.min(axis=0), out=minimum)
+    return self._create_field(minimum, 'min')
+
+  def get_probe_indices(self, x, y, z=None):
+    """Returns the index of the grid-node the closest to a given point.
+
+    Parameters
+    ----------
+    x, y: floats
+      Coordinates of the point.
+    z: float, optional
+      z-coordinate of the point (3D fields);
+      default: None.
+
+    Returns
+    -------
+    indices: tuple of integers
+      Index of the closest node in the field array.
+    """
+    self._get_spatial_shape()
+    indices = (numpy.abs(self.y-y).argmin(), numpy.abs(self.x-x).argmin())
+    if self.z is not None:
+      indices = (numpy.abs(self.z-z).argmin(),) + indices
+    return indices
+
+  def get_probes(self, points):
+    """Extracts the history of the field at the grid-nodes the closest
+    to given points.
+
+    Parameters
+    ----------
+    points: list of tuples of floats
+      Coordinates of each probe.
+
+    Returns
+    -------
+    probes: 2D array of floats
+      History of the field at each probe; shape (time, probe).
+    """
+    indices = [self.get_probe_indices(*point) for point in points]
+    spatial_key = tuple(numpy.array(index) for index in zip(*indices))
+    return self[(slice(None),) + spatial_key]
+
+  def _create_field(self, values, description):
+    """Creates a Field object defined on the grid of the stacked field."""
+    return Field(label='{}-{}'.format(self.field_name, description),
+                 time_step=self.time_steps[-1],
+                 x=self.x, y=self.y, z=self.z,
+                 values=values)